@@ -45,3 +45,9 @@ def few_posts_with_group(mixer, user, group):
 def another_few_posts_with_group_with_follower(mixer, user, another_user, group):
     mixer.blend('posts.Follow', user=user, author=another_user)
     mixer.cycle(20).blend(Post, author=another_user, group=group)
+
+
+@pytest.fixture
+def sync_thumbnails(settings):
+    """Build thumbnails inline while the test database and media exist."""
+    settings.POSTS_THUMBNAIL_WORKERS = 0
@@ -58,6 +58,7 @@ class TestNewView:
         return File(file_obj, name=name)
 
     @pytest.mark.django_db(transaction=True)
+    @pytest.mark.usefixtures('sync_thumbnails')
     def test_new_view_post(self, mock_media, user_client, user, group):
         text = 'Проверка нового поста!'
         try:
@@ -149,6 +149,7 @@ class TestPostEditView:
         return File(file_obj, name=name)
 
     @pytest.mark.django_db(transaction=True)
+    @pytest.mark.usefixtures('sync_thumbnails')
     def test_post_edit_view_author_post(self, mock_media, user_client, post_with_group):
         text = 'Проверка изменения поста!'
         try:
@@ -0,0 +1,14 @@
+from django import forms
+
+from posts.forms import PostForm
+from posts.models import Group
+
+
+class ApiPostForm(PostForm):
+    """PostForm, в которой группа задаётся адресом (slug), а не id."""
+
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.all(),
+        to_field_name='slug',
+        required=False,
+    )
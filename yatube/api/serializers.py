@@ -0,0 +1,97 @@
+"""
+Сериализация строк values() в JSON без создания экземпляров моделей.
+
+Каждое поле ответа — путь для values(), связанные объекты приходят
+JOIN-ом того же запроса, поэтому число запросов не зависит от размера
+страницы. Параметр ?fields= оставляет в запросе только нужные столбцы.
+"""
+from django.core.files.storage import default_storage
+
+
+class UnknownFields(ValueError):
+    pass
+
+
+def media_url(name):
+    return default_storage.url(name) if name else None
+
+
+class Serializer:
+    # Имя поля в ответе: путь для values()
+    fields = {}
+    # Имя поля в ответе: функция, преобразующая значение из базы
+    converters = {}
+
+    def __init__(self, requested=None):
+        if requested:
+            names = [name for name in requested.split(',') if name]
+            unknown = [name for name in names if name not in self.fields]
+            if unknown:
+                raise UnknownFields(', '.join(unknown))
+            self.names = names
+        else:
+            self.names = list(self.fields)
+
+    def values(self, queryset, keys=()):
+        """values() с выбранными полями и служебными ключами keys
+        (например, полями сортировки для курсора)."""
+        lookups = {self.fields[name] for name in self.names}
+        return queryset.values(*lookups.union(keys))
+
+    def to_representation(self, row):
+        data = {}
+        for name in self.names:
+            value = row[self.fields[name]]
+            converter = self.converters.get(name)
+            data[name] = converter(value) if converter else value
+        return data
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def one(self, queryset):
+        row = self.values(queryset).first()
+        return None if row is None else self.to_representation(row)
+
+
+class GroupSerializer(Serializer):
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'slug': 'slug',
+        'description': 'description',
+    }
+
+
+class PostSerializer(Serializer):
+    fields = {
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+        'thumbnail': 'thumbnail_url',
+        'comment_count': 'comment_count',
+    }
+    converters = {
+        'image': media_url,
+        'thumbnail': lambda url: url or None,
+    }
+
+
+class CommentSerializer(Serializer):
+    fields = {
+        'id': 'id',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }
+
+
+class FollowSerializer(Serializer):
+    fields = {
+        'id': 'id',
+        'author': 'author__username',
+    }
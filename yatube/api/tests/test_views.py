@@ -0,0 +1,192 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiViewTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.author,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ApiViewTests.user)
+        self.author_client = Client()
+        self.author_client.force_login(ApiViewTests.author)
+
+    def send(self, client, method, url, data):
+        return getattr(client, method)(
+            url, json.dumps(data), content_type='application/json')
+
+    def test_post_list_pages_with_constant_queries(self):
+        """Проверка: список постов — один запрос при любом размере страницы."""
+        url = reverse('api:posts')
+        with self.assertNumQueries(1):
+            self.guest_client.get(url, {'limit': 1})
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=ApiViewTests.author,
+                 group=ApiViewTests.group)
+            for number in range(15))
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(url, {'limit': 15})
+        data = response.json()
+        self.assertEqual(len(data['results']), 15)
+        self.assertEqual(data['results'][0]['author'], 'TestAuthor')
+        self.assertEqual(data['results'][0]['group'], 'test-slug')
+        self.assertIsNone(data['previous'])
+        rest = self.guest_client.get(data['next']).json()
+        self.assertEqual(len(rest['results']), 1)
+        self.assertEqual(rest['results'][0]['id'], ApiViewTests.post.id)
+        self.assertIsNone(rest['next'])
+
+    def test_sparse_fields_and_filters(self):
+        """Проверка: ?fields= оставляет только нужные поля."""
+        response = self.guest_client.get(
+            reverse('api:posts'),
+            {'fields': 'id,text', 'author': 'TestAuthor'})
+        self.assertEqual(response.json()['results'], [
+            {'id': ApiViewTests.post.id, 'text': 'Тестовый текст'}])
+        response = self.guest_client.get(reverse('api:posts'),
+                                         {'group': 'missing'})
+        self.assertEqual(response.json()['results'], [])
+        response = self.guest_client.get(reverse('api:posts'),
+                                         {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        response = self.guest_client.get(reverse('api:posts'),
+                                         {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag(self):
+        """Проверка: без изменений ответ 304, после изменения — 200."""
+        url = reverse('api:post', args=(ApiViewTests.post.id,))
+        etag = self.guest_client.get(url)['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(post=ApiViewTests.post,
+                               author=ApiViewTests.user, text='Комментарий')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['comment_count'], 1)
+
+    def test_create_post(self):
+        """Проверка: создать пост может только пользователь."""
+        url = reverse('api:posts')
+        data = {'text': 'Пост из API', 'group': 'test-slug'}
+        response = self.send(self.guest_client, 'post', url, data)
+        self.assertEqual(response.status_code, 403)
+        response = self.send(self.authorized_client, 'post', url, data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'TestUser')
+        self.assertTrue(Post.objects.filter(
+            text='Пост из API', group=ApiViewTests.group).exists())
+        response = self.send(self.authorized_client, 'post', url,
+                             {'group': 'missing'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['errors'])
+
+    def test_edit_and_delete_post(self):
+        """Проверка: менять и удалять пост может только автор."""
+        url = reverse('api:post', args=(ApiViewTests.post.id,))
+        response = self.send(self.authorized_client, 'patch', url,
+                             {'text': 'Чужая правка'})
+        self.assertEqual(response.status_code, 403)
+        response = self.send(self.author_client, 'patch', url,
+                             {'text': 'Правка автора'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['text'], 'Правка автора')
+        self.assertEqual(response.json()['group'], 'test-slug')
+        response = self.authorized_client.delete(url)
+        self.assertEqual(response.status_code, 403)
+        response = self.author_client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+    def test_edit_post_with_form_body(self):
+        """Проверка: PATCH с формой меняет пост, с multipart — 415."""
+        url = reverse('api:post', args=(ApiViewTests.post.id,))
+        response = self.author_client.patch(
+            url, 'text=%D0%A4%D0%BE%D1%80%D0%BC%D0%B0&group=',
+            content_type='application/x-www-form-urlencoded')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['text'], 'Форма')
+        self.assertIsNone(response.json()['group'])
+        response = self.author_client.patch(
+            url, encode_multipart(BOUNDARY, {'text': 'Multipart'}),
+            content_type=MULTIPART_CONTENT)
+        self.assertEqual(response.status_code, 415)
+        response = self.author_client.patch(url, 'text', 'text/plain')
+        self.assertEqual(response.status_code, 415)
+        ApiViewTests.post.refresh_from_db()
+        self.assertEqual(ApiViewTests.post.text, 'Форма')
+
+    def test_comments(self):
+        """Проверка: комментарии идут по порядку, писать может пользователь."""
+        url = reverse('api:comments', args=(ApiViewTests.post.id,))
+        response = self.send(self.guest_client, 'post', url,
+                             {'text': 'Гость'})
+        self.assertEqual(response.status_code, 403)
+        for text in ('Первый', 'Второй'):
+            response = self.send(self.authorized_client, 'post', url,
+                                 {'text': text})
+            self.assertEqual(response.status_code, 201)
+        response = self.guest_client.get(url, {'fields': 'text,author'})
+        self.assertEqual(response.json()['results'], [
+            {'text': 'Первый', 'author': 'TestUser'},
+            {'text': 'Второй', 'author': 'TestUser'},
+        ])
+        response = self.guest_client.get(
+            reverse('api:comments', args=(999,)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_groups(self):
+        """Проверка: группы доступны только для чтения."""
+        response = self.guest_client.get(reverse('api:groups'))
+        self.assertEqual(response.json()['results'][0]['slug'], 'test-slug')
+        response = self.guest_client.get(
+            reverse('api:group', args=('test-slug',)))
+        self.assertEqual(response.json()['title'], 'Тестовый заголовок')
+        response = self.send(self.authorized_client, 'post',
+                             reverse('api:groups'), {'title': 'Новая'})
+        self.assertEqual(response.status_code, 405)
+
+    def test_follows(self):
+        """Проверка: подписки пользователя, повторная подписка и отписка."""
+        url = reverse('api:follows')
+        self.assertEqual(self.guest_client.get(url).status_code, 403)
+        response = self.send(self.authorized_client, 'post', url,
+                             {'author': 'TestAuthor'})
+        self.assertEqual(response.status_code, 201)
+        response = self.send(self.authorized_client, 'post', url,
+                             {'author': 'TestAuthor'})
+        self.assertEqual(response.status_code, 200)
+        response = self.send(self.authorized_client, 'post', url,
+                             {'author': 'TestUser'})
+        self.assertEqual(response.status_code, 400)
+        response = self.authorized_client.get(url, {'fields': 'author'})
+        self.assertEqual(response.json()['results'],
+                         [{'author': 'TestAuthor'}])
+        response = self.authorized_client.delete(
+            reverse('api:follow', args=('TestAuthor',)))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Follow.objects.exists())
@@ -0,0 +1,296 @@
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse, QueryDict
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from posts.cache import GROUPS_SCOPE, INDEX_SCOPE, follow_scope, post_scope
+from posts.conditional import conditional_feed
+from posts.forms import CommentForm
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import CursorPaginator, InvalidCursor
+from posts.thumbnails import queue_thumbnail
+from posts.uploads import bounded_uploads
+
+from .forms import ApiPostForm
+from .serializers import (CommentSerializer, FollowSerializer,
+                          GroupSerializer, PostSerializer, UnknownFields)
+
+SAFE_METHODS = ('GET', 'HEAD')
+FORM_CONTENT_TYPES = ('application/x-www-form-urlencoded',
+                      'multipart/form-data')
+
+
+class ApiError(Exception):
+    def __init__(self, status, detail, **extra):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.extra = extra
+
+
+def api_view(*methods):
+    """Допустимые методы и ошибки в виде JSON {"detail": ...}."""
+    allowed = (*methods, 'HEAD') if 'GET' in methods else methods
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                response = JsonResponse(
+                    {'detail': f'Метод {request.method} не разрешён.'},
+                    status=405)
+                response['Allow'] = ', '.join(allowed)
+                return response
+            try:
+                return view(request, *args, **kwargs)
+            except ApiError as error:
+                return JsonResponse({'detail': error.detail, **error.extra},
+                                    status=error.status)
+            except Http404:
+                return JsonResponse({'detail': 'Не найдено.'}, status=404)
+            except UnknownFields as error:
+                return JsonResponse(
+                    {'detail': f'Неизвестные поля: {error}.'}, status=400)
+            except InvalidCursor:
+                return JsonResponse({'detail': 'Неверный курсор.'},
+                                    status=400)
+        return wrapper
+    return decorator
+
+
+def require_login(request):
+    if not request.user.is_authenticated:
+        raise ApiError(403, 'Учётные данные не были предоставлены.')
+
+
+def request_data(request):
+    """Тело запроса: JSON-объект или форма.
+
+    Django разбирает формы только в POST, поэтому для PATCH и PUT
+    urlencoded-тело разбирается здесь, а остальное отклоняется с 415.
+    """
+    if request.content_type != 'application/json':
+        if (request.method == 'POST'
+                and request.content_type in FORM_CONTENT_TYPES):
+            return request.POST.dict()
+        if request.content_type == FORM_CONTENT_TYPES[0]:
+            return QueryDict(request.body, encoding=request.encoding).dict()
+        if not request.body:
+            return {}
+        raise ApiError(
+            415, f'Неподдерживаемый тип данных: {request.content_type}.')
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError(400, 'Тело запроса — не JSON.')
+    if not isinstance(data, dict):
+        raise ApiError(400, 'Ожидается JSON-объект.')
+    return data
+
+
+def invalid(form):
+    return ApiError(400, 'Данные не прошли проверку.',
+                    errors=form.errors.get_json_data())
+
+
+def page_size(request):
+    try:
+        limit = int(request.GET.get(
+            'limit', settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE))
+    except ValueError:
+        raise ApiError(400, 'limit должен быть числом.')
+    return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def paginated(request, queryset, serializer, ordering):
+    """Страница курсорной пагинации по строкам values()."""
+    keys = [name.lstrip('-') for name in ordering]
+    paginator = CursorPaginator(serializer.values(queryset, keys),
+                                page_size(request), ordering)
+    page = paginator.page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': serializer.many(page),
+        'next': page_url(request, page.next_cursor),
+        'previous': page_url(request, page.previous_cursor),
+    })
+
+
+def created(serializer, queryset, location):
+    response = JsonResponse(serializer.one(queryset), status=201)
+    response['Location'] = location
+    return response
+
+
+def posts_scopes(request):
+    return [INDEX_SCOPE, GROUPS_SCOPE]
+
+
+def post_detail_scopes(request, post_id):
+    return [post_scope(post_id), GROUPS_SCOPE]
+
+
+def comments_scopes(request, post_id):
+    return [post_scope(post_id)]
+
+
+def groups_scopes(request, slug=None):
+    return [GROUPS_SCOPE]
+
+
+def follows_scopes(request):
+    if not request.user.is_authenticated:
+        return None
+    return [follow_scope(request.user.pk)]
+
+
+@bounded_uploads
+@conditional_feed(posts_scopes)
+@api_view('GET', 'POST')
+def post_list(request):
+    if request.method == 'POST':
+        return create_post(request)
+    serializer = PostSerializer(request.GET.get('fields'))
+    posts = Post.objects.all()
+    if 'author' in request.GET:
+        posts = posts.filter(author__username=request.GET['author'])
+    if 'group' in request.GET:
+        posts = posts.filter(group__slug=request.GET['group'])
+    return paginated(request, posts, serializer, ('-pub_date', '-id'))
+
+
+@transaction.atomic
+def create_post(request):
+    require_login(request)
+    form = ApiPostForm(request_data(request), files=request.FILES or None)
+    if not form.is_valid():
+        raise invalid(form)
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    queue_thumbnail(post)
+    return created(PostSerializer(), Post.objects.filter(pk=post.pk),
+                   reverse('api:post', args=(post.pk,)))
+
+
+@conditional_feed(post_detail_scopes)
+@api_view('GET', 'PATCH', 'DELETE')
+def post_detail(request, post_id):
+    if request.method in SAFE_METHODS:
+        data = PostSerializer(request.GET.get('fields')).one(
+            Post.objects.filter(pk=post_id))
+        if data is None:
+            raise Http404
+        return JsonResponse(data)
+    require_login(request)
+    with transaction.atomic():
+        post = get_object_or_404(Post.objects.select_related('group'),
+                                 pk=post_id)
+        if request.user.pk != post.author_id:
+            raise ApiError(403, 'Изменять пост может только автор.')
+        if request.method == 'DELETE':
+            post.delete()
+            return HttpResponse(status=204)
+        data = {
+            'text': post.text,
+            'group': post.group.slug if post.group else '',
+            **request_data(request),
+        }
+        form = ApiPostForm(data, instance=post)
+        if not form.is_valid():
+            raise invalid(form)
+        form.save()
+    return JsonResponse(PostSerializer().one(Post.objects.filter(pk=post_id)))
+
+
+@conditional_feed(comments_scopes)
+@api_view('GET', 'POST')
+def comment_list(request, post_id):
+    if request.method == 'POST':
+        return create_comment(request, post_id)
+    serializer = CommentSerializer(request.GET.get('fields'))
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    comments = Comment.objects.filter(post_id=post_id)
+    return paginated(request, comments, serializer, ('created', 'id'))
+
+
+@transaction.atomic
+def create_comment(request, post_id):
+    require_login(request)
+    post = get_object_or_404(Post, pk=post_id)
+    form = CommentForm(request_data(request))
+    if not form.is_valid():
+        raise invalid(form)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post = post
+    comment.save()
+    return created(CommentSerializer(),
+                   Comment.objects.filter(pk=comment.pk),
+                   reverse('api:comments', args=(post_id,)))
+
+
+@conditional_feed(groups_scopes)
+@api_view('GET')
+def group_list(request):
+    serializer = GroupSerializer(request.GET.get('fields'))
+    return paginated(request, Group.objects.all(), serializer, ('id',))
+
+
+@conditional_feed(groups_scopes)
+@api_view('GET')
+def group_detail(request, slug):
+    data = GroupSerializer(request.GET.get('fields')).one(
+        Group.objects.filter(slug=slug))
+    if data is None:
+        raise Http404
+    return JsonResponse(data)
+
+
+@conditional_feed(follows_scopes)
+@api_view('GET', 'POST')
+def follow_list(request):
+    require_login(request)
+    if request.method == 'POST':
+        return create_follow(request)
+    serializer = FollowSerializer(request.GET.get('fields'))
+    follows = Follow.objects.filter(user=request.user)
+    return paginated(request, follows, serializer, ('id',))
+
+
+@transaction.atomic
+def create_follow(request):
+    username = request_data(request).get('author')
+    author = get_object_or_404(User, username=username)
+    if author == request.user:
+        raise ApiError(400, 'Нельзя подписаться на самого себя.')
+    follow, is_new = Follow.objects.get_or_create(user=request.user,
+                                                  author=author)
+    queryset = Follow.objects.filter(pk=follow.pk)
+    location = reverse('api:follow', args=(author.username,))
+    if is_new:
+        return created(FollowSerializer(), queryset, location)
+    return JsonResponse(FollowSerializer().one(queryset))
+
+
+@api_view('DELETE')
+@transaction.atomic
+def follow_detail(request, username):
+    require_login(request)
+    deleted, _ = Follow.objects.filter(
+        user=request.user, author__username=username).delete()
+    if not deleted:
+        raise Http404
+    return HttpResponse(status=204)
@@ -1,11 +1,12 @@
 from django.contrib import admin
 
-from .models import Comment, Group, Post
+from .models import Comment, Group, Post, ProfileStats
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group',
+                    'comment_count')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
@@ -23,3 +24,11 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('post', 'text', 'author', 'created')
     search_fields = ('text',)
     list_filter = ('created',)
+
+
+@admin.register(ProfileStats)
+class ProfileStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'posts_count', 'followers_count',
+                    'following_count')
+    search_fields = ('user__username',)
+    readonly_fields = ('posts_count', 'followers_count', 'following_count')
@@ -0,0 +1,257 @@
+"""
+Нагрузочные замеры основных страниц на сгенерированном наборе данных.
+
+Используется командой benchmark: она создаёт отдельную тестовую базу,
+заполняет её posts.seeding.seed и прогоняет сценарии run_benchmarks.
+"""
+import asyncio
+import random
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from io import BytesIO
+from time import perf_counter, sleep
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from yatube.asgi import WSGIBridge
+
+from .models import Group, Post, User
+
+# Доля постов с изображением в наборе для замеров
+IMAGE_RATIO = 0.1
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(int(round(share * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def scenarios(rng):
+    """Сценарии: имя и функция, которая по клиенту делает один запрос."""
+    reader = (User.objects.order_by('-stats__following_count')
+              .values_list('username', flat=True).first())
+    author = (User.objects.order_by('-stats__posts_count')
+              .values_list('username', flat=True).first())
+    group = (Group.objects.order_by('-pk').values_list('slug', flat=True)
+             .first())
+    posts = list(Post.objects.order_by('pk').values_list(
+        'pk', 'author__username'))
+    posts = rng.sample(posts, min(len(posts), 200))
+
+    def random_post():
+        post_id, username = rng.choice(posts)
+        return username, post_id
+
+    return reader, {
+        'index': lambda client: client.get(reverse('index')),
+        'posts_group': lambda client: client.get(
+            reverse('posts_group', args=(group,))),
+        'profile': lambda client: client.get(
+            reverse('profile', args=(author,))),
+        'post_view': lambda client: client.get(
+            reverse('post', args=random_post())),
+        'follow_index': lambda client: client.get(reverse('follow_index')),
+        'add_comment': lambda client: client.post(
+            reverse('add_comment', args=random_post()),
+            {'text': 'Комментарий из замера'}),
+    }
+
+
+class QueryCounter:
+    """Считает SQL-запросы запроса, в том числе из потоков
+    posts.concurrent, куда обёртка копируется."""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+
+    def __len__(self):
+        return self.count
+
+
+def run_benchmarks(iterations=200, warmup=20, seed=0, names=None):
+    """Прогоняет сценарии и возвращает метрики по каждому из них."""
+    rng = random.Random(seed)
+    reader, available = scenarios(rng)
+    client = Client()
+    client.force_login(User.objects.get(username=reader))
+    results = {}
+    for name, request in available.items():
+        if names and name not in names:
+            continue
+        for _ in range(warmup):
+            request(client)
+        timings, queries = [], []
+        started = perf_counter()
+        for _ in range(iterations):
+            with QueryCounter() as context:
+                begin = perf_counter()
+                response = request(client)
+                timings.append(perf_counter() - begin)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f'{name}: ответ {response.status_code}')
+            queries.append(len(context))
+        elapsed = perf_counter() - started
+        results[name] = {
+            'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'queries': round(statistics.mean(queries), 2),
+            'rps': round(iterations / elapsed, 1),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance=0.1):
+    """Сравнивает с базовой линией; возвращает строки о регрессиях.
+
+    Задержка может вырасти не больше чем на tolerance, число
+    запросов к базе расти не должно вовсе.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: {metric} {previous[metric]} → '
+                    f'{current[metric]}')
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f'{name}: queries {previous["queries"]} → '
+                f'{current["queries"]}')
+    return regressions
+
+
+def http_scope(path):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+
+def summarize(timings, elapsed):
+    return {
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'rps': round(len(timings) / elapsed, 1),
+    }
+
+
+def measure_wsgi(bridge, path, clients, requests, threads, client_delay):
+    """WSGI-сервер с threads потоками: поток занят и view, и отправкой
+    ответа медленному клиенту."""
+    workers = threading.BoundedSemaphore(threads)
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    def request():
+        begin = perf_counter()
+        with workers:
+            environ = bridge.environ(http_scope(path), BytesIO())
+            result = bridge.wsgi_application(environ, start_response)
+            try:
+                for _ in result:
+                    sleep(client_delay)
+            finally:
+                result.close()
+        return perf_counter() - begin
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        timings = list(executor.map(lambda _: request(), range(requests)))
+    elapsed = perf_counter() - started
+    if any(not status.startswith('200') for status in statuses):
+        raise RuntimeError(f'WSGI: ответы {set(statuses)}')
+    return summarize(timings, elapsed)
+
+
+def measure_asgi(bridge, path, clients, requests, client_delay):
+    """Тот же запрос через WSGIBridge: медленные клиенты ждут в цикле
+    событий, потоки пула заняты только view."""
+    async def request(statuses):
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif message.get('body'):
+                await asyncio.sleep(client_delay)
+
+        begin = perf_counter()
+        await bridge(http_scope(path), receive, send)
+        return perf_counter() - begin
+
+    async def run():
+        statuses = []
+        limit = asyncio.Semaphore(clients)
+
+        async def limited():
+            async with limit:
+                return await request(statuses)
+
+        timings = await asyncio.gather(
+            *(limited() for _ in range(requests)))
+        if any(status != 200 for status in statuses):
+            raise RuntimeError(f'ASGI: ответы {set(statuses)}')
+        return list(timings)
+
+    started = perf_counter()
+    timings = asyncio.run(run())
+    return summarize(timings, perf_counter() - started)
+
+
+def compare_servers(path='/', levels=(1, 8, 32), requests=200, threads=8,
+                    client_delay=0.05):
+    """Пропускная способность WSGI и ASGI при разном числе клиентов.
+
+    Оба варианта получают threads потоков для Django; client_delay
+    изображает медленную отправку ответа клиенту.
+    """
+    bridge = WSGIBridge(WSGIHandler(), threads, 2 ** 20)
+    results = {}
+    try:
+        for clients in levels:
+            results[clients] = {
+                'wsgi': measure_wsgi(bridge, path, clients, requests,
+                                     threads, client_delay),
+                'asgi': measure_asgi(bridge, path, clients, requests,
+                                     client_delay),
+            }
+    finally:
+        if bridge.executor is not None:
+            bridge.executor.shutdown()
+    return results
@@ -0,0 +1,159 @@
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from yatube.db_router import (may_lag_behind, read_primary_if_lagging,
+                              replica_allowed)
+
+from .models import Follow
+from .timeline import is_celebrity
+
+VERSION_KEY = 'feed-version:{}'
+CARD_KEY = 'post-card:{}:{}'
+GROUPS_SCOPE = 'groups'
+INDEX_SCOPE = 'index'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def profile_scope(user_id):
+    return f'profile:{user_id}'
+
+
+def follow_scope(user_id):
+    return f'follow:{user_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def stats_scope(user_id):
+    return f'stats:{user_id}'
+
+
+def new_version():
+    """Поколение: время создания в миллисекундах и случайный хвост."""
+    return f'{int(time.time() * 1000):x}.{uuid.uuid4().hex[:6]}'
+
+
+def version_time(version):
+    """Время, когда сменилось самое свежее из поколений версии."""
+    try:
+        created = max(int(part.split('.')[0], 16)
+                      for part in version.split('-') if '.' in part)
+        return datetime.fromtimestamp(created / 1000, timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def scope_versions(scopes):
+    """Поколения областей одним get_many; недостающие создаются.
+
+    Если какое-то поколение моложе отставания реплики, дальше запрос
+    читает основную базу.
+    """
+    keys = {scope: VERSION_KEY.format(scope) for scope in scopes}
+    versions = cache.get_many(keys.values())
+    for key in keys.values():
+        if key not in versions:
+            cache.add(key, new_version(), None)
+            versions[key] = cache.get(key)
+    versions = {scope: str(versions[key]) for scope, key in keys.items()}
+    if versions:
+        read_primary_if_lagging(version_time('-'.join(versions.values())))
+    return versions
+
+
+def feed_version(scopes):
+    """Склеивает поколения областей кэша в одну строку-версию."""
+    versions = scope_versions(scopes)
+    return '-'.join(versions[scope] for scope in scopes)
+
+
+def bump(*scopes):
+    """Сбрасывает поколения областей: старые фрагменты больше не совпадут."""
+    cache.set_many(
+        {VERSION_KEY.format(scope): new_version() for scope in scopes}, None)
+
+
+def bump_post_scopes(author_id, *group_ids, post_id=None):
+    """Инвалидирует все ленты, в которых виден пост автора,
+    и страницу самого поста."""
+    scopes = [INDEX_SCOPE, profile_scope(author_id)]
+    if post_id is not None:
+        scopes.append(post_scope(post_id))
+    scopes += [group_scope(group_id) for group_id in set(group_ids)
+               if group_id]
+    if not is_celebrity(author_id):
+        follower_ids = Follow.objects.filter(
+            author_id=author_id).values_list('user_id', flat=True)
+        scopes += [follow_scope(user_id) for user_id in follower_ids]
+    bump(*scopes)
+
+
+def cached_fragment(fragment_name, scopes, vary_on, render):
+    """Фрагмент живёт, пока не сменится версия его областей.
+
+    Пересчитывает устаревший фрагмент только один процесс, остальные
+    в это время отдают предыдущую копию. Неиспользуемые фрагменты
+    истекают через POSTS_FEED_CACHE_TIMEOUT.
+    """
+    key = make_template_fragment_key(fragment_name, [*scopes, *vary_on])
+    version = feed_version(scopes)
+    stale = None
+    entry = cache.get(key)
+    if entry is not None:
+        cached_version, stale = entry
+        if cached_version == version:
+            return stale
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, settings.POSTS_FEED_CACHE_LOCK_TIMEOUT):
+        try:
+            html = render()
+            cache.set(key, [version, html],
+                      settings.POSTS_FEED_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return html
+    if stale is not None:
+        return stale
+    return render()
+
+
+def cached_cards(posts, render):
+    """HTML карточек постов: {id: html}.
+
+    Карточка живёт, пока не сменится поколение её поста или групп.
+    Поколения и готовые карточки читаются двумя get_many на всю
+    страницу, недостающие рендерятся и сохраняются одним set_many.
+    Посты уже прочитаны, поэтому карточки из реплики со свежим
+    поколением не сохраняются: реплика могла не знать о правке.
+    """
+    from_replica = replica_allowed()
+    versions = scope_versions(
+        [GROUPS_SCOPE, *(post_scope(post.pk) for post in posts)])
+    card_versions = {
+        post.pk: f'{versions[post_scope(post.pk)]}-{versions[GROUPS_SCOPE]}'
+        for post in posts
+    }
+    keys = {post.pk: CARD_KEY.format(post.pk, card_versions[post.pk])
+            for post in posts}
+    cards = cache.get_many(keys.values())
+    missing = {}
+    for post in posts:
+        key = keys[post.pk]
+        if key not in cards:
+            cards[key] = render(post)
+            if not (from_replica and may_lag_behind(
+                    version_time(card_versions[post.pk]))):
+                missing[key] = cards[key]
+    if missing:
+        cache.set_many(missing, settings.POSTS_CARD_CACHE_TIMEOUT)
+    return {post.pk: cards[keys[post.pk]] for post in posts}
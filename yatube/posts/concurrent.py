@@ -0,0 +1,84 @@
+"""
+Параллельные независимые запросы к базе внутри одного view.
+
+Каждая функция выполняется в потоке пула со своим соединением (из пула
+соединений), так что время ответа определяет самый долгий запрос, а не
+их сумма. Внутри транзакции всё выполняется по очереди в текущем
+потоке: другие соединения не видят её незафиксированных изменений.
+
+Поток пула не ждёт соединения: если свободного нет (все заняты
+потоками запросов), функция выполняется в потоке запроса на его
+соединении. Так параллельные запросы не могут исчерпать пул и
+оставить запрос ждать соединения, пока он сам держит своё.
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections
+
+from yatube.db_router import replica_allowed, set_replica_allowed
+from yatube.pool.pool import PoolTimeout, without_waiting
+
+# Результат потока пула, которому не хватило соединения
+BUSY = object()
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.POSTS_PARALLEL_QUERIES,
+            thread_name_prefix='queries')
+    return _executor
+
+
+def in_transaction():
+    return any(connection.in_atomic_block for connection in connections.all())
+
+
+def execute_wrappers():
+    """Обёртки запросов текущего потока (метрики, замеры) по базам."""
+    return {connection.alias: list(connection.execute_wrappers)
+            for connection in connections.all()}
+
+
+def run_in_worker(func, replica, wrappers):
+    set_replica_allowed(replica)
+    for alias, alias_wrappers in wrappers.items():
+        connections[alias].execute_wrappers[:] = alias_wrappers
+    try:
+        with without_waiting():
+            return func()
+    except PoolTimeout:
+        return BUSY
+    finally:
+        set_replica_allowed(False)
+        for alias in wrappers:
+            connections[alias].execute_wrappers.clear()
+        connections.close_all()
+
+
+def parallel(*funcs):
+    """Вызывает функции одновременно и возвращает их результаты по порядку.
+
+    Первая функция выполняется в текущем потоке. Исключение из любой
+    функции поднимается после того, как завершатся остальные.
+    """
+    if (not settings.POSTS_PARALLEL_QUERIES or len(funcs) < 2
+            or in_transaction()):
+        return [func() for func in funcs]
+    replica = replica_allowed()
+    wrappers = execute_wrappers()
+    futures = [get_executor().submit(run_in_worker, func, replica, wrappers)
+               for func in funcs[1:]]
+    try:
+        first = funcs[0]()
+    finally:
+        wait(futures)
+    results = [first]
+    for func, future in zip(funcs[1:], futures):
+        result = future.result()
+        results.append(func() if result is BUSY else result)
+    return results
@@ -0,0 +1,108 @@
+"""
+Условные GET (ETag / Last-Modified) для лент и страниц постов.
+
+Валидаторы собираются из поколений областей кэша (posts.cache) без
+рендеринга шаблона: на повторный запрос без изменений уходит один
+индексный запрос к базе и одно чтение кэша.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.timezone import now
+
+from yatube.events.sse import ENVIRON_KEY
+from django.views.decorators.http import condition
+
+from .cache import (GROUPS_SCOPE, INDEX_SCOPE, feed_version, follow_scope,
+                    group_scope, post_scope, profile_scope, stats_scope,
+                    version_time)
+from .models import Group, Post
+
+User = get_user_model()
+
+
+def viewer_scopes(request):
+    if request.user.is_authenticated:
+        return [follow_scope(request.user.pk)]
+    return []
+
+
+def index_scopes(request):
+    return [INDEX_SCOPE, GROUPS_SCOPE]
+
+
+def group_scopes(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True).first()
+    if group_id is None:
+        return None
+    return [group_scope(group_id), GROUPS_SCOPE]
+
+
+def profile_scopes(request, username):
+    user_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True).first()
+    if user_id is None:
+        return None
+    return [profile_scope(user_id), stats_scope(user_id), GROUPS_SCOPE,
+            *viewer_scopes(request)]
+
+
+def post_scopes(request, username, post_id):
+    author_id = Post.objects.filter(
+        pk=post_id, author__username=username).values_list(
+        'author_id', flat=True).first()
+    if author_id is None:
+        return None
+    return [post_scope(post_id), stats_scope(author_id), GROUPS_SCOPE]
+
+
+def last_modified(version):
+    """Last-Modified для версии с точностью HTTP-даты (до секунды).
+
+    Время поколения округляется вверх. Пока эта секунда не прошла, в ней
+    может смениться поколение с той же датой, и If-Modified-Since дал бы
+    устаревший 304, поэтому до её конца остаётся только ETag.
+    """
+    changed = version_time(version)
+    if changed is None:
+        return None
+    if changed.microsecond:
+        changed = changed.replace(microsecond=0) + timedelta(seconds=1)
+    if changed > now():
+        return None
+    return changed
+
+
+def validators(request, scopes_func, *args, **kwargs):
+    """(ETag, Last-Modified) для запроса; None, если объекта нет.
+
+    Кроме версии данных ETag учитывает пользователя, CSRF-cookie и
+    ASGI-мост: от них зависят меню, формы и поток событий на странице.
+    Области и их версия остаются в request.feed_scopes для кэша страниц.
+    """
+    if not hasattr(request, 'feed_validators'):
+        scopes = scopes_func(request, *args, **kwargs)
+        request.feed_validators = (None, None)
+        if scopes is not None:
+            version = feed_version(scopes)
+            request.feed_scopes = (scopes, version)
+            parts = [settings.POSTS_ETAG_SALT, version,
+                     str(request.user.pk or ''),
+                     request.META.get('CSRF_COOKIE', ''),
+                     str(ENVIRON_KEY in request.META)]
+            etag = hashlib.md5('|'.join(parts).encode()).hexdigest()
+            request.feed_validators = (etag, last_modified(version))
+    return request.feed_validators
+
+
+def conditional_feed(scopes_func):
+    """Отвечает 304, если версии областей scopes_func не сменились."""
+    return condition(
+        etag_func=lambda request, *args, **kwargs: validators(
+            request, scopes_func, *args, **kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: validators(
+            request, scopes_func, *args, **kwargs)[1],
+    )
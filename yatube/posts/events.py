@@ -0,0 +1,28 @@
+"""Каналы событий о новых постах: общий для главной и по автору."""
+from yatube.events.brokers import get_broker
+
+from .models import Follow
+
+FEED_CHANNEL = 'posts'
+
+
+def author_channel(author_id):
+    return f'author:{author_id}'
+
+
+def feed_channels(user, feed):
+    """Каналы ленты feed ('index' или 'follow'); None — ленты нет."""
+    if feed == 'index':
+        return [FEED_CHANNEL]
+    if feed == 'follow' and user.is_authenticated:
+        author_ids = Follow.objects.filter(user=user).values_list(
+            'author_id', flat=True)
+        return [author_channel(author_id) for author_id in author_ids]
+    return None
+
+
+def publish_new_post(post_id, author_id):
+    message = {'post': post_id, 'author': author_id}
+    broker = get_broker()
+    broker.publish(FEED_CHANNEL, message)
+    broker.publish(author_channel(author_id), message)
@@ -1,6 +1,9 @@
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 
 from .models import Comment, Post
+from .uploads import check_upload_size, prepare_image
 
 
 class PostForm(ModelForm):
@@ -12,6 +15,25 @@ class PostForm(ModelForm):
             'text': 'Введите текст.',
         }
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            return prepare_image(image)
+        return image
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = self.files.get(self.add_prefix('image'))
+        if upload is not None and 'image' in self._errors:
+            # Заглушка вместо слишком большого файла не открывается как
+            # изображение, поэтому вместо «битого файла» сообщаем о размере.
+            try:
+                check_upload_size(upload)
+            except ValidationError as error:
+                del self._errors['image']
+                self.add_error('image', error)
+        return cleaned_data
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -0,0 +1,132 @@
+import json
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+from posts.benchmark import (IMAGE_RATIO, compare, compare_servers,
+                             run_benchmarks)
+from posts.seeding import SCALES, seed
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку, число запросов и пропускную способность '
+            'основных страниц на сгенерированных данных в отдельной базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='small',
+            help='Размер набора данных.')
+        parser.add_argument(
+            '--iterations', type=int, default=200,
+            help='Запросов на сценарий.')
+        parser.add_argument(
+            '--warmup', type=int, default=20,
+            help='Запросов на прогрев перед замером.')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора данных и выбора страниц.')
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Запустить только этот сценарий (можно повторять).')
+        parser.add_argument(
+            '--baseline',
+            help='JSON с прошлыми результатами для сравнения.')
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результаты в файл --baseline.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.1,
+            help='Допустимый рост задержки относительно базовой линии.')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не пересоздавать базу, если данные уже сгенерированы.')
+        parser.add_argument(
+            '--servers', action='store_true',
+            help='Вместо сценариев сравнить WSGI и ASGI под нагрузкой.')
+        parser.add_argument(
+            '--path', default='/',
+            help='Адрес страницы для --servers.')
+        parser.add_argument(
+            '--concurrency', type=int, action='append',
+            help='Число одновременных клиентов для --servers '
+                 '(можно повторять).')
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Потоков Django у каждого сервера для --servers.')
+        parser.add_argument(
+            '--client-delay', type=float, default=0.05,
+            help='Секунд на отправку ответа медленному клиенту.')
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline требует --baseline.')
+        if options['servers'] and options['baseline']:
+            raise CommandError('--servers не сравнивается с --baseline.')
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        media_root = tempfile.mkdtemp(prefix='yatube-benchmark-')
+        try:
+            with override_settings(MEDIA_ROOT=media_root,
+                                   POSTS_THUMBNAIL_WORKERS=0):
+                results = self.measure(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+        if options['servers']:
+            self.report_servers(results)
+        else:
+            self.report(results, options)
+
+    def measure(self, options):
+        from posts.models import Post
+
+        if not Post.objects.exists():
+            self.stdout.write(f'Генерация набора «{options["scale"]}»...')
+            seed(images=IMAGE_RATIO, seed=options['seed'],
+                 **SCALES[options['scale']])
+        if options['servers']:
+            return compare_servers(
+                options['path'], options['concurrency'] or (1, 8, 32),
+                options['iterations'], options['threads'],
+                options['client_delay'])
+        return run_benchmarks(options['iterations'], options['warmup'],
+                              options['seed'], options['scenarios'])
+
+    def report_servers(self, results):
+        self.stdout.write(f'{"клиентов":<10}{"сервер":<8}{"p50, мс":>10}'
+                          f'{"p99, мс":>10}{"rps":>10}')
+        for clients, servers in results.items():
+            for server, row in servers.items():
+                self.stdout.write(
+                    f'{clients:<10}{server:<8}{row["p50_ms"]:>10}'
+                    f'{row["p99_ms"]:>10}{row["rps"]:>10}')
+
+    def report(self, results, options):
+        self.stdout.write(f'{"сценарий":<14}{"p50, мс":>10}{"p99, мс":>10}'
+                          f'{"запросов":>10}{"rps":>10}')
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<14}{row["p50_ms"]:>10}{row["p99_ms"]:>10}'
+                f'{row["queries"]:>10}{row["rps"]:>10}')
+        path = options['baseline']
+        if not path:
+            return
+        if options['save_baseline']:
+            with open(path, 'w') as baseline_file:
+                json.dump(results, baseline_file, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f'Сохранено в {path}.'))
+            return
+        with open(path) as baseline_file:
+            regressions = compare(results, json.load(baseline_file),
+                                  options['tolerance'])
+        if regressions:
+            raise CommandError('Регрессии:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
@@ -0,0 +1,40 @@
+import os
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import Post
+from posts.stats import chunked
+from posts.thumbnails import generate_thumbnails_chunk
+
+
+class Command(BaseCommand):
+    help = 'Строит недостающие миниатюры изображений постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Число параллельных процессов.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=100,
+            help='Сколько постов отдавать процессу за раз.')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить и уже готовые миниатюры.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            posts = posts.filter(thumbnail_url='')
+        post_ids = list(posts.values_list('pk', flat=True))
+        chunks = chunked(post_ids, options['chunk_size'])
+        if options['processes'] > 1:
+            connections.close_all()
+            with get_context('fork').Pool(options['processes']) as pool:
+                done = sum(pool.imap_unordered(generate_thumbnails_chunk,
+                                               chunks))
+        else:
+            done = sum(map(generate_thumbnails_chunk, chunks))
+        self.stdout.write(self.style.SUCCESS(
+            f'Построено миниатюр: {done} из {len(post_ids)}.'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.timeline import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = 'Заново собирает материализованные ленты подписок.'
+
+    def handle(self, *args, **options):
+        entries = rebuild_timelines()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в лентах подписок: {entries}.'))
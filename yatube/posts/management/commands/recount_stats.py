@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import reconcile_comment_counts, reconcile_profile_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики профилей и комментариев к постам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк обрабатывать за одну транзакцию.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        profiles = reconcile_profile_stats(batch_size)
+        posts = reconcile_comment_counts(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено профилей: {profiles}, постов: {posts}.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Post
+from posts.text import backfill_text_html
+
+
+class Command(BaseCommand):
+    help = 'Заполняет сохранённый HTML текста постов и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк обрабатывать за одну транзакцию.')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить и уже заполненный HTML.')
+
+    def handle(self, *args, **options):
+        batch_size, force = options['batch_size'], options['force']
+        posts = backfill_text_html(Post, batch_size, force)
+        comments = backfill_text_html(Comment, batch_size, force)
+        self.stdout.write(self.style.SUCCESS(
+            f'Заполнено постов: {posts}, комментариев: {comments}.'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.seeding import BATCH_SIZE, SCALES, seed
+
+
+class Command(BaseCommand):
+    help = ('Быстро заполняет базу синтетическими пользователями, группами, '
+            'постами, комментариями и подписками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='small',
+            help='Готовый размер набора; отдельные числа ниже его меняют.')
+        for name in SCALES['small']:
+            parser.add_argument(
+                f'--{name}', type=int,
+                help=f'Сколько добавить: {name}.')
+        parser.add_argument(
+            '--images', type=float, default=0,
+            help='Доля постов с изображением, от 0 до 1.')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одно зерно — один и тот же набор.')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Строк в одной пачке и транзакции.')
+
+    def handle(self, *args, **options):
+        sizes = dict(SCALES[options['scale']])
+        for name in sizes:
+            if options[name] is not None:
+                sizes[name] = options[name]
+        if sizes['posts'] and not sizes['users']:
+            # Посты достаются только новым пользователям: их счётчики
+            # и ленты загрузчик заполняет сам
+            raise CommandError('Для постов нужны новые пользователи: '
+                               'задайте --users больше 0.')
+        loaded = seed(images=options['images'], seed=options['seed'],
+                      batch_size=options['batch_size'], **sizes)
+        for name, count in loaded.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS('Готово.'))
@@ -0,0 +1,169 @@
+"""
+Кэш целых страниц для гостей.
+
+Запрос без cookie сессии и сообщений к одной из POSTS_PAGE_CACHE_VIEWS
+отдаётся из кэша до сессий, CSRF, аутентификации и шаблонов: попадание
+стоит двух чтений кэша и ни одного запроса к базе. Страница хранится
+вместе с областями posts.cache, из которых её собрал conditional_feed,
+и перестаёт совпадать, как только сигналы сменят версию любой из них.
+Рядом лежат её сжатые копии для yatube.compression, так что попадание
+не тратит процессор и на сжатие.
+"""
+import hashlib
+from base64 import b64decode, b64encode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import (cc_delim_re, get_conditional_response,
+                                has_vary_header)
+from django.utils.http import http_date, parse_http_date_safe
+
+from yatube.compression import compress_all, is_compressible
+from yatube.events.sse import ENVIRON_KEY
+from yatube.metrics.registry import registry
+
+from .cache import feed_version
+from .conditional import last_modified
+
+PAGE_KEY = 'page:{}'
+# Параметры, от которых зависит страница ленты; с любыми другими
+# запрос идёт мимо кэша, чтобы случайные строки не раздували его
+PAGE_PARAMS = ('page', 'cursor')
+SAFE_METHODS = ('GET', 'HEAD')
+
+registry.describe('yatube_page_cache_total',
+                  'Обращения к кэшу страниц для гостей.')
+
+
+def page_key(request):
+    params = sorted((name, request.GET[name]) for name in request.GET)
+    # Под ASGI на странице есть поток событий, под WSGI его нет
+    parts = [request.get_host(), request.path,
+             str(ENVIRON_KEY in request.META), *map('='.join, params)]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return PAGE_KEY.format(digest)
+
+
+def vary_headers(response):
+    """Заголовки Vary, кроме Cookie: гостевые запросы уже без сессии."""
+    if not response.has_header('Vary'):
+        return []
+    return [header for header in cc_delim_re.split(response['Vary'])
+            if header.lower() != 'cookie']
+
+
+def header_values(request, headers):
+    return [request.META.get('HTTP_' + header.upper().replace('-', '_'), '')
+            for header in headers]
+
+
+def is_anonymous(request):
+    return (settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and 'messages' not in request.COOKIES)
+
+
+def is_cacheable(request):
+    if (not settings.POSTS_PAGE_CACHE_TIMEOUT or settings.DEBUG
+            or request.method not in SAFE_METHODS
+            or not is_anonymous(request)
+            or any(name not in PAGE_PARAMS for name in request.GET)):
+        return False
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return False
+    if match.view_name not in settings.POSTS_PAGE_CACHE_VIEWS:
+        return False
+    request.resolver_match = match
+    return True
+
+
+def to_entry(request, response, scopes, version):
+    headers = vary_headers(response)
+    compressed = {}
+    if is_compressible(request, response):
+        compressed = {
+            encoding: b64encode(content).decode('ascii')
+            for encoding, content in compress_all(response.content).items()
+        }
+    return {
+        'scopes': scopes,
+        'version': version,
+        'vary': [headers, header_values(request, headers)],
+        'status': response.status_code,
+        'headers': [[name, value] for name, value in response.items()],
+        'content': response.content.decode(response.charset),
+        'compressed': compressed,
+    }
+
+
+def from_entry(entry):
+    response = HttpResponse(status=entry['status'])
+    for name, value in entry['headers']:
+        response[name] = value
+    response.content = entry['content']
+    response.precompressed = {
+        encoding: b64decode(content)
+        for encoding, content in entry.get('compressed', {}).items()
+    }
+    return response
+
+
+class AnonymousPageCacheMiddleware:
+    """Отдаёт гостям сохранённые ленты и страницы постов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_cacheable(request):
+            return self.get_response(request)
+        key = page_key(request)
+        response = self.cached_response(request, key)
+        if response is not None:
+            registry.inc('yatube_page_cache_total', result='hit')
+            return response
+        registry.inc('yatube_page_cache_total', result='miss')
+        response = self.get_response(request)
+        if self.should_store(request, response):
+            scopes, version = request.feed_scopes
+            cache.set(key, to_entry(request, response, scopes, version),
+                      settings.POSTS_PAGE_CACHE_TIMEOUT)
+        return response
+
+    def cached_response(self, request, key):
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        headers, values = entry['vary']
+        if header_values(request, headers) != values:
+            return None
+        if feed_version(entry['scopes']) != entry['version']:
+            return None
+        response = from_entry(entry)
+        if not response.has_header('Last-Modified'):
+            # Страница сохранена в секунду смены версии, когда дату
+            # ещё нельзя было отдавать; теперь её можно добавить
+            modified = last_modified(entry['version'])
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified.timestamp())
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')),
+            response=response,
+        )
+
+    def should_store(self, request, response):
+        return (
+            request.method == 'GET'
+            and response.status_code == 200
+            and hasattr(request, 'feed_scopes')
+            and not response.cookies
+            and not response.streaming
+            and not has_vary_header(response, '*')
+            and 'private' not in response.get('Cache-Control', '')
+        )
@@ -23,13 +23,33 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Подгружает автора и группу поста одним запросом."""
+        return self.select_related('author', 'group')
+
+
+class TextHtmlMixin:
+    """Запись text через update_fields записывает и text_html,
+    который строит сигнал pre_save."""
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is not None and 'text' in update_fields:
+            update_fields = {*update_fields, 'text_html'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class Post(TextHtmlMixin, models.Model):
     pub_date = models.DateTimeField(
         'Дата публикации',
         auto_now_add=True,
         db_index=True)
     text = models.TextField(
         verbose_name='Текст')
+    text_html = models.TextField(
+        verbose_name='Текст в HTML',
+        blank=True,
+        editable=False)
     author = models.ForeignKey(
         User,
         verbose_name='Автор',
@@ -48,9 +68,24 @@ class Post(models.Model):
         null=True,
         help_text='Выберите изображение',
         verbose_name='Изображение')
+    thumbnail_url = models.CharField(
+        verbose_name='Адрес миниатюры',
+        max_length=255,
+        blank=True,
+        editable=False)
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('group', '-pub_date')),
+            models.Index(fields=('author', '-pub_date')),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -58,7 +93,7 @@ class Post(models.Model):
         return self.text[:15]
 
 
-class Comment(models.Model):
+class Comment(TextHtmlMixin, models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -73,11 +108,18 @@ class Comment(models.Model):
         max_length=200,
         verbose_name='Текст комментария',
         help_text='Напишите комментарий!')
+    text_html = models.TextField(
+        verbose_name='Текст комментария в HTML',
+        blank=True,
+        editable=False)
     created = models.DateTimeField(
         'Дата публикации',
         auto_now_add=True)
 
     class Meta:
+        indexes = (
+            models.Index(fields=('post', 'created')),
+        )
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -91,3 +133,56 @@ class Follow(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='following')
+
+    class Meta:
+        unique_together = ('user', 'author')
+        indexes = (
+            models.Index(fields=('author', 'user')),
+        )
+
+
+class ProfileStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Пользователь')
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Записей',
+        default=0)
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков',
+        default=0)
+    following_count = models.PositiveIntegerField(
+        verbose_name='Подписок',
+        default=0)
+
+    class Meta:
+        verbose_name = 'Статистика профиля'
+        verbose_name_plural = 'Статистика профилей'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Читатель')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост')
+    pub_date = models.DateTimeField(
+        'Дата публикации')
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = (
+            models.Index(fields=('user', '-pub_date', '-post')),
+        )
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи ленты подписок'
@@ -0,0 +1,158 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_token(data):
+    """Упаковывает данные курсора в непрозрачную строку для URL."""
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError, binascii.Error) as error:
+        raise InvalidCursor(token) from error
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации, совместимая по интерфейсу с Page."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, cursor=None, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage {self.cursor or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу сортировки без COUNT(*) и OFFSET.
+
+    Все поля ordering должны сортироваться в одном направлении,
+    последнее поле обязано быть уникальным (обычно id). Работает и
+    с values(), если в строках есть все поля ordering.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+        model = object_list.model
+        self.model_fields = tuple(
+            model._meta.pk if name == 'pk' else model._meta.get_field(name)
+            for name in self.fields
+        )
+
+    def encode_cursor(self, direction, obj):
+        if isinstance(obj, dict):
+            # Строка из values(): ключи — имена полей ordering
+            obj = SimpleNamespace(**{
+                field.attname: obj[name]
+                for name, field in zip(self.fields, self.model_fields)
+            })
+        values = [
+            field.value_to_string(obj) for field in self.model_fields
+        ]
+        return encode_token([direction, values])
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, values = decode_token(cursor)
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.model_fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError) as error:
+            raise InvalidCursor(cursor) from error
+        return direction, values
+
+    def keyset_filter(self, values, after):
+        """Условие «строго после ключа» (или «строго до» при after=False)."""
+        lookup = 'lt' if self.descending == after else 'gt'
+        condition = Q()
+        for position, name in enumerate(self.fields):
+            prefix = dict(zip(self.fields[:position], values[:position]))
+            prefix[f'{name}__{lookup}'] = values[position]
+            condition |= Q(**prefix)
+        return condition
+
+    def reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    def page(self, cursor=None):
+        queryset = self.object_list
+        direction = NEXT
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                self.keyset_filter(values, after=direction == NEXT))
+        if direction == NEXT:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            queryset = queryset.order_by(*self.reversed_ordering())
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if direction == NEXT:
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        next_cursor = previous_cursor = None
+        if items and has_next:
+            next_cursor = self.encode_cursor(NEXT, items[-1])
+        if items and has_previous:
+            previous_cursor = self.encode_cursor(PREVIOUS, items[0])
+        return CursorPage(items, self, cursor, next_cursor, previous_cursor)
+
+    def get_page(self, cursor=None):
+        """Как Paginator.get_page: битый курсор ведёт на первую страницу."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
@@ -0,0 +1,145 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Group, Post, User
+
+FTS_TABLE = 'posts_post_fts'
+WORD_RE = re.compile(r'\w+')
+
+
+class BaseSearchBackend:
+    """Интерфейс поискового индекса постов.
+
+    search() возвращает список пар (id поста, ранг), отсортированных
+    по возрастанию ранга, затем по убыванию id; after — пара, после
+    которой продолжить выдачу.
+    """
+
+    def index_posts(self, post_ids):
+        pass
+
+    def index_group(self, group_id):
+        pass
+
+    def index_author(self, author_id):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query, limit, after=None):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Полнотекстовый индекс на виртуальной таблице SQLite FTS5."""
+
+    @staticmethod
+    def create_table(cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+            "text, group_title, author_name, tokenize='unicode61')"
+        )
+
+    @staticmethod
+    def fill_sql(condition=''):
+        return (
+            f'INSERT INTO {FTS_TABLE} '
+            '(rowid, text, group_title, author_name) '
+            "SELECT p.id, p.text, COALESCE(g.title, ''), "
+            "u.username || ' ' || u.first_name || ' ' || u.last_name "
+            f'FROM {Post._meta.db_table} p '
+            f'JOIN {User._meta.db_table} u ON u.id = p.author_id '
+            f'LEFT JOIN {Group._meta.db_table} g ON g.id = p.group_id '
+            f'{condition}'
+        )
+
+    def index_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                post_ids)
+            cursor.execute(
+                self.fill_sql(f'WHERE p.id IN ({placeholders})'), post_ids)
+
+    def index_group(self, group_id):
+        self.index_posts(Post.objects.filter(
+            group_id=group_id).values_list('pk', flat=True))
+
+    def index_author(self, author_id):
+        self.index_posts(Post.objects.filter(
+            author_id=author_id).values_list('pk', flat=True))
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [post_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(self.fill_sql())
+
+    @staticmethod
+    def match_expression(query):
+        words = WORD_RE.findall(query)
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def search(self, query, limit, after=None):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        sql = (
+            'SELECT id, rank FROM ('
+            f'SELECT rowid AS id, bm25({FTS_TABLE}, 1.0, 2.0, 2.0) AS rank '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) '
+        )
+        params = [expression]
+        if after is not None:
+            sql += 'WHERE rank > %s OR (rank = %s AND id < %s) '
+            params += [after[0], after[0], after[1]]
+        sql += 'ORDER BY rank, id DESC LIMIT %s'
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(post_id, rank) for post_id, rank in cursor.fetchall()]
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Запасной вариант без индекса: поиск подстроки, новые посты выше."""
+
+    def search(self, query, limit, after=None):
+        words = WORD_RE.findall(query)
+        if not words:
+            return []
+        condition = Q()
+        for word in words:
+            condition &= (Q(text__icontains=word)
+                          | Q(group__title__icontains=word)
+                          | Q(author__username__icontains=word)
+                          | Q(author__first_name__icontains=word)
+                          | Q(author__last_name__icontains=word))
+        posts = Post.objects.filter(condition).order_by('-id')
+        if after is not None:
+            posts = posts.filter(id__lt=after[1])
+        return [(post_id, 0) for post_id in
+                posts.values_list('pk', flat=True)[:limit]]
+
+
+def get_search_backend():
+    if settings.POSTS_SEARCH_BACKEND:
+        return import_string(settings.POSTS_SEARCH_BACKEND)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    return DatabaseSearchBackend()
@@ -0,0 +1,372 @@
+"""
+Быстрое заполнение базы синтетическими данными для стендов и замеров.
+
+Строки не проходят через модели: на SQLite они пишутся executemany
+с ослабленными PRAGMA, на PostgreSQL — через COPY, на остальных базах —
+executemany. Счётчики профилей и комментариев, ленты подписок и
+поисковый индекс заполняются сразу, сигналы не срабатывают.
+"""
+import random
+from array import array
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, partial
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+
+from .cache import GROUPS_SCOPE, INDEX_SCOPE, bump
+from .models import (Comment, Follow, Group, Post, ProfileStats,
+                     TimelineEntry, User)
+from .search import get_search_backend
+from .stats import chunked
+from .text import render_text
+from .thumbnails import THUMBNAIL_GEOMETRY, THUMBNAIL_OPTIONS
+
+SCALES = {
+    'tiny': {'users': 50, 'groups': 5, 'posts': 500, 'comments': 500,
+             'follows': 300},
+    'small': {'users': 2000, 'groups': 50, 'posts': 50000,
+              'comments': 50000, 'follows': 20000},
+    'large': {'users': 100000, 'groups': 500, 'posts': 1000000,
+              'comments': 1000000, 'follows': 2000000},
+}
+
+BATCH_SIZE = 10000
+SAMPLE_IMAGES = 5
+START_DATE = datetime(2021, 1, 1, tzinfo=timezone.utc)
+PERIOD = timedelta(days=365)
+
+WORDS = (
+    'лес', 'река', 'город', 'утро', 'поезд', 'книга', 'кофе', 'ветер',
+    'дорога', 'музыка', 'снег', 'море', 'друг', 'окно', 'вечер', 'письмо',
+)
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Лев', 'Вера')
+LAST_NAMES = ('Иванова', 'Петров', 'Смирнова', 'Толстой', 'Орлова')
+
+# Значения этих полей драйвер базы принимает как есть
+PLAIN_FIELDS = {
+    'AutoField', 'BooleanField', 'CharField', 'FileField', 'ForeignKey',
+    'ImageField', 'IntegerField', 'OneToOneField', 'PositiveIntegerField',
+    'SlugField', 'TextField',
+}
+
+
+class ExecutemanyLoader:
+    """Пишет строки пачками через executemany, каждая пачка — транзакция."""
+
+    def __init__(self, connection, batch_size=BATCH_SIZE):
+        self.connection = connection
+        self.batch_size = batch_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def converter(self, field):
+        """Приведение значения к виду для базы; None — не нужно."""
+        if field.get_internal_type() in PLAIN_FIELDS:
+            return None
+        return lru_cache(maxsize=65536)(
+            partial(field.get_db_prep_save, connection=self.connection))
+
+    def load(self, model, names, rows):
+        """Загружает кортежи значений полей names, возвращает их число."""
+        fields = [model._meta.get_field(name) for name in names]
+        converters = [
+            (position, self.converter(field))
+            for position, field in enumerate(fields)
+        ]
+        converters = [item for item in converters if item[1] is not None]
+        count = 0
+        for chunk in chunked(rows, self.batch_size):
+            prepared = chunk
+            if converters:
+                prepared = [list(row) for row in chunk]
+                for row in prepared:
+                    for position, convert in converters:
+                        row[position] = convert(row[position])
+            with transaction.atomic(using=self.connection.alias):
+                self.insert(model, fields, prepared)
+            count += len(chunk)
+        return count
+
+    def columns(self, model, fields):
+        quote = self.connection.ops.quote_name
+        return quote(model._meta.db_table), ', '.join(
+            quote(field.column) for field in fields)
+
+    def insert(self, model, fields, rows):
+        table, columns = self.columns(model, fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                rows)
+
+    def reset_sequences(self, models):
+        statements = self.connection.ops.sequence_reset_sql(no_style(),
+                                                            models)
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class SQLiteLoader(ExecutemanyLoader):
+    """executemany без fsync и с большим кэшем страниц на время загрузки."""
+
+    PRAGMAS = {
+        'synchronous': 'OFF',
+        'journal_mode': 'MEMORY',
+        'temp_store': 'MEMORY',
+        'cache_size': -256000,
+    }
+
+    def __enter__(self):
+        self.saved = {}
+        if self.connection.in_atomic_block:
+            return self
+        with self.connection.cursor() as cursor:
+            for name, value in self.PRAGMAS.items():
+                cursor.execute(f'PRAGMA {name}')
+                self.saved[name] = cursor.fetchone()[0]
+                cursor.execute(f'PRAGMA {name} = {value}')
+        return self
+
+    def __exit__(self, *exc_info):
+        with self.connection.cursor() as cursor:
+            for name, value in self.saved.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class CopyLoader(ExecutemanyLoader):
+    """PostgreSQL: пачка уходит одной командой COPY в текстовом формате."""
+
+    def insert(self, model, fields, rows):
+        table, columns = self.columns(model, fields)
+        buffer = StringIO()
+        for row in rows:
+            buffer.write('\t'.join(map(copy_value, row)))
+            buffer.write('\n')
+        buffer.seek(0)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN',
+                               buffer)
+
+
+def get_loader(connection, batch_size=BATCH_SIZE):
+    loaders = {'sqlite': SQLiteLoader, 'postgresql': CopyLoader}
+    loader = loaders.get(connection.vendor, ExecutemanyLoader)
+    return loader(connection, batch_size)
+
+
+def skewed_index(rng, size, alpha=1.1):
+    """Индекс от 0 до size - 1 с «длинным хвостом»: первые чаще всего."""
+    return min(int(rng.paretovariate(alpha)) - 1, size - 1)
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def make_sample_images(rng):
+    """Несколько изображений с готовыми миниатюрами: (имя, адрес)."""
+    images = []
+    for number in range(SAMPLE_IMAGES):
+        buffer = BytesIO()
+        color = tuple(rng.randrange(256) for _ in range(3))
+        Image.new('RGB', (1200, 800), color).save(buffer, 'JPEG')
+        name = default_storage.save(f'posts/seed_{number}.jpg',
+                                    ContentFile(buffer.getvalue()))
+        thumbnail = get_thumbnail(name, THUMBNAIL_GEOMETRY,
+                                  **THUMBNAIL_OPTIONS)
+        images.append((name, thumbnail.url))
+    return images
+
+
+class Seeder:
+    """Генерирует связанный набор данных и отдаёт его загрузчику.
+
+    Авторы постов, группы и популярность в подписках распределены
+    со «скосом»: немногие авторы пишут и собирают подписчиков больше
+    всех. Одно и то же зерно даёт один и тот же набор.
+    """
+
+    def __init__(self, loader, seed=0, images=0):
+        self.loader = loader
+        self.rng = random.Random(seed)
+        self.image_ratio = images
+        self.posts_count = Counter()
+        self.followers_count = Counter()
+        self.following_count = Counter()
+        self.recent_posts = defaultdict(
+            lambda: deque(maxlen=settings.POSTS_TIMELINE_BACKFILL))
+        self.follow_users = array('q')
+        self.follow_authors = array('q')
+        self.loaded = {}
+
+    def run(self, users, groups, posts, comments, follows):
+        self.load_users(users)
+        self.load_groups(groups)
+        self.load_posts(posts, comments)
+        self.load_follows(follows)
+        self.load_stats()
+        self.load_timelines()
+        self.loader.reset_sequences([User, Group, Post, Comment, Follow,
+                                     ProfileStats, TimelineEntry])
+        get_search_backend().rebuild()
+        bump(INDEX_SCOPE, GROUPS_SCOPE)
+        return self.loaded
+
+    def load(self, model, names, rows):
+        self.loaded[model._meta.label] = self.loader.load(
+            model, names, rows)
+
+    def load_users(self, count):
+        first = next_id(User)
+        self.user_ids = range(first, first + count)
+        password = make_password(None)
+        rng = self.rng
+        self.load(User, (
+            'id', 'username', 'password', 'first_name', 'last_name', 'email',
+            'is_superuser', 'is_staff', 'is_active', 'date_joined',
+        ), (
+            (user_id, f'user{user_id}', password, rng.choice(FIRST_NAMES),
+             rng.choice(LAST_NAMES), '', False, False, True, START_DATE)
+            for user_id in self.user_ids
+        ))
+
+    def load_groups(self, count):
+        first = next_id(Group)
+        self.group_ids = range(first, first + count)
+        self.load(Group, ('id', 'title', 'slug', 'description'), (
+            (group_id, f'Группа {group_id}', f'group-{group_id}',
+             'Описание группы')
+            for group_id in self.group_ids
+        ))
+
+    def load_posts(self, count, comments):
+        if not count:
+            return
+        rng = self.rng
+        first = next_id(Post)
+        step = PERIOD / count
+        images = make_sample_images(rng) if self.image_ratio else []
+        # Комментарии чаще достаются свежим постам
+        comment_counts = Counter(
+            count - 1 - skewed_index(rng, count) for _ in range(comments))
+
+        def posts():
+            for number in range(count):
+                post_id = first + number
+                pub_date = START_DATE + step * number
+                author_id = self.user_ids[
+                    skewed_index(rng, len(self.user_ids))]
+                group_id = None
+                if self.group_ids and rng.random() < 0.7:
+                    group_id = self.group_ids[
+                        skewed_index(rng, len(self.group_ids))]
+                image = thumbnail_url = ''
+                if images and rng.random() < self.image_ratio:
+                    image, thumbnail_url = rng.choice(images)
+                words = rng.choices(WORDS, k=rng.randint(5, 40))
+                self.posts_count[author_id] += 1
+                self.recent_posts[author_id].appendleft((post_id, pub_date))
+                text = f'Пост {post_id}: ' + ' '.join(words)
+                yield (post_id, text, render_text(text), pub_date,
+                       author_id, group_id, image, thumbnail_url,
+                       comment_counts[number])
+
+        self.load(Post, (
+            'id', 'text', 'text_html', 'pub_date', 'author', 'group',
+            'image', 'thumbnail_url', 'comment_count',
+        ), posts())
+
+        def post_comments():
+            for number, amount in sorted(comment_counts.items()):
+                created = START_DATE + step * number
+                for _ in range(amount):
+                    created += timedelta(seconds=rng.randint(1, 3600))
+                    text = f'Комментарий: {rng.choice(WORDS)}'
+                    yield (first + number, rng.choice(self.user_ids),
+                           text, render_text(text), created)
+
+        self.load(Comment, ('post', 'author', 'text', 'text_html', 'created'),
+                  post_comments())
+
+    def load_follows(self, count):
+        rng = self.rng
+        user_ids = self.user_ids
+        pairs = set()
+
+        def follows():
+            attempts = count * 3
+            while len(pairs) < count and attempts:
+                attempts -= 1
+                pair = (rng.choice(user_ids),
+                        user_ids[skewed_index(rng, len(user_ids))])
+                if pair[0] == pair[1] or pair in pairs:
+                    continue
+                pairs.add(pair)
+                self.follow_users.append(pair[0])
+                self.follow_authors.append(pair[1])
+                self.following_count[pair[0]] += 1
+                self.followers_count[pair[1]] += 1
+                yield pair
+
+        if len(user_ids) > 1:
+            self.load(Follow, ('user', 'author'), follows())
+
+    def load_stats(self):
+        self.load(ProfileStats, (
+            'user', 'posts_count', 'followers_count', 'following_count',
+        ), (
+            (user_id, self.posts_count[user_id],
+             self.followers_count[user_id], self.following_count[user_id])
+            for user_id in self.user_ids
+        ))
+
+    def load_timelines(self):
+        """Те же записи, что дал бы backfill_timeline для каждой подписки."""
+        limit = settings.POSTS_TIMELINE_FANOUT_LIMIT
+
+        def entries():
+            for user_id, author_id in zip(self.follow_users,
+                                          self.follow_authors):
+                if self.followers_count[author_id] > limit:
+                    continue
+                for post_id, pub_date in self.recent_posts.get(author_id,
+                                                               ()):
+                    yield user_id, post_id, pub_date
+
+        self.load(TimelineEntry, ('user', 'post', 'pub_date'), entries())
+
+
+def seed(users, groups, posts, comments, follows, images=0, seed=0,
+         batch_size=BATCH_SIZE):
+    """Добавляет в базу набор данных, возвращает число строк по моделям.
+
+    images — доля постов с изображением (из нескольких общих файлов).
+    """
+    with get_loader(connection, batch_size) as loader:
+        return Seeder(loader, seed, images).run(users, groups, posts,
+                                                comments, follows)
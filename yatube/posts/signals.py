@@ -0,0 +1,177 @@
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .cache import (GROUPS_SCOPE, bump, bump_post_scopes, follow_scope,
+                    stats_scope)
+from .events import publish_new_post
+from .models import Comment, Follow, Group, Post, ProfileStats, User
+from .search import get_search_backend
+from .stats import update_comment_count, update_profile_stats
+from .text import render_text
+from .timeline import (backfill_followers, backfill_timeline, fan_out_post,
+                       prune_timeline)
+
+# Поля пользователя, из которых складывается author_name в поиске
+AUTHOR_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+# id постов, которые сейчас удаляются вместе с комментариями
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, 'posts'):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+def author_name(user):
+    return [getattr(user, field) for field in AUTHOR_NAME_FIELDS]
+
+
+@receiver(post_save, sender=User)
+def create_profile_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ProfileStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_name(sender, instance, raw=False, update_fields=None,
+                         **kwargs):
+    instance.previous_author_name = None
+    if (not instance.pk or raw or update_fields is not None
+            and not set(update_fields) & set(AUTHOR_NAME_FIELDS)):
+        return
+    previous = User.objects.filter(pk=instance.pk).values_list(
+        *AUTHOR_NAME_FIELDS).first()
+    if previous is not None:
+        instance.previous_author_name = list(previous)
+
+
+@receiver(post_save, sender=User)
+def author_renamed(sender, instance, created, raw=False, **kwargs):
+    """Имя автора хранится в индексе поиска у каждого его поста."""
+    previous = getattr(instance, 'previous_author_name', None)
+    if previous is not None and previous != author_name(instance):
+        get_search_backend().index_author(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_text_html(sender, instance, raw=False, update_fields=None,
+                     **kwargs):
+    """HTML текста строится один раз при записи, а не при каждом показе."""
+    if raw or (update_fields is not None
+               and 'text_html' not in update_fields):
+        return
+    instance.text_html = render_text(instance.text)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, raw=False, **kwargs):
+    instance.previous_group_id = None
+    if instance.pk and not raw:
+        instance.previous_group_id = Post.objects.filter(
+            pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        update_profile_stats(instance.author_id, posts_count=1)
+        fan_out_post(instance)
+        bump(stats_scope(instance.author_id))
+        post_id, author_id = instance.pk, instance.author_id
+        transaction.on_commit(lambda: publish_new_post(post_id, author_id))
+    bump_post_scopes(instance.author_id, instance.group_id,
+                     getattr(instance, 'previous_group_id', None),
+                     post_id=instance.pk)
+    get_search_backend().index_posts([instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    """Каскад удалит комментарии раньше поста: их счётчик и сброс
+    кэша не нужны, всё сбросит post_deleted один раз."""
+    deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    deleting_posts().discard(instance.pk)
+    update_profile_stats(instance.author_id, posts_count=-1)
+    bump(stats_scope(instance.author_id))
+    bump_post_scopes(instance.author_id, instance.group_id,
+                     post_id=instance.pk)
+    get_search_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_comment_count(instance.post_id, 1)
+        bump_post_scopes(instance.post.author_id, instance.post.group_id,
+                         post_id=instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id in deleting_posts():
+        return
+    update_comment_count(instance.post_id, -1)
+    post = Post.objects.filter(pk=instance.post_id).first()
+    if post is not None:
+        bump_post_scopes(post.author_id, post.group_id,
+                         post_id=post.pk)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_profile_stats(instance.author_id, followers_count=1)
+        update_profile_stats(instance.user_id, following_count=1)
+        backfill_timeline(instance.user_id, instance.author_id)
+        bump(follow_scope(instance.user_id), stats_scope(instance.user_id),
+             stats_scope(instance.author_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    update_profile_stats(instance.author_id, followers_count=-1)
+    update_profile_stats(instance.user_id, following_count=-1)
+    prune_timeline(instance.user_id, instance.author_id)
+    followers = ProfileStats.objects.filter(
+        user_id=instance.author_id).values_list(
+        'followers_count', flat=True).first()
+    if followers == settings.POSTS_TIMELINE_FANOUT_LIMIT:
+        # Автор только что перестал быть популярным
+        backfill_followers(instance.author_id)
+    bump(follow_scope(instance.user_id), stats_scope(instance.user_id),
+         stats_scope(instance.author_id))
+
+
+@receiver(post_save, sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(GROUPS_SCOPE)
+        get_search_backend().index_group(instance.pk)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    """После удаления у постов группы уже group_id = NULL, поэтому их id
+    запоминаются заранее."""
+    instance.group_post_ids = list(Post.objects.filter(
+        group_id=instance.pk).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump(GROUPS_SCOPE)
+    get_search_backend().index_posts(getattr(instance, 'group_post_ids', []))
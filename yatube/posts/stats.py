@@ -0,0 +1,90 @@
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Comment, Follow, Post, ProfileStats, User
+
+PROFILE_COUNTERS = ('posts_count', 'followers_count', 'following_count')
+
+
+def update_profile_stats(user_id, **deltas):
+    """Атомарно сдвигает счётчики профиля на заданные величины."""
+    ProfileStats.objects.filter(user_id=user_id).update(**{
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+
+
+def update_comment_count(post_id, delta):
+    """Атомарно сдвигает счётчик комментариев поста."""
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0))
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def count_by(queryset, field):
+    return dict(
+        queryset.order_by().values_list(field).annotate(Count('pk')))
+
+
+def reconcile_profile_stats(batch_size=1000):
+    """Пересчитывает статистику профилей, возвращает число исправлений."""
+    fixed = 0
+    user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+    for chunk in chunked(user_ids.iterator(), batch_size):
+        actual = {
+            'posts_count': count_by(
+                Post.objects.filter(author_id__in=chunk), 'author'),
+            'followers_count': count_by(
+                Follow.objects.filter(author_id__in=chunk), 'author'),
+            'following_count': count_by(
+                Follow.objects.filter(user_id__in=chunk), 'user'),
+        }
+        existing = ProfileStats.objects.in_bulk(chunk, field_name='user_id')
+        to_create, to_update = [], []
+        for user_id in chunk:
+            values = {
+                field: counts.get(user_id, 0)
+                for field, counts in actual.items()
+            }
+            stats = existing.get(user_id)
+            if stats is None:
+                to_create.append(ProfileStats(user_id=user_id, **values))
+            elif any(getattr(stats, field) != value
+                     for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(stats, field, value)
+                to_update.append(stats)
+        with transaction.atomic():
+            ProfileStats.objects.bulk_create(to_create)
+            ProfileStats.objects.bulk_update(to_update, PROFILE_COUNTERS)
+        fixed += len(to_create) + len(to_update)
+    return fixed
+
+
+def reconcile_comment_counts(batch_size=1000):
+    """Пересчитывает счётчики комментариев, возвращает число исправлений."""
+    fixed = 0
+    posts = Post.objects.order_by('pk').only('pk', 'comment_count')
+    for chunk in chunked(posts.iterator(), batch_size):
+        actual = count_by(
+            Comment.objects.filter(post_id__in=[post.pk for post in chunk]),
+            'post')
+        to_update = []
+        for post in chunk:
+            count = actual.get(post.pk, 0)
+            if post.comment_count != count:
+                post.comment_count = count
+                to_update.append(post)
+        Post.objects.bulk_update(to_update, ('comment_count',))
+        fixed += len(to_update)
+    return fixed
@@ -0,0 +1,87 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..cache import cached_cards, cached_fragment
+
+register = template.Library()
+
+# Место в кэшированной карточке, куда вставляются кнопки для читателя
+ACTIONS_MARK = '<!--post-actions-->'
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, scopes, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.scopes = scopes
+        self.vary_on = vary_on
+
+    def render(self, context):
+        scopes = self.scopes.resolve(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return cached_fragment(
+            self.fragment_name, scopes, vary_on,
+            lambda: self.nodelist.render(context))
+
+
+@register.tag
+def feedcache(parser, token):
+    """
+    Кэширует фрагмент до смены версии областей ленты.
+
+    {% feedcache index_page feed_scopes page user.pk %}...{% endfeedcache %}
+    """
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает имя фрагмента и области кэша.")
+    return FeedCacheNode(
+        nodelist,
+        bits[1],
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
+
+
+class PostCardsNode(template.Node):
+    def __init__(self, posts):
+        self.posts = posts
+
+    def render(self, context):
+        posts = self.posts.resolve(context)
+        if hasattr(posts, 'pk'):
+            posts = [posts]
+        if not posts:
+            return ''
+        posts = list(posts)
+        engine = context.template.engine
+        card = engine.get_template('includes/post_item.html')
+        actions = engine.get_template('includes/post_actions.html')
+
+        def render_card(post):
+            with context.push(post=post, actions=mark_safe(ACTIONS_MARK)):
+                return card.render(context)
+
+        cards = cached_cards(posts, render_card)
+        html = []
+        for post in posts:
+            with context.push(post=post):
+                html.append(cards[post.pk].replace(
+                    ACTIONS_MARK, actions.render(context)))
+        return mark_safe(''.join(html))
+
+
+@register.tag
+def post_cards(parser, token):
+    """
+    Карточки постов из кэша; кнопки читателя рендерятся каждый раз.
+
+    {% post_cards page %} или {% post_cards post %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает пост или список постов.")
+    return PostCardsNode(parser.compile_filter(bits[1]))
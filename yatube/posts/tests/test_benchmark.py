@@ -0,0 +1,43 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from ..benchmark import compare, run_benchmarks
+from ..seeding import seed
+
+dir_temp = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=dir_temp, POSTS_THUMBNAIL_WORKERS=0)
+class BenchmarkTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        seed(users=20, groups=3, posts=100, comments=50, follows=40,
+             images=0.2, seed=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(dir_temp, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_run_reports_every_scenario(self):
+        """Проверка: по каждому сценарию есть задержки и число запросов."""
+        results = run_benchmarks(iterations=3, warmup=1)
+        self.assertEqual(set(results), {
+            'index', 'posts_group', 'profile', 'post_view', 'follow_index',
+            'add_comment',
+        })
+        for row in results.values():
+            self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+            self.assertGreater(row['queries'], 0)
+
+    def test_compare_flags_regressions(self):
+        """Проверка: рост задержки сверх допуска и числа запросов замечен."""
+        baseline = {'index': {'p50_ms': 10, 'p99_ms': 20, 'queries': 3}}
+        current = {'index': {'p50_ms': 10.5, 'p99_ms': 30, 'queries': 4}}
+        self.assertEqual(compare(current, baseline, tolerance=0.1), [
+            'index: p99_ms 20 → 30', 'index: queries 3 → 4',
+        ])
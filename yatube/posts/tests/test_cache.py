@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..cache import INDEX_SCOPE, bump, cached_fragment, feed_version
+from ..models import Comment, Follow, Group, Post, User
+
+
+class FeedCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedCacheTests.user)
+
+    def test_feeds_are_invalidated_by_signals(self):
+        """Проверка: изменения сразу видны во всех лентах."""
+        Follow.objects.create(user=FeedCacheTests.user,
+                              author=FeedCacheTests.author)
+        urls = (
+            reverse('index'),
+            reverse('posts_group', args=(FeedCacheTests.group.slug,)),
+            reverse('profile', args=(FeedCacheTests.author,)),
+            reverse('follow_index'),
+        )
+        for url in urls:
+            self.authorized_client.get(url)
+        post = Post.objects.create(author=FeedCacheTests.author,
+                                   group=FeedCacheTests.group,
+                                   text='Новый пост')
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.authorized_client.get(url),
+                                    'Новый пост')
+        Comment.objects.create(post=post, author=FeedCacheTests.user,
+                               text='Комментарий')
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.authorized_client.get(url),
+                                    'Комментариев: 1')
+
+    def test_version_is_stable_until_bumped(self):
+        """Проверка: версия меняется только при сбросе области."""
+        version = feed_version([INDEX_SCOPE])
+        self.assertEqual(version, feed_version([INDEX_SCOPE]))
+        bump(INDEX_SCOPE)
+        self.assertNotEqual(version, feed_version([INDEX_SCOPE]))
+
+    def test_stale_copy_is_served_while_another_worker_renders(self):
+        """Проверка: пока фрагмент пересчитывается, отдаётся старая копия."""
+        self.assertEqual(
+            cached_fragment('test', [INDEX_SCOPE], [], lambda: 'old'), 'old')
+        bump(INDEX_SCOPE)
+        key = make_template_fragment_key('test', [INDEX_SCOPE])
+        cache.add(f'{key}:lock', 1)
+        self.assertEqual(
+            cached_fragment('test', [INDEX_SCOPE], [], lambda: 'new'), 'old')
+
+    @override_settings(POSTS_FEED_CACHE_TIMEOUT=300)
+    def test_fragments_expire(self):
+        """Проверка: фрагмент сохраняется с конечным сроком."""
+        with mock.patch.object(cache, 'set', wraps=cache.set) as set_:
+            cached_fragment('test', [INDEX_SCOPE], [1], lambda: 'html')
+        key = make_template_fragment_key('test', [INDEX_SCOPE, 1])
+        set_.assert_called_once_with(key, [feed_version([INDEX_SCOPE]),
+                                           'html'], 300)
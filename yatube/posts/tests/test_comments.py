@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+@override_settings(POSTS_COMMENTS_PER_PAGE=5)
+class CommentPaginationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(CommentPaginationTests.user)
+
+    def add_comments(self, count):
+        start = Comment.objects.count()
+        for number in range(start, start + count):
+            Comment.objects.create(post=CommentPaginationTests.post,
+                                   author=CommentPaginationTests.user,
+                                   text=f'Комментарий {number}')
+
+    def post_url(self):
+        post = CommentPaginationTests.post
+        return reverse('post', args=(post.author.username, post.id))
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return response, len(context.captured_queries)
+
+    def test_post_page_shows_first_comments(self):
+        """Проверка: на странице поста только первая страница
+        комментариев, число запросов от их количества не зависит."""
+        self.add_comments(6)
+        response, few = self.count_queries(self.post_url())
+        self.add_comments(30)
+        response, many = self.count_queries(self.post_url())
+        self.assertEqual(few, many)
+        texts = [comment.text for comment in response.context['comments']]
+        self.assertEqual(texts, [f'Комментарий {n}' for n in range(5)])
+        self.assertIsNotNone(response.context['comments_more_url'])
+
+    def test_no_more_link_when_all_comments_shown(self):
+        """Проверка: ссылки «Показать ещё» нет, если комментариев мало."""
+        self.add_comments(5)
+        response = self.client.get(self.post_url())
+        self.assertIsNone(response.context['comments_more_url'])
+        self.assertNotContains(response, 'Показать ещё комментарии')
+
+    def test_more_link_ignores_stale_comment_count(self):
+        """Проверка: ссылка «Показать ещё» зависит от комментариев,
+        а не от счётчика в посте."""
+        self.add_comments(6)
+        Post.objects.update(comment_count=0)
+        response = self.client.get(self.post_url())
+        self.assertIsNotNone(response.context['comments_more_url'])
+        self.assertEqual(len(response.context['comments']), 5)
+        Comment.objects.filter(text='Комментарий 5').delete()
+        Post.objects.update(comment_count=100)
+        response = self.client.get(self.post_url())
+        self.assertIsNone(response.context['comments_more_url'])
+
+    def test_fragment_pages_follow_each_other(self):
+        """Проверка: фрагменты по курсору отдают комментарии по порядку
+        без повторов и пропусков."""
+        self.add_comments(12)
+        url = self.client.get(self.post_url()).context['comments_more_url']
+        texts = []
+        while url:
+            response = self.client.get(url)
+            self.assertTemplateUsed(response, 'includes/comment_items.html')
+            texts += [comment.text for comment in response.context['comments']]
+            url = response.context['comments_more_url']
+        self.assertEqual(texts, [f'Комментарий {n}' for n in range(5, 12)])
+
+    def test_fragment_cursor_works_in_api(self):
+        """Проверка: курсор страницы поста подходит и для JSON API."""
+        self.add_comments(7)
+        url = self.client.get(self.post_url()).context['comments_more_url']
+        cursor = url.split('cursor=')[1]
+        response = self.client.get(
+            reverse('api:comments', args=(CommentPaginationTests.post.id,)),
+            {'cursor': cursor, 'fields': 'text'})
+        self.assertEqual(response.json()['results'], [
+            {'text': 'Комментарий 5'}, {'text': 'Комментарий 6'}])
+
+    def test_fragment_of_missing_post(self):
+        """Проверка: фрагмент чужого или несуществующего поста — 404."""
+        post = CommentPaginationTests.post
+        response = self.client.get(
+            reverse('post_comments', args=('TestUser', post.id)))
+        self.assertEqual(response.status_code, 404)
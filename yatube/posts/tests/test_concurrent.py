@@ -0,0 +1,120 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import (SimpleTestCase, TestCase, TransactionTestCase,
+                         override_settings)
+
+from yatube.pool.pool import ConnectionPool
+
+from ..concurrent import parallel
+from ..models import Post, User
+
+
+def thread_name():
+    return threading.current_thread().name
+
+
+class ParallelTests(SimpleTestCase):
+
+    def test_results_keep_order(self):
+        """Проверка: результаты по порядку, функции — в разных потоках."""
+        first, second, third = parallel(thread_name, thread_name,
+                                        lambda: 3)
+        self.assertEqual(first, threading.current_thread().name)
+        self.assertTrue(second.startswith('queries'))
+        self.assertEqual(third, 3)
+
+    def test_errors_are_raised(self):
+        """Проверка: исключение из потока пула поднимается в запросе."""
+        def fail():
+            raise LookupError('нет')
+
+        with self.assertRaises(LookupError):
+            parallel(thread_name, fail)
+
+    @override_settings(POSTS_PARALLEL_QUERIES=0)
+    def test_can_be_disabled(self):
+        """Проверка: при POSTS_PARALLEL_QUERIES = 0 всё в текущем потоке."""
+        current = threading.current_thread().name
+        self.assertEqual(parallel(thread_name, thread_name),
+                         [current, current])
+
+
+class Database:
+    """Соединение на поток из пула, как у django.db.connections:
+    поток запроса держит своё, поток пула берёт на время запроса."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.local = threading.local()
+
+    def request(self, started, *funcs):
+        self.local.connection = self.pool.acquire(object)
+        try:
+            started()
+            return parallel(*funcs)
+        finally:
+            self.pool.release(self.local.connection, reusable=False)
+
+    def query(self):
+        if getattr(self.local, 'connection', None) is not None:
+            sleep(0.05)
+            return 'запрос'
+        connection = self.pool.acquire(object)
+        try:
+            sleep(0.05)
+            return 'поток пула'
+        finally:
+            self.pool.release(connection, reusable=False)
+
+
+class ParallelPoolLimitTests(SimpleTestCase):
+
+    def test_concurrent_requests_do_not_exhaust_pool(self):
+        """Проверка: одновременные запросы с пулом на два соединения
+        не ждут соединений для потоков пула, а выполняют запросы сами."""
+        database = Database(ConnectionPool('test', {'MAX_SIZE': 2,
+                                                    'TIMEOUT': 0.5}))
+        barrier = threading.Barrier(2)
+
+        def request():
+            return database.request(barrier.wait, database.query,
+                                    database.query, database.query)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda _: request(), range(2)))
+        self.assertEqual(results, [['запрос'] * 3] * 2)
+        self.assertEqual(database.pool.in_use, {})
+
+
+class ParallelInTransactionTests(TestCase):
+
+    def test_transaction_runs_sequentially(self):
+        """Проверка: внутри транзакции запросы идут в текущем потоке."""
+        current = threading.current_thread().name
+        self.assertEqual(parallel(thread_name, thread_name),
+                         [current, current])
+
+
+class ParallelWrappersTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='TestAuthor')
+        Post.objects.create(author=self.author, text='Тестовый текст')
+
+    def test_workers_share_request_wrappers(self):
+        """Проверка: запросы из потоков пула видны обёрткам запроса."""
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(threading.current_thread().name)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            parallel(User.objects.count, Post.objects.count)
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(any(name.startswith('queries') for name in queries))
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ..cache import GROUPS_SCOPE, INDEX_SCOPE, VERSION_KEY, version_time
+from ..models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.author,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ConditionalGetTests.user)
+
+    def revalidate(self, client, url):
+        # Первый ответ с формой выдаёт CSRF-cookie, и ETag меняется
+        client.get(url)
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_answer_not_modified(self):
+        """Проверка: повторный запрос без изменений получает 304."""
+        post = ConditionalGetTests.post
+        urls = (
+            reverse('index'),
+            reverse('posts_group', args=(ConditionalGetTests.group.slug,)),
+            reverse('profile', args=(post.author.username,)),
+            reverse('post', args=(post.author.username, post.id)),
+        )
+        for client in (self.guest_client, self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.revalidate(client, url)
+                    self.assertEqual(response.status_code, 304)
+                    self.assertEqual(response.content, b'')
+
+    @override_settings(POSTS_PAGE_CACHE_TIMEOUT=0)
+    def test_not_modified_skips_rendering(self):
+        """Проверка: для 304 страницы поста хватает одного запроса."""
+        post = ConditionalGetTests.post
+        url = reverse('post', args=(post.author.username, post.id))
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_validators(self):
+        """Проверка: новые посты, комментарии и подписки меняют ETag."""
+        post = ConditionalGetTests.post
+        index = reverse('index')
+        post_url = reverse('post', args=(post.author.username, post.id))
+        profile = reverse('profile', args=(post.author.username,))
+        changes = (
+            (index, lambda: Post.objects.create(
+                text='Новый пост', author=ConditionalGetTests.author)),
+            (post_url, lambda: Comment.objects.create(
+                post=post, author=ConditionalGetTests.user,
+                text='Комментарий')),
+            (profile, lambda: Follow.objects.create(
+                user=ConditionalGetTests.user,
+                author=ConditionalGetTests.author)),
+        )
+        for url, change in changes:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                change()
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_viewer(self):
+        """Проверка: гость и пользователь получают разные ETag."""
+        url = reverse('index')
+        etag = self.guest_client.get(url)['ETag']
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified(self):
+        """Проверка: Last-Modified берётся из версии и работает с IMS."""
+        url = reverse('index')
+        response = self.guest_client.get(url)
+        with mock.patch('posts.conditional.now',
+                        return_value=datetime.now(timezone.utc)
+                        + timedelta(seconds=2)):
+            response = self.guest_client.get(url)
+            self.assertIn('Last-Modified', response)
+            response = self.guest_client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIsNone(version_time('legacy'))
+
+    def test_last_modified_is_rounded_up(self):
+        """Проверка: Last-Modified не отстаёт от версии, а в секунду
+        её смены не отправляется."""
+        url = reverse('index')
+        second = datetime(2020, 9, 13, 12, 26, 40, tzinfo=timezone.utc)
+        version = f'{int(second.timestamp() * 1000) + 200:x}.abcdef'
+        cache.set_many({VERSION_KEY.format(INDEX_SCOPE): version,
+                        VERSION_KEY.format(GROUPS_SCOPE): version}, None)
+        with mock.patch('posts.conditional.now',
+                        return_value=second + timedelta(milliseconds=500)):
+            self.assertNotIn('Last-Modified', self.guest_client.get(url))
+        for client in (self.guest_client, self.authorized_client):
+            with self.subTest(client=client):
+                self.assertEqual(client.get(url)['Last-Modified'],
+                                 http_date(second.timestamp() + 1))
+
+    def test_missing_objects_are_not_found(self):
+        """Проверка: несуществующие группа и пост по-прежнему дают 404."""
+        urls = (
+            reverse('posts_group', args=('missing',)),
+            reverse('profile', args=('missing',)),
+            reverse('post', args=(ConditionalGetTests.author.username, 999)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,120 @@
+import asyncio
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from yatube.asgi import WSGIBridge
+from yatube.events.brokers import get_broker
+
+from ..events import FEED_CHANNEL, author_channel, feed_channels
+from ..models import Follow, Post, User
+
+
+class NewPostEventsTests(TransactionTestCase):
+
+    def test_new_post_is_published_after_commit(self):
+        """Проверка: новый пост уходит в общий канал и канал автора."""
+        author = User.objects.create_user(username='TestAuthor')
+        messages = []
+        unsubscribe = get_broker().subscribe(
+            [FEED_CHANNEL, author_channel(author.pk)],
+            lambda channel, message: messages.append((channel, message)))
+        self.addCleanup(unsubscribe)
+        post = Post.objects.create(text='Тестовый текст', author=author)
+        post.text = 'Правка'
+        post.save()
+        expected = {'post': post.pk, 'author': author.pk}
+        self.assertEqual(messages, [(FEED_CHANNEL, expected),
+                                    (author_channel(author.pk), expected)])
+
+
+class PostEventsViewTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def test_feed_channels(self):
+        """Проверка: лента подписок слушает каналы избранных авторов."""
+        self.assertEqual(feed_channels(PostEventsViewTests.user, 'follow'),
+                         [author_channel(PostEventsViewTests.author.pk)])
+        self.assertEqual(feed_channels(PostEventsViewTests.user, 'index'),
+                         [FEED_CHANNEL])
+        self.assertIsNone(feed_channels(PostEventsViewTests.user, 'other'))
+
+    def test_guest_cannot_listen_to_follow_feed(self):
+        """Проверка: гостю поток ленты подписок недоступен."""
+        response = Client().get(reverse('post_events'), {'feed': 'follow'})
+        self.assertEqual(response.status_code, 403)
+
+    def scope(self, path, query_string=b''):
+        return {
+            'type': 'http', 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path,
+            'query_string': query_string, 'root_path': '',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+        }
+
+    def test_wsgi_does_not_hold_connections(self):
+        """Проверка: под WSGI поток не открывается: 204 и нет скрипта."""
+        response = Client().get(reverse('post_events'))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+        response = Client().get(reverse('index'))
+        self.assertNotContains(response, 'EventSource')
+
+    def test_asgi_page_subscribes_to_events(self):
+        """Проверка: под ASGI-мостом лента подключает поток событий."""
+        bridge = WSGIBridge(WSGIHandler(), threads=1, max_memory_body=1024)
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(bridge(self.scope(reverse('index')), receive, send))
+        self.assertEqual(sent[0]['status'], 200)
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        self.assertIn(b'new EventSource', body)
+
+    def test_asgi_holds_connection_in_event_loop(self):
+        """Проверка: под ASGI события идут клиенту без потока Django."""
+        bridge = WSGIBridge(WSGIHandler(), threads=1, max_memory_body=1024)
+        scope = self.scope(reverse('post_events'), b'feed=index')
+        sent = []
+
+        async def run():
+            requested = False
+            closed = asyncio.Event()
+
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {'type': 'http.request', 'body': b''}
+                await closed.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                body = message.get('body', b'')
+                if body.startswith(b': ping'):
+                    get_broker().publish(FEED_CHANNEL, {'post': 1})
+                elif body.startswith(b'event:'):
+                    closed.set()
+
+            await asyncio.wait_for(bridge(scope, receive, send), 5)
+
+        asyncio.run(run())
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'),
+                      sent[0]['headers'])
+        self.assertEqual(sent[-1]['body'],
+                         b'event: posts\ndata: {"count":1}\n\n')
@@ -1,12 +1,16 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
 from ..models import Comment, Group, Post, User
+from ..uploads import bounded_uploads
 
 dir_temp = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -158,6 +162,94 @@ class PostCreateFormTests(TestCase):
         self.assertNotEqual(post.text, new_text)
 
 
+def make_image(image_format, size, exif=None):
+    buffer = BytesIO()
+    image = Image.new('RGB', size, color=(200, 30, 30))
+    if exif is not None:
+        image.save(buffer, image_format, exif=exif)
+    else:
+        image.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=dir_temp)
+class ImageUploadLimitsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='Uploader')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ImageUploadLimitsTests.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(dir_temp, ignore_errors=True)
+        super().tearDownClass()
+
+    def post_image(self, name, content):
+        uploaded = SimpleUploadedFile(name=name, content=content)
+        return self.authorized_client.post(
+            reverse('new_post'), data={'text': 'Картинка', 'image': uploaded}
+        )
+
+    @override_settings(POSTS_IMAGE_MAX_PIXELS=100 * 100)
+    def test_too_many_pixels_rejected(self):
+        """Проверка: изображение больше лимита пикселей отклоняется."""
+        count = Post.objects.count()
+        response = self.post_image('big.png', make_image('PNG', (200, 100)))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error(
+            'image', 'too_many_pixels'))
+        self.assertEqual(Post.objects.count(), count)
+
+    @override_settings(POSTS_IMAGE_MAX_UPLOAD_SIZE=64)
+    def test_too_large_file_rejected(self):
+        """Проверка: файл больше лимита отклоняется с понятной ошибкой."""
+        count = Post.objects.count()
+        response = self.post_image('heavy.png', make_image('PNG', (60, 60)))
+        self.assertEqual(response.status_code, 200)
+        errors = response.context['form'].errors.as_data()['image']
+        self.assertEqual([error.code for error in errors], ['too_large'])
+        self.assertEqual(Post.objects.count(), count)
+
+    @override_settings(POSTS_IMAGE_MAX_UPLOAD_SIZE=64)
+    def test_oversized_upload_is_not_read_to_the_end(self):
+        """Проверка: после превышения лимита тело запроса не дочитывается."""
+        received = {}
+
+        @bounded_uploads
+        def view(request):
+            received.update(request.FILES.dict())
+            return HttpResponse()
+
+        request = RequestFactory().post(reverse('new_post'), {
+            'image': SimpleUploadedFile('heavy.png', b'0' * 2 ** 20),
+            'text': 'Картинка',
+        })
+        request._dont_enforce_csrf_checks = True
+        view(request)
+        self.assertGreater(received['image'].size, 64)
+        self.assertEqual(received['image'].read(), b'')
+        self.assertTrue(request.META['wsgi.input'].read())
+
+    @override_settings(POSTS_IMAGE_MAX_SIDE=40)
+    def test_image_downscaled_without_exif(self):
+        """Проверка: изображение уменьшается, EXIF не сохраняется."""
+        exif = Image.Exif()
+        exif[0x010f] = 'Camera'
+        content = make_image('JPEG', (160, 80), exif=exif.tobytes())
+        response = self.post_image('photo.jpg', content)
+        self.assertRedirects(response, reverse('index'))
+        post = Post.objects.get(text='Картинка')
+        self.assertEqual(post.image, 'posts/photo.jpg')
+        with Image.open(post.image.path) as stored:
+            self.assertEqual(stored.size, (40, 20))
+            self.assertNotIn(0x010f, stored.getexif())
+
+
 class CommentCreateFormTest(TestCase):
 
     @classmethod
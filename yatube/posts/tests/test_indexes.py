@@ -0,0 +1,63 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+def index_name(model, columns):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table)
+    for name, details in constraints.items():
+        if details['index'] and details['columns'] == list(columns):
+            return name
+    raise AssertionError(f'Нет индекса {model.__name__}{columns}')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'План запроса в формате SQLite')
+class FeedIndexesTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user('reader')
+        cls.author = User.objects.create_user('writer')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.post = Post.objects.create(text='Пост', author=cls.author,
+                                       group=cls.group)
+
+    def assertUsesIndex(self, queryset, model, columns):
+        plan = queryset.explain()
+        self.assertIn(index_name(model, columns), plan)
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_group_feed(self):
+        """Проверка: лента группы читается по индексу (group, pub_date)."""
+        self.assertUsesIndex(FeedIndexesTests.group.posts.all(),
+                             Post, ('group_id', 'pub_date'))
+
+    def test_profile_feed(self):
+        """Проверка: посты автора читаются по индексу (author, pub_date)."""
+        self.assertUsesIndex(FeedIndexesTests.author.posts.all(),
+                             Post, ('author_id', 'pub_date'))
+
+    def test_post_comments(self):
+        """Проверка: комментарии поста идут по индексу (post, created)."""
+        self.assertUsesIndex(
+            Comment.objects.filter(post=FeedIndexesTests.post)
+            .order_by('created'),
+            Comment, ('post_id', 'created'))
+
+    def test_follow_lookups(self):
+        """Проверка: подписка ищется по уникальному (user, author),
+        подписчики автора — по (author, user)."""
+        self.assertUsesIndex(
+            Follow.objects.filter(user=FeedIndexesTests.user,
+                                  author=FeedIndexesTests.author),
+            Follow, ('user_id', 'author_id'))
+        self.assertUsesIndex(
+            Follow.objects.filter(author=FeedIndexesTests.author)
+            .values_list('user_id', flat=True),
+            Follow, ('author_id', 'user_id'))
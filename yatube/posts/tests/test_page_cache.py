@@ -0,0 +1,136 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.signals import template_rendered
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+
+from ..cache import INDEX_SCOPE, feed_version
+from ..middleware import AnonymousPageCacheMiddleware
+from ..models import Comment, Group, Post, User
+
+
+class AnonymousPageCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+        )
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.author,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(AnonymousPageCacheTests.author)
+        self.rendered = []
+        template_rendered.connect(self.on_render)
+        self.addCleanup(template_rendered.disconnect, self.on_render)
+
+    def on_render(self, sender, template, **kwargs):
+        self.rendered.append(template.name)
+
+    def urls(self):
+        post = AnonymousPageCacheTests.post
+        return (
+            reverse('index'),
+            reverse('index') + '?page=1',
+            reverse('posts_group', args=(AnonymousPageCacheTests.group.slug,)),
+            reverse('profile', args=(post.author.username,)),
+            reverse('post', args=(post.author.username, post.id)),
+        )
+
+    def test_hits_skip_database_and_templates(self):
+        """Проверка: гость получает страницу без базы и шаблонов."""
+        for url in self.urls():
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                self.rendered.clear()
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(url)
+                self.assertEqual(self.rendered, [])
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, first.content)
+                self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_hit_answers_not_modified(self):
+        """Проверка: сохранённая страница отвечает 304 по ETag."""
+        url = reverse('index')
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_purge_pages(self):
+        """Проверка: посты, комментарии и группы сбрасывают страницы."""
+        post = AnonymousPageCacheTests.post
+        changes = (
+            (reverse('index'), 'Новый пост', lambda: Post.objects.create(
+                text='Новый пост', author=AnonymousPageCacheTests.author)),
+            (reverse('post', args=(post.author.username, post.id)),
+             'Новый комментарий', lambda: Comment.objects.create(
+                 post=post, author=AnonymousPageCacheTests.author,
+                 text='Новый комментарий')),
+            (reverse('index'), 'Новое название', self.rename_group),
+        )
+        for url, text, change in changes:
+            with self.subTest(url=url, text=text):
+                self.guest_client.get(url)
+                change()
+                self.assertContains(self.guest_client.get(url), text)
+
+    def rename_group(self):
+        group = Group.objects.get(pk=AnonymousPageCacheTests.group.pk)
+        group.title = 'Новое название'
+        group.save()
+
+    def test_logged_in_users_are_not_served_from_cache(self):
+        """Проверка: пользователь с сессией получает свою страницу."""
+        url = reverse('index')
+        self.guest_client.get(url)
+        response = self.authorized_client.get(url)
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'Выйти')
+
+    def test_unknown_params_bypass_cache(self):
+        """Проверка: запросы с посторонними параметрами не кэшируются."""
+        url = reverse('index') + '?utm=1'
+        self.guest_client.get(url)
+        response = self.guest_client.get(url)
+        self.assertIsNotNone(response.context)
+
+    def test_vary_headers_are_respected(self):
+        """Проверка: вариант страницы с другим заголовком из Vary
+        не отдаётся из кэша."""
+        calls = []
+
+        def view(request):
+            calls.append(request)
+            request.feed_scopes = ([INDEX_SCOPE], feed_version([INDEX_SCOPE]))
+            response = HttpResponse(request.META.get('HTTP_ACCEPT_LANGUAGE'))
+            patch_vary_headers(response, ('Accept-Language', 'Cookie'))
+            return response
+
+        middleware = AnonymousPageCacheMiddleware(view)
+        factory = RequestFactory()
+        for language in ('ru', 'ru', 'en', 'en'):
+            response = middleware(
+                factory.get('/', HTTP_ACCEPT_LANGUAGE=language))
+            self.assertEqual(response.content, language.encode())
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(POSTS_PAGE_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        """Проверка: при нулевом времени жизни страницы не кэшируются."""
+        url = reverse('index')
+        self.guest_client.get(url)
+        response = self.guest_client.get(url)
+        self.assertIsNotNone(response.context)
@@ -1,6 +1,10 @@
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from ..models import Group, Post, User
 
@@ -39,3 +43,58 @@ class PaginatorViewsTest(TestCase):
         response = self.client.get(reverse('index') + '?page=2')
         self.assertEqual(len(response.context.get('page').object_list),
                          PaginatorViewsTest.NUMBER_OF_POSTS)
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+class CursorPaginatorViewsTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='TestUser')
+        cls.NUMBER_OF_POSTS = 3
+        pub_date = timezone.now()
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Тестовый текст {i}')
+            for i in range(
+                settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE
+                + cls.NUMBER_OF_POSTS)
+        )
+        Post.objects.filter(id__lte=4).update(pub_date=pub_date)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, cursor=None):
+        url = reverse('index')
+        if cursor:
+            url += f'?cursor={cursor}'
+        with CaptureQueriesContext(connection) as context:
+            page = self.client.get(url).context['page']
+        for query in context.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
+        return page
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Проверка: курсоры ведут вперёд и назад без пропусков."""
+        first = self.get_page()
+        self.assertFalse(first.has_previous())
+        self.assertEqual(len(first),
+                         settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE)
+        second = self.get_page(first.next_cursor)
+        self.assertEqual(len(second), CursorPaginatorViewsTest.NUMBER_OF_POSTS)
+        self.assertFalse(second.has_next())
+        ids = [post.id for post in list(first) + list(second)]
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        back = self.get_page(second.previous_cursor)
+        self.assertEqual([post.id for post in back],
+                         [post.id for post in first])
+        self.assertFalse(back.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Проверка: битый курсор открывает первую страницу."""
+        page = self.get_page('broken')
+        self.assertFalse(page.has_previous())
+        self.assertEqual(page[0], Post.objects.order_by('-pub_date', '-id')[0])
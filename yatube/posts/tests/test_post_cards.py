@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from ..models import Comment, Group, Post, User
+
+
+class PostCardsTests(TestCase):
+    template = Template('{% load feed_cache %}{% post_cards posts %}')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+        )
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.reader = User.objects.create_user(username='TestReader')
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {number}')
+            for number in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, user=None):
+        posts = list(Post.objects.for_feed())
+        return self.template.render(Context({'posts': posts, 'user': user}))
+
+    def test_cards_are_shared_between_readers(self):
+        """Проверка: карточка общая, кнопка правки — только автору."""
+        self.render(PostCardsTests.author)
+        with self.assertTemplateNotUsed('includes/post_item.html'):
+            html = self.render(PostCardsTests.reader)
+            author_html = self.render(PostCardsTests.author)
+        self.assertEqual(html.count('Пост'), 3)
+        self.assertNotIn('Редактировать', html)
+        self.assertEqual(author_html.count('Редактировать'), 3)
+
+    def test_page_of_cached_cards_is_one_multi_get(self):
+        """Проверка: страница из кэша — get_many версий и карточек."""
+        self.render()
+        with mock.patch.object(cache, 'get_many',
+                               wraps=cache.get_many) as get_many, \
+                mock.patch.object(cache, 'set_many') as set_many:
+            self.render()
+        self.assertEqual(get_many.call_count, 2)
+        set_many.assert_not_called()
+
+    def test_card_is_rerendered_after_changes(self):
+        """Проверка: правка, комментарий и смена группы обновляют карточку."""
+        self.render()
+        post = Post.objects.first()
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertIn('Исправленный пост', self.render())
+        Comment.objects.create(post=post, author=PostCardsTests.reader,
+                               text='Комментарий')
+        self.assertIn('Комментариев: 1', self.render())
+        group = PostCardsTests.group
+        group.title = 'Новое название'
+        group.save()
+        self.assertEqual(self.render().count('#Новое название'), 3)
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+FEED_QUERY_BUDGET = 7
+
+
+class FeedQueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedQueryBudgetTests.user)
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                group=FeedQueryBudgetTests.group,
+                author=FeedQueryBudgetTests.author,
+                text=f'Тестовый текст {i}',
+            )
+            Comment.objects.create(
+                post=post,
+                author=FeedQueryBudgetTests.user,
+                text='Комментарий',
+            )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(url)
+        self.assertEqual(len(response.context['page']), Post.objects.count())
+        return len(context.captured_queries)
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        """Проверка: число запросов ленты не зависит от числа постов."""
+        urls = (
+            reverse('index'),
+            reverse('posts_group', args=(FeedQueryBudgetTests.group.slug,)),
+            reverse('profile', args=(FeedQueryBudgetTests.author,)),
+            reverse('follow_index'),
+        )
+        self.create_posts(1)
+        single = {url: self.count_queries(url) for url in urls}
+        self.create_posts(
+            settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE - 1)
+        for url in urls:
+            with self.subTest(url=url):
+                queries = self.count_queries(url)
+                self.assertEqual(queries, single[url])
+                self.assertLessEqual(queries, FEED_QUERY_BUDGET)
+
+    def test_post_delete_does_not_depend_on_comments(self):
+        """Проверка: удаление поста не тратит запросы на каждый
+        каскадно удаляемый комментарий."""
+        queries = []
+        for comments in (1, 30):
+            post = Post.objects.create(author=FeedQueryBudgetTests.author,
+                                       text='Пост с обсуждением')
+            Comment.objects.bulk_create(
+                Comment(post=post, author=FeedQueryBudgetTests.user,
+                        text=f'Комментарий {number}')
+                for number in range(comments))
+            with CaptureQueriesContext(connection) as context:
+                post.delete()
+            queries.append(len(context.captured_queries))
+        self.assertEqual(queries[0], queries[1])
+        comment = Comment.objects.create(
+            post=Post.objects.create(author=FeedQueryBudgetTests.author,
+                                     text='Пост'),
+            author=FeedQueryBudgetTests.user, text='Комментарий')
+        comment.delete()
+        self.assertEqual(Post.objects.get(text='Пост').comment_count, 0)
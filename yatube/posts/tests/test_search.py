@@ -0,0 +1,92 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class SearchViewTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Любители котов',
+            slug='cats',
+        )
+        cls.user = User.objects.create_user(username='TestUser',
+                                            first_name='Антон')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Первый пост про собак',
+        )
+
+    def search(self, query, cursor=None):
+        params = {'q': query}
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get(reverse('search'), params)
+        return response.context['page']
+
+    def test_search_by_text_group_and_author(self):
+        """Проверка: поиск находит посты по тексту, группе и автору."""
+        post = Post.objects.create(author=SearchViewTests.user,
+                                   group=SearchViewTests.group,
+                                   text='Второй пост')
+        self.assertEqual(list(self.search('собак')), [SearchViewTests.post])
+        self.assertEqual(list(self.search('котов')), [post])
+        self.assertEqual(len(self.search('Антон')), 2)
+        self.assertEqual(len(self.search('')), 0)
+
+    def test_index_follows_edits_and_deletes(self):
+        """Проверка: индекс обновляется при правке и удалении поста."""
+        post = Post.objects.create(author=SearchViewTests.user,
+                                   text='Черновик')
+        post.text = 'Опубликовано'
+        post.save()
+        self.assertEqual(list(self.search('Черновик')), [])
+        self.assertEqual(list(self.search('Опубликовано')), [post])
+        SearchViewTests.group.title = 'Любители птиц'
+        SearchViewTests.group.save()
+        post.delete()
+        self.assertEqual(list(self.search('Опубликовано')), [])
+
+    def test_index_follows_group_delete_and_author_rename(self):
+        """Проверка: индекс обновляется при удалении группы и смене
+        имени автора."""
+        group = Group.objects.create(title='Любители рыб', slug='fish')
+        author = User.objects.create_user(username='Writer')
+        post = Post.objects.create(author=author, group=group, text='Пост')
+        self.assertEqual(list(self.search('рыб')), [post])
+        group.delete()
+        self.assertEqual(list(self.search('рыб')), [])
+        author.username = 'Novelist'
+        author.save()
+        self.assertEqual(list(self.search('Writer')), [])
+        self.assertEqual(list(self.search('Novelist')), [post])
+
+    def test_results_are_ranked(self):
+        """Проверка: более релевантный пост выше в выдаче."""
+        best = Post.objects.create(author=SearchViewTests.user,
+                                   text='собак собак собак')
+        self.assertEqual(self.search('собак')[0], best)
+
+    @override_settings(NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE=2)
+    def test_keyset_pagination(self):
+        """Проверка: курсор ведёт на следующую страницу выдачи."""
+        for i in range(2):
+            Post.objects.create(author=SearchViewTests.user,
+                                text=f'Ещё пост про собак {i}')
+        first = self.search('собак')
+        self.assertTrue(first.has_next())
+        second = self.search('собак', first.next_cursor)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(second.has_next())
+        found = {post.pk for post in list(first) + list(second)}
+        expected = set(Post.objects.values_list('pk', flat=True))
+        self.assertEqual(found, expected)
+
+    @override_settings(
+        POSTS_SEARCH_BACKEND='posts.search.DatabaseSearchBackend')
+    def test_database_backend(self):
+        """Проверка: запасной бэкенд ищет без индекса."""
+        self.assertEqual(list(self.search('собак')), [SearchViewTests.post])
@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from ..models import Comment, Follow, Post, ProfileStats, TimelineEntry, User
+from ..seeding import seed
+from ..stats import reconcile_comment_counts, reconcile_profile_stats
+from ..timeline import rebuild_timelines
+
+
+@override_settings(POSTS_TIMELINE_BACKFILL=5)
+class SeedTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.loaded = seed(users=30, groups=4, posts=300, comments=200,
+                          follows=80, seed=3)
+
+    def test_rows_loaded(self):
+        """Проверка: создано запрошенное число строк."""
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertEqual(Follow.objects.count(), 80)
+        self.assertEqual(ProfileStats.objects.count(), 30)
+        self.assertEqual(SeedTests.loaded['posts.Post'],
+                         300)
+
+    def test_counters_consistent(self):
+        """Проверка: счётчики заполнены так же, как их пересчитали бы."""
+        self.assertEqual(reconcile_profile_stats(), 0)
+        self.assertEqual(reconcile_comment_counts(), 0)
+
+    def test_timelines_match_rebuild(self):
+        """Проверка: ленты совпадают с заново собранными."""
+        seeded = set(TimelineEntry.objects.values_list(
+            'user_id', 'post_id', 'pub_date'))
+        rebuild_timelines()
+        rebuilt = set(TimelineEntry.objects.values_list(
+            'user_id', 'post_id', 'pub_date'))
+        self.assertEqual(seeded, rebuilt)
+
+    def test_new_rows_get_new_ids(self):
+        """Проверка: повторный запуск добавляет данные, а не конфликтует."""
+        out = StringIO()
+        call_command('seed', scale='tiny', users=5, posts=10, comments=5,
+                     follows=3, groups=1, stdout=out)
+        self.assertEqual(User.objects.count(), 35)
+        self.assertEqual(Post.objects.count(), 310)
+        self.assertIn('Готово.', out.getvalue())
+
+    def test_posts_need_users(self):
+        """Проверка: посты без новых пользователей — понятная ошибка."""
+        with self.assertRaises(CommandError):
+            call_command('seed', scale='tiny', users=0, posts=5,
+                         stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 300)
@@ -0,0 +1,69 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Post, ProfileStats, User
+
+
+class ProfileStatsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ProfileStatsTests.user)
+
+    def get_stats(self, user):
+        return ProfileStats.objects.get(user=user)
+
+    def test_counters_follow_views(self):
+        """Проверка: счётчики меняются при постах, комментариях, подписках."""
+        author = ProfileStatsTests.author
+        self.authorized_client.post(reverse('new_post'), {'text': 'Текст'})
+        post = Post.objects.create(author=author, text='Текст автора')
+        self.authorized_client.post(
+            reverse('add_comment', args=(author, post.id)),
+            {'text': 'Комментарий'})
+        self.authorized_client.get(reverse('profile_follow', args=(author,)))
+
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+        self.assertEqual(self.get_stats(ProfileStatsTests.user).posts_count,
+                         1)
+        self.assertEqual(self.get_stats(author).followers_count, 1)
+        self.assertEqual(
+            self.get_stats(ProfileStatsTests.user).following_count, 1)
+
+        self.authorized_client.get(
+            reverse('profile_unfollow', args=(author,)))
+        Comment.objects.all().delete()
+        post.delete()
+        stats = self.get_stats(author)
+        self.assertEqual(stats.followers_count, 0)
+        self.assertEqual(stats.posts_count, 0)
+        self.assertEqual(
+            self.get_stats(ProfileStatsTests.user).following_count, 0)
+
+    def test_recount_stats_command_fixes_drift(self):
+        """Проверка: команда recount_stats восстанавливает счётчики."""
+        author = ProfileStatsTests.author
+        post = Post.objects.create(author=author, text='Текст')
+        Comment.objects.create(post=post, author=author, text='Комментарий')
+        Follow.objects.create(user=ProfileStatsTests.user, author=author)
+        ProfileStats.objects.filter(user=author).delete()
+        Post.objects.update(comment_count=0)
+
+        out = StringIO()
+        call_command('recount_stats', stdout=out)
+
+        stats = self.get_stats(author)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(Post.objects.get(pk=post.pk).comment_count, 1)
+        self.assertIn('профилей: 1, постов: 1', out.getvalue())
@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+class TextHtmlTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TextHtmlTests.user)
+
+    def test_html_is_rendered_on_write(self):
+        """Проверка: HTML текста строится при создании и правке."""
+        self.authorized_client.post(reverse('new_post'),
+                                    {'text': '<b>Первая</b>\nвторая'})
+        post = Post.objects.get()
+        self.assertEqual(post.text_html,
+                         '&lt;b&gt;Первая&lt;/b&gt;<br>вторая')
+        self.authorized_client.post(
+            reverse('post_edit', args=(TextHtmlTests.user, post.id)),
+            {'text': 'Правка\nтекста'})
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, 'Правка<br>текста')
+        self.authorized_client.post(
+            reverse('add_comment', args=(TextHtmlTests.user, post.id)),
+            {'text': 'Комментарий & ответ'})
+        self.assertEqual(Comment.objects.get().text_html,
+                         'Комментарий &amp; ответ')
+        response = self.authorized_client.get(
+            reverse('post', args=(TextHtmlTests.user, post.id)))
+        self.assertContains(response, 'Правка<br>текста')
+        self.assertContains(response, 'Комментарий &amp; ответ')
+
+    def test_update_fields_with_text_refresh_html(self):
+        """Проверка: save(update_fields=['text']) обновляет и HTML."""
+        post = Post.objects.create(author=TextHtmlTests.user, text='a')
+        comment = Comment.objects.create(post=post, author=TextHtmlTests.user,
+                                         text='b')
+        for obj in (post, comment):
+            with self.subTest(model=type(obj).__name__):
+                obj.text = 'Новый\n<текст>'
+                obj.save(update_fields=['text'])
+                obj.refresh_from_db()
+                self.assertEqual(obj.text_html, 'Новый<br>&lt;текст&gt;')
+
+    def test_backfill_fills_empty_html(self):
+        """Проверка: команда заполняет HTML у старых записей."""
+        post = Post.objects.create(author=TextHtmlTests.user, text='a\nb')
+        Comment.objects.create(post=post, author=TextHtmlTests.user,
+                               text='<i>')
+        Post.objects.update(text_html='')
+        Comment.objects.update(text_html='')
+        out = StringIO()
+        call_command('render_text_html', batch_size=1, stdout=out)
+        self.assertIn('Заполнено постов: 1, комментариев: 1.',
+                      out.getvalue())
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, 'a<br>b')
+        self.assertEqual(Comment.objects.get().text_html, '&lt;i&gt;')
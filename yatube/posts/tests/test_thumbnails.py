@@ -0,0 +1,115 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, User
+from ..thumbnails import generate_thumbnail, shutdown_executor
+
+dir_temp = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=dir_temp)
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x01\x00'
+            b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+            b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+            b'\x00\x00\x01\x00\x01\x00\x00\x02'
+            b'\x02\x4c\x01\x00\x3b\x01\x00\x00'
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(dir_temp, ignore_errors=True)
+        super().tearDownClass()
+
+    def create_post(self):
+        return Post.objects.create(
+            author=ThumbnailTests.user,
+            text='Тестовый текст',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=ThumbnailTests.small_gif,
+                content_type='image/gif'
+            ),
+        )
+
+    def test_precomputed_thumbnail_is_rendered(self):
+        """Проверка: лента выводит заранее построенную миниатюру."""
+        post = self.create_post()
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, post.image.url)
+        url = generate_thumbnail(post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail_url, url)
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, url)
+
+    def test_command_backfills_missing_thumbnails(self):
+        """Проверка: команда строит недостающие миниатюры."""
+        post = self.create_post()
+        Post.objects.create(author=ThumbnailTests.user, text='Без картинки')
+        out = StringIO()
+        call_command('generate_thumbnails', processes=1, stdout=out)
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
+        self.assertIn('1 из 1', out.getvalue())
+
+
+@override_settings(MEDIA_ROOT=dir_temp, POSTS_THUMBNAIL_WORKERS=1)
+class BackgroundThumbnailTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='TestUser')
+        self.client.force_login(self.user)
+        self.addCleanup(shutil.rmtree, dir_temp, ignore_errors=True)
+        self.addCleanup(shutdown_executor)
+
+    def create_post(self):
+        content = BytesIO()
+        Image.new('RGB', (20, 20), 'red').save(content, 'PNG')
+        self.client.post(reverse('new_post'), {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile('red.png', content.getvalue(),
+                                        content_type='image/png'),
+        })
+        return Post.objects.get()
+
+    def test_thumbnail_is_built_by_pool(self):
+        """Проверка: пул строит миниатюру после коммита и
+        дожидается её при остановке."""
+        post = self.create_post()
+        shutdown_executor()
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
+        self.assertNotEqual(post.thumbnail_url, post.image.url)
+
+    def test_pool_errors_are_logged(self):
+        """Проверка: ошибка в пуле попадает в лог и не ломает пул."""
+        with mock.patch('posts.thumbnails.get_thumbnail',
+                        side_effect=OSError('битый файл')), \
+                self.assertLogs('posts.thumbnails', 'ERROR') as logs:
+            post = self.create_post()
+            shutdown_executor()
+        self.assertIn(f'Не удалось построить миниатюру поста {post.pk}',
+                      logs.output[0])
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail_url, '')
+        post.delete()
+        post = self.create_post()
+        shutdown_executor()
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
@@ -0,0 +1,109 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry, User
+from ..timeline import entry_posts
+
+
+class TimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TimelineTests.user)
+
+    def follow_page(self):
+        response = self.authorized_client.get(reverse('follow_index'))
+        return [post.id for post in response.context['page']]
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Проверка: новый пост попадает в ленты подписчиков."""
+        Follow.objects.create(user=TimelineTests.user,
+                              author=TimelineTests.author)
+        post = Post.objects.create(author=TimelineTests.author, text='Текст')
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=TimelineTests.user, post=post).exists())
+        self.assertEqual(self.follow_page(), [post.id])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Проверка: подписка дополняет ленту, отписка очищает её."""
+        post = Post.objects.create(author=TimelineTests.author, text='Текст')
+        author = TimelineTests.author
+        self.authorized_client.get(reverse('profile_follow', args=(author,)))
+        self.assertEqual(self.follow_page(), [post.id])
+        self.authorized_client.get(
+            reverse('profile_unfollow', args=(author,)))
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.follow_page(), [])
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=1)
+    def test_celebrity_posts_are_read_on_request(self):
+        """Проверка: посты популярных авторов читаются без раскладки."""
+        regular = User.objects.create_user(username='RegularAuthor')
+        stranger = User.objects.create_user(username='Stranger')
+        Follow.objects.create(user=TimelineTests.user, author=regular)
+        Follow.objects.create(user=TimelineTests.user,
+                              author=TimelineTests.author)
+        Follow.objects.create(user=stranger, author=TimelineTests.author)
+        regular_post = Post.objects.create(author=regular, text='Текст')
+        celebrity_post = Post.objects.create(author=TimelineTests.author,
+                                             text='Текст')
+        Post.objects.create(author=stranger, text='Чужой текст')
+        self.assertFalse(TimelineEntry.objects.filter(
+            post=celebrity_post).exists())
+        self.assertEqual(self.follow_page(),
+                         [celebrity_post.id, regular_post.id])
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=1)
+    def test_former_celebrity_posts_are_backfilled(self):
+        """Проверка: когда автор перестаёт быть популярным, его посты
+        раскладываются по лентам оставшихся подписчиков."""
+        stranger = User.objects.create_user(username='Stranger')
+        Follow.objects.create(user=TimelineTests.user,
+                              author=TimelineTests.author)
+        follow = Follow.objects.create(user=stranger,
+                                       author=TimelineTests.author)
+        post = Post.objects.create(author=TimelineTests.author, text='Текст')
+        self.assertFalse(TimelineEntry.objects.exists())
+        follow.delete()
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user_id', 'post_id')),
+            [(TimelineTests.user.id, post.id)])
+        self.assertEqual(self.follow_page(), [post.id])
+
+    @override_settings(POSTS_CURSOR_PAGINATION=True,
+                       NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE=2)
+    def test_cursor_pages_follow_entries(self):
+        """Проверка: курсорные страницы ленты идут по записям подряд."""
+        Follow.objects.create(user=TimelineTests.user,
+                              author=TimelineTests.author)
+        posts = [Post.objects.create(author=TimelineTests.author,
+                                     text=f'Текст {number}')
+                 for number in range(5)]
+        seen, cursor = [], ''
+        while cursor is not None:
+            response = self.authorized_client.get(
+                reverse('follow_index'), {'cursor': cursor})
+            page = response.context['page']
+            seen += [post.id for post in page]
+            cursor = page.next_cursor
+        self.assertEqual(seen, [post.id for post in reversed(posts)])
+
+    @skipUnless(connection.vendor == 'sqlite', 'план запроса SQLite')
+    def test_feed_is_read_in_index_order(self):
+        """Проверка: страница ленты читается по индексу без сортировки."""
+        sql, params = entry_posts(
+            TimelineTests.user)[:10].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('posts_timelineentry USING COVERING INDEX', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
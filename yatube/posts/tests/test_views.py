@@ -174,15 +174,17 @@ class PostViewsTests(TestCase):
 
     def test_index_cache(self):
         cache_page = self.client.get(reverse('index')).content
+        Post.objects.filter(pk=PostViewsTests.post.pk).update(
+            text='Изменено в обход сигналов')
+        response = self.client.get(reverse('index'))
+        self.assertEqual(cache_page, response.content)
         Post.objects.create(
             text='Тест кэша',
             author=PostViewsTests.user
         )
         response = self.client.get(reverse('index'))
-        self.assertEqual(cache_page, response.content)
-        cache.clear()
-        response = self.client.get(reverse('index'))
         self.assertNotEqual(cache_page, response.content)
+        self.assertContains(response, 'Тест кэша')
 
     def test_authorized_user_can_subscribe_other_users(self):
         author = PostViewsTests.author
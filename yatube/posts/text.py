@@ -0,0 +1,22 @@
+from django.template.defaultfilters import linebreaksbr
+
+from .stats import chunked
+
+
+def render_text(text):
+    """HTML текста поста или комментария: экранирование и переносы."""
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def backfill_text_html(model, batch_size=1000, force=False):
+    """Заполняет text_html пачками, возвращает число обновлённых строк."""
+    rows = model.objects.order_by('pk').only('pk', 'text')
+    if not force:
+        rows = rows.filter(text_html='')
+    filled = 0
+    for chunk in chunked(rows.iterator(), batch_size):
+        for row in chunk:
+            row.text_html = render_text(row.text)
+        model.objects.bulk_update(chunk, ('text_html',))
+        filled += len(chunk)
+    return filled
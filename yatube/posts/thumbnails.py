@@ -0,0 +1,94 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import get_thumbnail
+
+from .cache import bump_post_scopes
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POSTS_THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails')
+        return _executor
+
+
+def shutdown_executor(wait=True):
+    """Останавливает фоновый пул, по умолчанию дождавшись его задач.
+
+    Следующая миниатюра запустит новый пул.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def generate_thumbnail(post_id):
+    """Строит миниатюру изображения поста и сохраняет её адрес."""
+    post = Post.objects.filter(pk=post_id).only(
+        'pk', 'image', 'author_id', 'group_id').first()
+    if post is None or not post.image:
+        return None
+    thumbnail = get_thumbnail(post.image, THUMBNAIL_GEOMETRY,
+                              **THUMBNAIL_OPTIONS)
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail_url=thumbnail.url)
+    if updated:
+        bump_post_scopes(post.author_id, post.group_id, post_id=post_id)
+    return thumbnail.url
+
+
+def generate_safely(post_id):
+    try:
+        return generate_thumbnail(post_id)
+    except Exception:
+        logger.exception('Не удалось построить миниатюру поста %s', post_id)
+        return None
+
+
+def generate_in_background(post_id):
+    try:
+        generate_safely(post_id)
+    finally:
+        connections.close_all()
+
+
+def queue_thumbnail(post):
+    """После коммита отдаёт построение миниатюры фоновому пулу.
+
+    При POSTS_THUMBNAIL_WORKERS = 0 миниатюра строится сразу после
+    коммита в текущем потоке.
+    """
+    if not post.image:
+        return
+    post_id = post.pk
+    if settings.POSTS_THUMBNAIL_WORKERS:
+        transaction.on_commit(
+            lambda: get_executor().submit(generate_in_background, post_id))
+    else:
+        transaction.on_commit(lambda: generate_safely(post_id))
+
+
+def generate_thumbnails_chunk(post_ids):
+    """Строит миниатюры для пачки постов, возвращает число успешных."""
+    try:
+        return sum(1 for post_id in post_ids if generate_safely(post_id))
+    finally:
+        connections.close_all()
@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FilteredRelation, Q
+
+from .models import Follow, Post, ProfileStats, TimelineEntry
+from .paginators import CursorPaginator
+
+BATCH_SIZE = 1000
+# Совпадает с индексом (user, -pub_date, -post): страница ленты читается
+# по индексу без сортировки
+TIMELINE_ORDERING = ('-pub_date', '-post_id')
+
+
+def is_celebrity(author_id):
+    """Автор, чьи посты собираются в ленту при чтении, а не при записи."""
+    return ProfileStats.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.POSTS_TIMELINE_FANOUT_LIMIT,
+    ).exists()
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if is_celebrity(post.author_id):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id, post_id=post.pk,
+                       pub_date=post.pub_date)
+         for user_id in follower_ids.iterator()),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_timeline(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    if is_celebrity(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'pub_date')[:settings.POSTS_TIMELINE_BACKFILL]
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+         for post_id, pub_date in posts),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_followers(author_id):
+    """Раскладывает последние посты автора по лентам всех подписчиков.
+
+    Нужна, когда автор перестаёт быть популярным: его посты больше не
+    подмешиваются при чтении, а раньше по лентам не раскладывались.
+    Одним INSERT ... SELECT, без выгрузки строк в Python.
+    """
+    quote = connection.ops.quote_name
+    entries = quote(TimelineEntry._meta.db_table)
+    follows = quote(Follow._meta.db_table)
+    posts = quote(Post._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {entries} (user_id, post_id, pub_date) '
+            f'SELECT follow.user_id, post.id, post.pub_date '
+            f'FROM {follows} AS follow, ('
+            f'  SELECT id, pub_date FROM {posts} WHERE author_id = %s '
+            f'  ORDER BY pub_date DESC LIMIT %s'
+            f') AS post '
+            f'WHERE follow.author_id = %s '
+            f'ON CONFLICT DO NOTHING',
+            [author_id, settings.POSTS_TIMELINE_BACKFILL, author_id])
+
+
+def prune_timeline(user_id, author_id):
+    """Убирает из ленты посты автора после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+
+
+def followed_celebrity_ids(user):
+    return list(Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gt=(
+            settings.POSTS_TIMELINE_FANOUT_LIMIT),
+    ).values_list('author_id', flat=True))
+
+
+class TimelineCursorPaginator(CursorPaginator):
+    """Курсорная пагинация записей ленты; страница состоит из постов."""
+
+    def page(self, cursor=None):
+        page = super().page(cursor)
+        page.object_list = [entry.post for entry in page.object_list]
+        return page
+
+
+def timeline_entries(user):
+    """Записи ленты читателя вместе с постами, их авторами и группами."""
+    return TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group')
+
+
+def entry_posts(user):
+    """Посты ленты в порядке записей: запрос идёт по индексу записей."""
+    posts = Post.objects.for_feed().filter(timeline_entries__user=user)
+    return posts.order_by(
+        F('timeline_entries__pub_date').desc(),
+        F('timeline_entries__post_id').desc())
+
+
+def timeline_posts(user, celebrity_ids=None):
+    """Лента подписок: разложенные посты плюс посты популярных авторов.
+
+    Без популярных авторов ленту быстрее читать по записям:
+    entry_posts или timeline_entries с TIMELINE_ORDERING.
+    """
+    if celebrity_ids is None:
+        celebrity_ids = followed_celebrity_ids(user)
+    if not celebrity_ids:
+        return Post.objects.filter(timeline_entries__user=user)
+    return Post.objects.annotate(
+        own_entry=FilteredRelation(
+            'timeline_entries',
+            condition=Q(timeline_entries__user=user)),
+    ).filter(Q(own_entry__isnull=False) | Q(author_id__in=celebrity_ids))
+
+
+def rebuild_timelines():
+    """Заново собирает ленты всех читателей, возвращает число записей."""
+    TimelineEntry.objects.all().delete()
+    follows = Follow.objects.order_by('pk').values_list('user_id',
+                                                        'author_id')
+    for user_id, author_id in follows.iterator():
+        backfill_timeline(user_id, author_id)
+    return TimelineEntry.objects.count()
@@ -0,0 +1,129 @@
+import os
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import (InMemoryUploadedFile,
+                                            SimpleUploadedFile)
+from django.core.files.uploadhandler import (StopUpload,
+                                             TemporaryFileUploadHandler)
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, ImageOps
+
+FORMAT_CONTENT_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+
+
+class BoundedImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл по частям.
+
+    На первом байте сверх POSTS_IMAGE_MAX_UPLOAD_SIZE чтение запроса
+    прекращается. Вместо файла остаётся пустая заглушка oversized с size
+    больше лимита, чтобы форма отклонила его ошибкой о размере.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.oversized = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POSTS_IMAGE_MAX_UPLOAD_SIZE:
+            self.oversized = SimpleUploadedFile(
+                self.file_name, b'', self.content_type)
+            self.oversized.size = self.received
+            raise StopUpload(connection_reset=True)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        return self.file
+
+
+def bounded_uploads(view):
+    """Ставит потоковый обработчик до того, как CSRF прочитает POST."""
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        handler = BoundedImageUploadHandler(request)
+        request.upload_handlers = [handler]
+        if request.method == 'POST':
+            # Тело разбирается здесь, чтобы форма увидела заглушку
+            files = request.FILES
+            if handler.oversized is not None:
+                files.appendlist(handler.field_name, handler.oversized)
+        return protected(request, *args, **kwargs)
+    return wrapper
+
+
+def check_upload_size(upload):
+    limit = settings.POSTS_IMAGE_MAX_UPLOAD_SIZE
+    if upload.size > limit:
+        raise ValidationError(
+            'Файл слишком большой: не больше %(limit)s.',
+            code='too_large', params={'limit': filesizeformat(limit)})
+
+
+def prepare_image(upload):
+    """Проверяет изображение по заголовку и перекодирует его без метаданных.
+
+    Размеры читаются без декодирования пикселей, поэтому слишком большие
+    изображения и «бомбы декомпрессии» отклоняются до загрузки в память.
+    """
+    invalid = ValidationError(
+        'Загрузите правильное изображение.', code='invalid_image')
+    check_upload_size(upload)
+    upload.seek(0)
+    try:
+        image = Image.open(upload)
+    except (OSError, Image.DecompressionBombError) as error:
+        raise invalid from error
+    if image.format not in FORMAT_CONTENT_TYPES:
+        raise invalid
+    width, height = image.size
+    if width * height > settings.POSTS_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Изображение слишком большое: не больше %(limit)s мегапикселей.',
+            code='too_many_pixels',
+            params={'limit': settings.POSTS_IMAGE_MAX_PIXELS / 10 ** 6})
+    try:
+        return reencode(image, upload.name)
+    except (OSError, ValueError) as error:
+        raise invalid from error
+
+
+def reencode(image, name):
+    """Уменьшает изображение до POSTS_IMAGE_MAX_SIDE и сохраняет без EXIF.
+
+    Результат ограничен по размеру стороной, поэтому держится в памяти.
+    """
+    max_side = settings.POSTS_IMAGE_MAX_SIDE
+    image_format = image.format
+    if image_format == 'JPEG':
+        image.draft('RGB', (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side))
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    content_type = FORMAT_CONTENT_TYPES[image_format]
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    result = InMemoryUploadedFile(
+        buffer, 'image', os.path.basename(name), content_type,
+        buffer.tell(), None)
+    result.seek(0)
+    result.image = image
+    return result
@@ -2,18 +2,46 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import urlencode
 
+from yatube.events.sse import event_stream_response
+
+from .cache import (GROUPS_SCOPE, INDEX_SCOPE, follow_scope, group_scope,
+                    profile_scope, scope_versions)
+from .concurrent import parallel
+from .conditional import (conditional_feed, group_scopes, index_scopes,
+                          post_scopes, profile_scopes)
+from .events import feed_channels
 from .forms import PostForm, CommentForm
-from .models import Follow, Group, Post
+from .models import Comment, Follow, Group, Post
+from .paginators import (NEXT, CursorPage, CursorPaginator, InvalidCursor,
+                         decode_token, encode_token)
+from .search import get_search_backend
+from .thumbnails import queue_thumbnail
+from .timeline import (TIMELINE_ORDERING, TimelineCursorPaginator,
+                       entry_posts, followed_celebrity_ids, timeline_entries,
+                       timeline_posts)
+from .uploads import bounded_uploads
 
 User = get_user_model()
 
+COMMENTS_ORDERING = ('created', 'id')
+
 
 def paginator_pages(request, post_list):
     """Вспомогательная функция постраничного вывода."""
+    if settings.POSTS_CURSOR_PAGINATION:
+        paginator = CursorPaginator(
+            post_list.for_feed(),
+            settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE
+        )
+        return paginator.get_page(request.GET.get('cursor'))
     paginator = Paginator(
-        post_list,
+        post_list.for_feed(),
         settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE
     )
     page_number = request.GET.get('page')
@@ -21,6 +49,18 @@ def paginator_pages(request, post_list):
     return page
 
 
+def timeline_pages(request):
+    """Лента подписок постранично по записям TimelineEntry читателя."""
+    per_page = settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE
+    if settings.POSTS_CURSOR_PAGINATION:
+        paginator = TimelineCursorPaginator(
+            timeline_entries(request.user), per_page, TIMELINE_ORDERING)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = Paginator(entry_posts(request.user), per_page)
+    return paginator.get_page(request.GET.get('page'))
+
+
+@conditional_feed(index_scopes)
 def index(request):
     post_list = Post.objects.all()
     page = paginator_pages(request, post_list)
@@ -28,11 +68,13 @@ def index(request):
         request,
         'posts/index.html',
         {
-            'page': page
+            'page': page,
+            'feed_scopes': (INDEX_SCOPE, GROUPS_SCOPE),
         }
     )
 
 
+@conditional_feed(group_scopes)
 def posts_group(request, slug):
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.all()
@@ -43,17 +85,21 @@ def posts_group(request, slug):
         {
             'group': group,
             'page': page,
+            'feed_scopes': (group_scope(group.id), GROUPS_SCOPE),
         }
     )
 
 
+@bounded_uploads
 @login_required()
+@transaction.atomic
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        queue_thumbnail(post)
         return redirect('index')
     return render(
         request,
@@ -65,15 +111,17 @@ def new_post(request):
     )
 
 
+@conditional_feed(profile_scopes)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = user.posts.all()
-    page = paginator_pages(request, posts)
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(author=user,
-                                          user=request.user).exists()
-    else:
-        following = False
+    is_reader = request.user.is_authenticated
+    user, following, page = parallel(
+        lambda: get_object_or_404(User.objects.select_related('stats'),
+                                  username=username),
+        lambda: is_reader and Follow.objects.filter(
+            author__username=username, user=request.user).exists(),
+        lambda: paginator_pages(
+            request, Post.objects.filter(author__username=username)),
+    )
     return render(
         request,
         'posts/profile.html',
@@ -81,13 +129,41 @@ def profile(request, username):
             'page': page,
             'author': user,
             'following': following,
+            'feed_scopes': (profile_scope(user.id), GROUPS_SCOPE),
         }
     )
 
 
+def post_comments_list(post_id):
+    return Comment.objects.filter(post_id=post_id).select_related('author')
+
+
+def comments_more_url(username, post_id, cursor):
+    if cursor is None:
+        return None
+    url = reverse('post_comments', args=(username, post_id))
+    return f'{url}?{urlencode({"cursor": cursor})}'
+
+
+@conditional_feed(post_scopes)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
-    comments = post.comments.all()
+    per_page = settings.POSTS_COMMENTS_PER_PAGE
+    ordered = post_comments_list(post_id).order_by(*COMMENTS_ORDERING)
+    comments = ordered[:per_page]
+    # len() загружает комментарии в кэш QuerySet параллельно с постом,
+    # а есть ли следующая страница, проверяет отдельный EXISTS
+    post, _, has_more = parallel(
+        lambda: get_object_or_404(
+            Post.objects.for_feed().select_related('author__stats'),
+            author__username=username, id=post_id),
+        lambda: len(comments),
+        lambda: ordered[per_page:per_page + 1].exists(),
+    )
+    next_cursor = None
+    if has_more and comments:
+        paginator = CursorPaginator(post_comments_list(post_id), per_page,
+                                    COMMENTS_ORDERING)
+        next_cursor = paginator.encode_cursor(NEXT, list(comments)[-1])
     form = CommentForm()
     return render(
         request,
@@ -97,11 +173,35 @@ def post_view(request, username, post_id):
             'author': post.author,
             'form': form,
             'comments': comments,
+            'comments_more_url': comments_more_url(
+                post.author.username, post_id, next_cursor),
         }
     )
 
 
+@conditional_feed(post_scopes)
+def post_comments(request, username, post_id):
+    """Следующая страница комментариев — фрагмент для «Показать ещё»."""
+    get_object_or_404(Post.objects.only('pk'), author__username=username,
+                      id=post_id)
+    paginator = CursorPaginator(post_comments_list(post_id),
+                                settings.POSTS_COMMENTS_PER_PAGE,
+                                COMMENTS_ORDERING)
+    page = paginator.get_page(request.GET.get('cursor'))
+    return render(
+        request,
+        'includes/comment_items.html',
+        {
+            'comments': page,
+            'comments_more_url': comments_more_url(
+                username, post_id, page.next_cursor),
+        }
+    )
+
+
+@bounded_uploads
 @login_required
+@transaction.atomic
 def post_edit(request, username, post_id):
     post = get_object_or_404(Post, id=post_id, author__username=username)
     if request.user != post.author:
@@ -110,7 +210,11 @@ def post_edit(request, username, post_id):
                     files=request.FILES or None,
                     instance=post)
     if form.is_valid():
+        if 'image' in form.changed_data:
+            post.thumbnail_url = ''
         form.save()
+        if 'image' in form.changed_data:
+            queue_thumbnail(post)
         return redirect('post', username=post.author, post_id=post_id)
     return render(
         request,
@@ -124,6 +228,7 @@ def post_edit(request, username, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, id=post_id)
     form = CommentForm(request.POST or None)
@@ -137,18 +242,28 @@ def add_comment(request, username, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    page = paginator_pages(request, posts)
+    celebrity_ids = followed_celebrity_ids(request.user)
+    feed_scopes = [follow_scope(request.user.id), GROUPS_SCOPE]
+    feed_scopes += [profile_scope(author_id) for author_id in celebrity_ids]
+    # Свежие поколения переводят чтение ленты на основную базу
+    scope_versions(feed_scopes)
+    if celebrity_ids:
+        page = paginator_pages(
+            request, timeline_posts(request.user, celebrity_ids))
+    else:
+        page = timeline_pages(request)
     return render(
         request,
         'posts/follow.html',
         {
-            'page': page
+            'page': page,
+            'feed_scopes': feed_scopes,
         }
     )
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
@@ -157,6 +272,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     follow = Follow.objects.filter(user=request.user, author=author)
@@ -164,6 +280,46 @@ def profile_unfollow(request, username):
     return redirect('profile', username)
 
 
+def post_events(request):
+    """Поток server-sent events о новых постах ленты ?feed=."""
+    channels = feed_channels(request.user, request.GET.get('feed', 'index'))
+    if channels is None:
+        return HttpResponseForbidden()
+    return event_stream_response(request, channels, event='posts')
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    per_page = settings.NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE
+    try:
+        rank, post_id = decode_token(request.GET.get('cursor', ''))
+        after = (float(rank), int(post_id))
+    except (InvalidCursor, TypeError, ValueError):
+        after = None
+    results = get_search_backend().search(query, per_page + 1, after)
+    next_cursor = None
+    if len(results) > per_page:
+        results = results[:per_page]
+        post_id, rank = results[-1]
+        next_cursor = encode_token([rank, post_id])
+    posts = Post.objects.for_feed().in_bulk(
+        [post_id for post_id, _ in results])
+    page = CursorPage(
+        [posts[post_id] for post_id, _ in results if post_id in posts],
+        paginator=None,
+        next_cursor=next_cursor,
+    )
+    return render(
+        request,
+        'posts/search.html',
+        {
+            'page': page,
+            'query': query,
+            'extra_query': urlencode({'q': query}) + '&',
+        }
+    )
+
+
 def page_not_found(request, exception):
     return render(
         request,
@@ -0,0 +1,222 @@
+"""
+ASGI config for yatube project.
+
+В Django 2.2 нет своего ASGI-обработчика, поэтому WSGIBridge принимает
+соединения в цикле событий и отдаёт Django только готовый запрос:
+тело читается и ответ отправляется асинхронно, а поток из ограниченного
+пула ASGI_THREADS занят лишь на время работы view. Медленный клиент
+или долгая загрузка изображения больше не держат поток, а соединения
+server-sent events (yatube.events.sse) после ответа view обслуживает
+только цикл событий. Тело больше ASGI_MAX_BODY_SIZE отклоняется ответом
+413, не дочитываясь до конца.
+
+Запуск: uvicorn yatube.asgi:application
+"""
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.wsgi import get_wsgi_application
+
+from yatube.events.sse import ENVIRON_KEY, EventStream, stream_events
+from yatube.pool.pool import DEFAULTS as POOL_DEFAULTS
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+
+class RequestAborted(Exception):
+    pass
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+class WSGIBridge:
+    """Запускает WSGI-приложение из ASGI-сервера в пуле потоков."""
+
+    def __init__(self, wsgi_application, threads, max_memory_body,
+                 max_body=None):
+        self.wsgi_application = wsgi_application
+        self.threads = threads
+        self.max_memory_body = max_memory_body
+        self.max_body = max_body
+        self.executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип соединения: '
+                             f'{scope["type"]}')
+        try:
+            body = await self.read_body(receive, scope)
+        except RequestAborted:
+            return
+        except RequestTooLarge:
+            return await self.reject(send, 413)
+        loop = asyncio.get_running_loop()
+        environ = self.environ(scope, body)
+        stream = environ[ENVIRON_KEY] = EventStream()
+        try:
+            status, headers, chunks = await loop.run_in_executor(
+                self.get_executor(), self.run_wsgi, environ)
+        finally:
+            body.close()
+        streaming = stream.channels is not None and status == 200
+        if streaming:
+            # Content-Length пустого ответа view оборвал бы поток событий
+            headers = [(name, value) for name, value in headers
+                       if name != b'content-length']
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        if streaming:
+            return await stream_events(stream, receive, send)
+        for chunk in chunks:
+            await send({'type': 'http.response.body', 'body': chunk,
+                        'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.executor is not None:
+                    self.executor.shutdown(wait=True)
+                    self.executor = None
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix='asgi')
+        return self.executor
+
+    async def reject(self, send, status):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-length', b'0'),
+                        (b'connection', b'close')],
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def read_body(self, receive, scope):
+        """Тело запроса целиком: в памяти, а если большое — на диске.
+
+        Если Content-Length или уже полученные байты больше max_body,
+        чтение прекращается с RequestTooLarge.
+        """
+        if self.max_body is not None:
+            length = dict(scope['headers']).get(b'content-length', b'0')
+            if length.isdigit() and int(length) > self.max_body:
+                raise RequestTooLarge
+        body = SpooledTemporaryFile(max_size=self.max_memory_body)
+        received = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                raise RequestAborted
+            chunk = message.get('body', b'')
+            received += len(chunk)
+            if self.max_body is not None and received > self.max_body:
+                body.close()
+                raise RequestTooLarge
+            body.write(chunk)
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        return body
+
+    def environ(self, scope, body):
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        path = scope['path'].encode('utf-8').decode('latin-1')
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': path,
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'SERVER_PROTOCOL': f'HTTP/{scope["http_version"]}',
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = name
+            else:
+                key = f'HTTP_{name}'
+            if key in environ:
+                value = f'{environ[key]},{value}'
+            environ[key] = value
+        return environ
+
+    def run_wsgi(self, environ):
+        """Выполняет запрос в потоке пула и собирает ответ.
+
+        close() вызывается здесь же: по сигналу request_finished Django
+        возвращает соединения с базой, открытые этим потоком.
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        result = self.wsgi_application(environ, start_response)
+        try:
+            chunks = [chunk for chunk in result if chunk]
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return started['status'], started['headers'], chunks
+
+
+def check_threads(settings):
+    """Потоку view нужно соединение из пула: если потоков больше, чем
+    соединений, лишние запросы ждут соединение и падают с PoolTimeout."""
+    for alias, database in settings.DATABASES.items():
+        if 'POOL' not in database:
+            continue
+        max_size = {**POOL_DEFAULTS, **database['POOL']}['MAX_SIZE']
+        if settings.ASGI_THREADS > max_size:
+            raise ImproperlyConfigured(
+                f'ASGI_THREADS ({settings.ASGI_THREADS}) больше, чем '
+                f'POOL MAX_SIZE базы {alias!r} ({max_size}).')
+
+
+def get_asgi_application():
+    from django.conf import settings
+
+    wsgi_application = get_wsgi_application()
+    check_threads(settings)
+    return WSGIBridge(wsgi_application, settings.ASGI_THREADS,
+                      settings.FILE_UPLOAD_MAX_MEMORY_SIZE,
+                      settings.ASGI_MAX_BODY_SIZE)
+
+
+application = get_asgi_application()
@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+from .resp import RespClient
+
+DEFAULT_SERIALIZER = 'yatube.cache.serializers.JSONSerializer'
+
+# L1 всех экземпляров TieredCache по адресу сервера и номеру базы:
+# CacheHandler создаёт бэкенд заново в каждом потоке, а L1 должен быть
+# общим для процесса
+_l1_stores = {}
+_l1_stores_lock = threading.Lock()
+
+
+class RedisCache(BaseCache):
+    """Общий кэш на Redis-совместимом сервере.
+
+    LOCATION: "host:port". OPTIONS: DB, SOCKET_TIMEOUT, SERIALIZER
+    (путь к классу с dumps/loads) и SERIALIZER_OPTIONS.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        if not isinstance(server, str):
+            server = server[0]
+        options = params.get('OPTIONS', {})
+        host, _, port = server.rpartition(':')
+        self.client = RespClient(
+            host or '127.0.0.1', int(port or 6379),
+            db=options.get('DB', 0),
+            timeout=options.get('SOCKET_TIMEOUT', 1.0),
+        )
+        serializer = import_string(options.get('SERIALIZER',
+                                               DEFAULT_SERIALIZER))
+        self.serializer = serializer(**options.get('SERIALIZER_OPTIONS', {}))
+
+    def ttl_ms(self, timeout=DEFAULT_TIMEOUT):
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return int(timeout * 1000)
+
+    def full_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def raw_get_many(self, keys):
+        values = self.client.execute('MGET', *keys)
+        return {key: data for key, data in zip(keys, values)
+                if data is not None}
+
+    def raw_set(self, key, data, ttl, only_new=False):
+        if ttl is not None and ttl <= 0:
+            self.raw_delete(key)
+            return not only_new
+        command = ['SET', key, data]
+        if ttl is not None:
+            command += ['PX', ttl]
+        if only_new:
+            command.append('NX')
+        return self.client.execute(*command) == 'OK'
+
+    def raw_set_many(self, items, ttl):
+        """Пишет пары за один запрос к серверу, возвращает сбойные ключи."""
+        if ttl is not None and ttl <= 0:
+            self.raw_delete(*items)
+            return []
+        if ttl is None:
+            pairs = [part for item in items.items() for part in item]
+            self.client.execute('MSET', *pairs)
+            return []
+        replies = self.client.pipeline(['SET', key, data, 'PX', ttl]
+                                       for key, data in items.items())
+        return [key for key, reply in zip(items, replies) if reply != 'OK']
+
+    def raw_delete(self, *keys):
+        return self.client.execute('DEL', *keys)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.full_key(key, version)
+        return self.raw_set(key, self.serializer.dumps(value),
+                            self.ttl_ms(timeout), only_new=True)
+
+    def get(self, key, default=None, version=None):
+        key = self.full_key(key, version)
+        data = self.raw_get_many([key]).get(key)
+        if data is None:
+            return default
+        return self.serializer.loads(data)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.full_key(key, version)
+        self.raw_set(key, self.serializer.dumps(value), self.ttl_ms(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.full_key(key, version)
+        ttl = self.ttl_ms(timeout)
+        if ttl is None:
+            return bool(self.client.execute('PERSIST', key)
+                        or self.client.execute('EXISTS', key))
+        return bool(self.client.execute('PEXPIRE', key, max(ttl, 1)))
+
+    def delete(self, key, version=None):
+        return bool(self.raw_delete(self.full_key(key, version)))
+
+    def get_many(self, keys, version=None):
+        full_keys = {self.full_key(key, version): key for key in keys}
+        if not full_keys:
+            return {}
+        found = self.raw_get_many(list(full_keys))
+        return {
+            full_keys[key]: self.serializer.loads(data)
+            for key, data in found.items()
+        }
+
+    def has_key(self, key, version=None):
+        return bool(self.client.execute('EXISTS',
+                                        self.full_key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.full_key(key, version)
+        if not self.client.execute('EXISTS', key):
+            raise ValueError(f"Key '{key}' not found")
+        return self.client.execute('INCRBY', key, delta)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        items = {
+            self.full_key(key, version): self.serializer.dumps(value)
+            for key, value in data.items()
+        }
+        if not items:
+            return []
+        failed = set(self.raw_set_many(items, self.ttl_ms(timeout)))
+        return [key for key in data
+                if self.full_key(key, version) in failed]
+
+    def delete_many(self, keys, version=None):
+        full_keys = [self.full_key(key, version) for key in keys]
+        if full_keys:
+            self.raw_delete(*full_keys)
+
+    def clear(self):
+        self.client.execute('FLUSHDB')
+
+
+class TieredCache(RedisCache):
+    """RedisCache с небольшим LRU-кэшем в памяти процесса (L1).
+
+    L1 хранит сериализованные байты не дольше L1_TIMEOUT секунд, так что
+    изменения из других процессов видны с этой задержкой. Потоки процесса
+    делят один L1. OPTIONS дополнительно принимает L1_MAX_ENTRIES
+    и L1_TIMEOUT.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get('OPTIONS', {})
+        self.l1_max_entries = options.get('L1_MAX_ENTRIES', 1000)
+        self.l1_timeout = options.get('L1_TIMEOUT', 1)
+        if not isinstance(server, str):
+            server = server[0]
+        name = f'{server}/{options.get("DB", 0)}'
+        with _l1_stores_lock:
+            self._l1, self._lock = _l1_stores.setdefault(
+                name, (OrderedDict(), threading.Lock()))
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+
+    def l1_store(self, key, data, ttl=None):
+        lifetime = self.l1_timeout
+        if ttl is not None:
+            lifetime = min(lifetime, ttl / 1000)
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._l1[key] = (data, time.monotonic() + lifetime)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def l1_discard(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._l1.pop(key, None)
+
+    def l1_size(self):
+        with self._lock:
+            return sum(len(key) + len(data)
+                       for key, (data, _) in self._l1.items())
+
+    def raw_get_many(self, keys):
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                item = self._l1.get(key)
+                if item is not None and item[1] > now:
+                    self._l1.move_to_end(key)
+                    found[key] = item[0]
+                else:
+                    missing.append(key)
+            self.stats['l1_hits'] += len(found)
+        if missing:
+            remote = super().raw_get_many(missing)
+            for key, data in remote.items():
+                self.l1_store(key, data)
+            found.update(remote)
+            with self._lock:
+                self.stats['l2_hits'] += len(remote)
+                self.stats['misses'] += len(missing) - len(remote)
+        return found
+
+    def raw_set(self, key, data, ttl, only_new=False):
+        stored = super().raw_set(key, data, ttl, only_new)
+        if stored and not only_new:
+            self.l1_store(key, data, ttl)
+        else:
+            self.l1_discard(key)
+        return stored
+
+    def raw_set_many(self, items, ttl):
+        failed = super().raw_set_many(items, ttl)
+        for key, data in items.items():
+            self.l1_store(key, data, ttl)
+        self.l1_discard(*failed)
+        return failed
+
+    def raw_delete(self, *keys):
+        self.l1_discard(*keys)
+        return super().raw_delete(*keys)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l1_discard(self.full_key(key, version))
+        return super().touch(key, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        self.l1_discard(self.full_key(key, version))
+        return super().incr(key, delta, version)
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        super().clear()
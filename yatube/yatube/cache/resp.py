@@ -0,0 +1,332 @@
+"""
+Минимальный клиент протокола RESP (Redis) и его локальная замена.
+
+RespServer понимает только команды, которые нужны кэшу и брокеру
+событий (PUBLISH/PSUBSCRIBE), и годится для тестов и замеров: хранит
+данные в памяти процесса и считает занятый объём.
+"""
+import socket
+import socketserver
+import threading
+import time
+from fnmatch import fnmatchcase
+
+
+class RespError(Exception):
+    pass
+
+
+def encode_command(*args):
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(parts)
+
+
+def read_reply(stream):
+    line = stream.readline()
+    if not line:
+        raise ConnectionError('Соединение закрыто.')
+    kind, payload = line[:1], line[1:-2]
+    if kind == b'+':
+        return payload.decode()
+    if kind == b'-':
+        raise RespError(payload.decode())
+    if kind == b':':
+        return int(payload)
+    if kind == b'$':
+        length = int(payload)
+        if length == -1:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2]
+    if kind == b'*':
+        length = int(payload)
+        if length == -1:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise RespError(f'Неизвестный ответ: {line!r}')
+
+
+class RespClient:
+    """Клиент с отдельным соединением на каждый поток."""
+
+    def __init__(self, host, port, db=0, timeout=1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port),
+                                        self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = sock.makefile('rb')
+        self._local.connection = (sock, stream)
+        if self.db:
+            self._send(sock, stream, ('SELECT', self.db))
+        return sock, stream
+
+    def _send(self, sock, stream, command):
+        sock.sendall(encode_command(*command))
+        return read_reply(stream)
+
+    def execute(self, *command):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._connect()
+        try:
+            return self._send(*connection, command)
+        except (ConnectionError, OSError):
+            self.close()
+            return self._send(*self._connect(), command)
+
+    def _send_pipeline(self, sock, stream, commands):
+        sock.sendall(b''.join(encode_command(*command)
+                              for command in commands))
+        replies = []
+        for _ in commands:
+            try:
+                replies.append(read_reply(stream))
+            except RespError as error:
+                replies.append(error)
+        return replies
+
+    def pipeline(self, commands):
+        """Отправляет команды одним пакетом и читает все ответы.
+
+        Ошибки отдельных команд возвращаются в списке как RespError.
+        """
+        commands = list(commands)
+        if not commands:
+            return []
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._connect()
+        try:
+            return self._send_pipeline(*connection, commands)
+        except (ConnectionError, OSError):
+            self.close()
+            return self._send_pipeline(*self._connect(), commands)
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            sock, stream = connection
+            stream.close()
+            sock.close()
+            self._local.connection = None
+
+
+class RespStore:
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def _alive(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return item
+
+    def _expires(self, options):
+        options = [option.upper() if isinstance(option, bytes) else option
+                   for option in options]
+        expires = None
+        only_new = b'NX' in options
+        for unit, scale in ((b'PX', 1000), (b'EX', 1)):
+            if unit in options:
+                amount = int(options[options.index(unit) + 1])
+                expires = time.monotonic() + amount / scale
+        return expires, only_new
+
+    def execute(self, name, args):
+        handler = getattr(self, f'cmd_{name.lower()}', None)
+        if handler is None:
+            raise RespError(f'ERR unknown command {name}')
+        with self.lock:
+            return handler(*args)
+
+    def cmd_ping(self):
+        return 'PONG'
+
+    def cmd_select(self, db):
+        return 'OK'
+
+    def cmd_get(self, key):
+        item = self._alive(key)
+        return None if item is None else item[0]
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        expires, only_new = self._expires(options)
+        if only_new and self._alive(key) is not None:
+            return None
+        self.data[key] = (value, expires)
+        return 'OK'
+
+    def cmd_mset(self, *pairs):
+        if not pairs or len(pairs) % 2:
+            raise RespError("ERR wrong number of arguments for 'mset'")
+        for key, value in zip(pairs[::2], pairs[1::2]):
+            self.data[key] = (value, None)
+        return 'OK'
+
+    def cmd_del(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def cmd_exists(self, *keys):
+        return sum(self._alive(key) is not None for key in keys)
+
+    def cmd_incrby(self, key, delta):
+        item = self._alive(key)
+        value, expires = item if item is not None else (b'0', None)
+        try:
+            value = int(value) + int(delta)
+        except ValueError:
+            raise RespError('ERR value is not an integer')
+        self.data[key] = (str(value).encode(), expires)
+        return value
+
+    def cmd_pexpire(self, key, milliseconds):
+        item = self._alive(key)
+        if item is None:
+            return 0
+        self.data[key] = (item[0], time.monotonic() + int(milliseconds) / 1000)
+        return 1
+
+    def cmd_persist(self, key):
+        item = self._alive(key)
+        if item is None:
+            return 0
+        self.data[key] = (item[0], None)
+        return 1
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        return 'OK'
+
+    def cmd_dbsize(self):
+        return len(self.data)
+
+    def cmd_info(self, *sections):
+        used = sum(len(key) + len(value)
+                   for key, (value, _) in self.data.items())
+        return f'used_memory:{used}\r\nkeys:{len(self.data)}\r\n'.encode()
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+
+    def write(self, data):
+        with self.write_lock:
+            self.wfile.write(data)
+
+    def handle(self):
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            name, args = command[0].decode(), command[1:]
+            if name.upper() == 'PSUBSCRIBE':
+                for pattern in args:
+                    count = self.server.subscribe(pattern, self)
+                    self.write(encode_reply([b'psubscribe', pattern, count]))
+                continue
+            try:
+                if name.upper() == 'PUBLISH':
+                    reply = self.server.publish(*args)
+                else:
+                    reply = self.server.store.execute(name, args)
+            except RespError as error:
+                self.write(b'-%s\r\n' % str(error).encode())
+                continue
+            self.write(encode_reply(reply))
+
+    def finish(self):
+        self.server.unsubscribe(self)
+        super().finish()
+
+
+def encode_reply(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, str):
+        return b'+%s\r\n' % reply.encode()
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    return b'*%d\r\n' % len(reply) + b''.join(map(encode_reply, reply))
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """Сервер в отдельном потоке текущего процесса."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), RespHandler)
+        self.store = RespStore()
+        self.thread = None
+        self.subscriptions = []
+        self.subscriptions_lock = threading.Lock()
+
+    @property
+    def address(self):
+        host, port = self.server_address[:2]
+        return f'{host}:{port}'
+
+    def subscribe(self, pattern, handler):
+        with self.subscriptions_lock:
+            self.subscriptions.append((pattern, handler))
+            return sum(1 for _, subscriber in self.subscriptions
+                       if subscriber is handler)
+
+    def unsubscribe(self, handler):
+        with self.subscriptions_lock:
+            self.subscriptions = [
+                (pattern, subscriber)
+                for pattern, subscriber in self.subscriptions
+                if subscriber is not handler
+            ]
+
+    def publish(self, channel, message):
+        with self.subscriptions_lock:
+            targets = [
+                (pattern, handler)
+                for pattern, handler in self.subscriptions
+                if fnmatchcase(channel.decode(), pattern.decode())
+            ]
+        for pattern, handler in targets:
+            try:
+                handler.write(encode_reply(
+                    [b'pmessage', pattern, channel, message]))
+            except OSError:
+                self.unsubscribe(handler)
+        return len(targets)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,34 @@
+import json
+import zlib
+
+JSON = b'j'
+COMPRESSED = b'z'
+
+
+class JSONSerializer:
+    """Сериализация без pickle: целые числа хранятся как текст (для INCR),
+    остальное — как JSON, большие значения дополнительно сжимаются.
+    """
+
+    def __init__(self, min_compress_length=1024, compress_level=6):
+        self.min_compress_length = min_compress_length
+        self.compress_level = compress_level
+
+    def dumps(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode()
+        data = json.dumps(value, ensure_ascii=False,
+                          separators=(',', ':')).encode()
+        if len(data) >= self.min_compress_length:
+            compressed = zlib.compress(data, self.compress_level)
+            if len(compressed) < len(data):
+                return COMPRESSED + compressed
+        return JSON + data
+
+    def loads(self, data):
+        marker, payload = data[:1], data[1:]
+        if marker == JSON:
+            return json.loads(payload)
+        if marker == COMPRESSED:
+            return json.loads(zlib.decompress(payload))
+        return int(data)
@@ -0,0 +1,108 @@
+"""
+Сжатие ответов gzip или brotli по Accept-Encoding.
+
+CompressionMiddleware сжимает текстовые ответы не короче
+COMPRESSION_MIN_SIZE байт. Если у ответа уже есть готовые сжатые копии
+(precompressed — их хранит кэш страниц posts.middleware), они отдаются
+как есть и процессор на сжатие не тратится. Brotli используется, только
+если установлен пакет brotli.
+
+Страницы с CSRF-токеном не сжимаются: если рядом с секретом в странице
+отражается ввод пользователя, по размеру сжатого ответа секрет можно
+подобрать (BREACH).
+"""
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml)|image/svg\+xml)')
+# При равном q выбирается первое
+PREFERRED = ('br', 'gzip')
+STRONG_ETAG = re.compile(r'^"[^"]*"$')
+
+
+def available_encodings():
+    if brotli is None:
+        return ('gzip',)
+    return PREFERRED
+
+
+def compress(content, encoding, best=False):
+    """Сжимает байты; best — медленнее, но плотнее, для хранимых копий."""
+    if encoding == 'br':
+        return brotli.compress(content, quality=11 if best else 5)
+    return gzip.compress(content, compresslevel=9 if best else 6, mtime=0)
+
+
+def compress_all(content):
+    """Сжатые копии содержимого во всех доступных кодировках."""
+    return {encoding: compress(content, encoding, best=True)
+            for encoding in available_encodings()}
+
+
+def accepted_encoding(request, encodings):
+    """Лучшая из encodings по заголовку Accept-Encoding или None."""
+    weights = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = quality
+    candidates = [
+        (weights.get(encoding, weights.get('*', 0)), -position, encoding)
+        for position, encoding in enumerate(encodings)
+    ]
+    quality, _, encoding = max(candidates, default=(0, 0, None))
+    return encoding if quality > 0 else None
+
+
+def is_compressible(request, response):
+    return (
+        not request.META.get('CSRF_COOKIE_USED')
+        and not response.streaming
+        and not response.has_header('Content-Encoding')
+        and COMPRESSIBLE_TYPES.match(response.get('Content-Type', ''))
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not is_compressible(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        precompressed = getattr(response, 'precompressed', None) or {}
+        encoding = accepted_encoding(
+            request, [*precompressed] or available_encodings())
+        if encoding is None:
+            return response
+        content = precompressed.get(encoding)
+        if content is None:
+            content = compress(response.content, encoding)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        # Сжатое тело отличается побайтно, поэтому ETag становится слабым
+        etag = response.get('ETag')
+        if etag and STRONG_ETAG.match(etag):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -1,5 +1,7 @@
 import datetime as dt
 
+from .events.sse import ENVIRON_KEY
+
 
 def year(request):
     """
@@ -7,3 +9,11 @@ def year(request):
     """
     year = dt.date.today().year
     return {'year': year}
+
+
+def live_updates(request):
+    """
+    Подключать ли поток событий о новых постах: дёшево он держится
+    только под ASGI-мостом (yatube.asgi).
+    """
+    return {'live_updates': ENVIRON_KEY in request.META}
@@ -0,0 +1,113 @@
+"""
+Чтение с реплик для лент и закрепление за основной базой после записи.
+
+ReplicaPinningMiddleware разрешает чтение с реплики только в безопасных
+запросах к view из DATABASE_REPLICA_VIEWS. После запроса, который что-то
+записал, браузер на DATABASE_PIN_SECONDS получает cookie, и все его
+запросы читают из основной базы, чтобы сразу видеть свои изменения.
+
+Реплика может отставать на DATABASE_REPLICA_LAG секунд. Версии кэша
+(posts.cache) моложе этого срока могли появиться после записи, которой
+на реплике ещё нет, поэтому такие страницы строятся из основной базы:
+иначе старые данные попали бы в кэш и ETag под новой версией.
+"""
+import random
+import threading
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+# Сессии пишутся при входе и должны читаться без задержки репликации
+PRIMARY_APPS = ('sessions',)
+
+_state = threading.local()
+
+
+def replica_allowed():
+    return getattr(_state, 'replica', False)
+
+
+def set_replica_allowed(allowed):
+    """Переносит разрешение текущего запроса в поток пула."""
+    _state.replica = allowed
+
+
+def may_lag_behind(written_at):
+    """True, если реплика могла ещё не получить запись от written_at."""
+    if written_at is None:
+        return True
+    age = datetime.now(timezone.utc) - written_at
+    return age.total_seconds() < settings.DATABASE_REPLICA_LAG
+
+
+def read_primary_if_lagging(written_at):
+    """Переводит запрос на основную базу, если реплика может отставать."""
+    if replica_allowed() and may_lag_behind(written_at):
+        set_replica_allowed(False)
+
+
+class WriteTracker:
+    """Обёртка execute, замечающая изменяющие данные запросы."""
+
+    def __init__(self):
+        self.wrote = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            self.wrote = True
+        return execute(sql, params, many, context)
+
+
+class ReplicaRouter:
+    """Чтение — с одной из DATABASE_REPLICAS, если запрос это разрешил.
+
+    В остальных случаях и при записи базу выбирает Django как обычно
+    (основная).
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or not replica_allowed():
+            return None
+        if model._meta.app_label in PRIMARY_APPS:
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica = False
+        writes = WriteTracker()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(writes))
+                response = self.get_response(request)
+            if request.method not in SAFE_METHODS or writes.wrote:
+                response.set_cookie(PIN_COOKIE, '1',
+                                    max_age=settings.DATABASE_PIN_SECONDS,
+                                    httponly=True, samesite='Lax')
+            return response
+        finally:
+            _state.replica = False
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _state.replica = (
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name
+            in settings.DATABASE_REPLICA_VIEWS
+        )
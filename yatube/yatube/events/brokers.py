@@ -0,0 +1,133 @@
+"""
+Публикация событий и подписка на них для server-sent events.
+
+LocalBroker раздаёт события подписчикам своего процесса. RespBroker
+публикует их на Redis-совместимый сервер, и каждый процесс получает
+все события одним PSUBSCRIBE, а дальше раздаёт их так же, как
+LocalBroker. Брокер выбирается настройкой EVENTS_BROKER.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from ..cache.resp import RespClient, encode_command, read_reply
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'yatube:events:'
+
+
+class LocalBroker:
+    """Подписчики в памяти процесса.
+
+    deliver(channel, message) вызывается в потоке публикующего и не
+    должен блокироваться: обычно он кладёт сообщение в очередь.
+    """
+
+    def __init__(self, options=None):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def subscribe(self, channels, deliver):
+        """Подписывает deliver на каналы; возвращает функцию отписки."""
+        channels = tuple(channels)
+        with self.lock:
+            for channel in channels:
+                self.subscribers[channel].add(deliver)
+
+        def unsubscribe():
+            with self.lock:
+                for channel in channels:
+                    self.subscribers[channel].discard(deliver)
+                    if not self.subscribers[channel]:
+                        del self.subscribers[channel]
+        return unsubscribe
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def deliver(self, channel, message):
+        with self.lock:
+            targets = list(self.subscribers.get(channel, ()))
+        for deliver in targets:
+            try:
+                deliver(channel, message)
+            except Exception:
+                logger.exception('Не удалось доставить событие %s', channel)
+
+    def listeners(self):
+        with self.lock:
+            return sum(map(len, self.subscribers.values()))
+
+
+class RespBroker(LocalBroker):
+    """События через общий Redis-совместимый сервер (LOCATION "host:port").
+
+    Слушающий поток запускается при первой подписке и после обрыва
+    соединения переподключается каждые RECONNECT_DELAY секунд.
+    """
+
+    RECONNECT_DELAY = 1
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        host, _, port = options['LOCATION'].rpartition(':')
+        self.address = (host or '127.0.0.1', int(port or 6379))
+        self.client = RespClient(*self.address,
+                                 timeout=options.get('SOCKET_TIMEOUT', 1.0))
+        self.listener = None
+        self.ready = threading.Event()
+
+    def publish(self, channel, message):
+        self.client.execute('PUBLISH', CHANNEL_PREFIX + channel,
+                            json.dumps(message))
+
+    def subscribe(self, channels, deliver):
+        unsubscribe = super().subscribe(channels, deliver)
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(
+                    target=self.listen, name='events', daemon=True)
+                self.listener.start()
+        return unsubscribe
+
+    def listen(self):
+        while True:
+            try:
+                with socket.create_connection(self.address) as sock:
+                    stream = sock.makefile('rb')
+                    sock.sendall(encode_command(
+                        'PSUBSCRIBE', CHANNEL_PREFIX + '*'))
+                    read_reply(stream)
+                    self.ready.set()
+                    while True:
+                        kind, _, channel, data = read_reply(stream)
+                        if kind == b'pmessage':
+                            self.deliver(
+                                channel.decode()[len(CHANNEL_PREFIX):],
+                                json.loads(data))
+            except (ConnectionError, OSError, ValueError):
+                self.ready.clear()
+                logger.warning('Соединение с брокером событий потеряно')
+                time.sleep(self.RECONNECT_DELAY)
+
+
+_broker = None
+_pid = None
+
+
+def get_broker():
+    """Брокер процесса; после fork дочерний процесс создаёт свой."""
+    global _broker, _pid
+    if _broker is None or _pid != os.getpid():
+        options = dict(settings.EVENTS_BROKER)
+        _broker = import_string(options.pop('BACKEND'))(options)
+        _pid = os.getpid()
+    return _broker
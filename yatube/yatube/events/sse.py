@@ -0,0 +1,92 @@
+"""
+Ответ text/event-stream о новых постах в каналах брокера.
+
+Под yatube.asgi view только выбирает каналы и сразу освобождает поток:
+соединение дальше держит цикл событий, и простаивающий слушатель стоит
+одну корутину и очередь. Под WSGI поток занимал бы поток сервера и
+соединение с базой, пока открыта вкладка, поэтому там view отвечает
+204: по спецификации EventSource после него не переподключается.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .brokers import get_broker
+
+ENVIRON_KEY = 'yatube.event_stream'
+PING = b': ping\n\n'
+
+
+class EventStream:
+    """Кладётся ASGI-мостом в environ; view заполняет каналы."""
+
+    def __init__(self):
+        self.channels = None
+        self.event = None
+
+
+def format_event(event, data):
+    payload = json.dumps(data, separators=(',', ':'))
+    return f'event: {event}\ndata: {payload}\n\n'.encode()
+
+
+def drain(get):
+    """Забирает из очереди всё, что накопилось: пачка постов — одно
+    событие."""
+    count = 1
+    while True:
+        try:
+            get()
+        except asyncio.QueueEmpty:
+            return count
+        count += 1
+
+
+def event_stream_response(request, channels, event):
+    stream = request.META.get(ENVIRON_KEY)
+    if stream is None:
+        return HttpResponse(status=204)
+    stream.channels = list(channels)
+    stream.event = event
+    response = HttpResponse(content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def stream_events(stream, receive, send):
+    """Пересылает события клиенту, пока тот не отключится."""
+    loop = asyncio.get_running_loop()
+    messages = asyncio.Queue()
+
+    def deliver(channel, message):
+        loop.call_soon_threadsafe(messages.put_nowait, message)
+
+    unsubscribe = get_broker().subscribe(stream.channels, deliver)
+    disconnected = asyncio.ensure_future(receive())
+    count = 0
+    try:
+        await send({'type': 'http.response.body', 'body': PING,
+                    'more_body': True})
+        while True:
+            message = asyncio.ensure_future(messages.get())
+            done, _ = await asyncio.wait(
+                {message, disconnected},
+                timeout=settings.EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                message.cancel()
+                return
+            if message in done:
+                count += drain(messages.get_nowait)
+                body = format_event(stream.event, {'count': count})
+            else:
+                message.cancel()
+                body = PING
+            await send({'type': 'http.response.body', 'body': body,
+                        'more_body': True})
+    finally:
+        unsubscribe()
+        disconnected.cancel()
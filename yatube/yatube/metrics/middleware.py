@@ -0,0 +1,112 @@
+import random
+import threading
+from contextlib import ExitStack
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+from .registry import LATENCY_BUCKETS, QUERY_BUCKETS, registry
+
+BUCKETS = {
+    'yatube_view_latency_seconds': LATENCY_BUCKETS,
+    'yatube_view_db_seconds': LATENCY_BUCKETS,
+    'yatube_view_template_seconds': LATENCY_BUCKETS,
+    'yatube_view_queries': QUERY_BUCKETS,
+}
+
+registry.describe('yatube_view_requests_total', 'Все запросы по view.')
+registry.describe('yatube_view_latency_seconds',
+                  'Полное время ответа (выборка).')
+registry.describe('yatube_view_db_seconds', 'Время в SQL (выборка).')
+registry.describe('yatube_view_template_seconds',
+                  'Время рендеринга шаблонов (выборка).')
+registry.describe('yatube_view_queries', 'Число SQL-запросов (выборка).')
+
+_local = threading.local()
+
+
+class Sample:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0
+        self.template_time = 0
+        self.rendering = False
+        # posts.concurrent вызывает обёртку и из потоков своего пула
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self.lock:
+                self.db_time += perf_counter() - started
+                self.queries += 1
+
+
+def instrument_templates():
+    """Оборачивает Template.render: время считается только у внешнего
+    шаблона и только в запросах, попавших в выборку."""
+    original = Template.render
+    if getattr(original, 'instrumented', False):
+        return
+
+    @wraps(original)
+    def render(self, context):
+        sample = getattr(_local, 'sample', None)
+        if sample is None or sample.rendering:
+            return original(self, context)
+        sample.rendering = True
+        started = perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            sample.template_time += perf_counter() - started
+            sample.rendering = False
+
+    render.instrumented = True
+    Template.render = render
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.url_name or 'unnamed'
+
+
+class MetricsMiddleware:
+    """Считает запросы по имени URL, а для доли METRICS_SAMPLE_RATE
+    запросов ещё и SQL, время в базе, шаблонах и полное время ответа."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_templates()
+
+    def __call__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            response = self.get_response(request)
+            registry.inc('yatube_view_requests_total',
+                         view=view_label(request))
+            return response
+        sample = _local.sample = Sample()
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sample))
+                response = self.get_response(request)
+        finally:
+            _local.sample = None
+        label = view_label(request)
+        registry.inc('yatube_view_requests_total', view=label)
+        registry.observe_many({
+            'yatube_view_latency_seconds': perf_counter() - started,
+            'yatube_view_db_seconds': sample.db_time,
+            'yatube_view_template_seconds': sample.template_time,
+            'yatube_view_queries': sample.queries,
+        }, BUCKETS, view=label)
+        return response
@@ -0,0 +1,123 @@
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин (как в Prometheus)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """Счётчики, показатели и гистограммы в памяти процесса.
+
+    Каждая серия определяется именем метрики и набором меток.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self.key(name, labels)] = value
+
+    def observe(self, name, value, buckets, **labels):
+        self.observe_many({name: value}, {name: buckets}, **labels)
+
+    def observe_many(self, values, buckets, **labels):
+        """Записывает несколько наблюдений под одной блокировкой."""
+        with self.lock:
+            for name, value in values.items():
+                key = self.key(name, labels)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(
+                        buckets[name])
+                histogram.observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def render(self):
+        """Текстовый формат экспозиции Prometheus."""
+        lines = []
+        with self.lock:
+            for kind, series in (('counter', self.counters),
+                                 ('gauge', self.gauges)):
+                for name, items in self.grouped(series):
+                    self.header(lines, name, kind)
+                    for labels, value in items:
+                        lines.append(f'{name}{format_labels(labels)} '
+                                     f'{value}')
+            for name, items in self.grouped(self.histograms):
+                self.header(lines, name, 'histogram')
+                for labels, histogram in items:
+                    for bound, total in histogram.cumulative():
+                        bucket_labels = labels + (('le', bound),)
+                        lines.append(f'{name}_bucket'
+                                     f'{format_labels(bucket_labels)} '
+                                     f'{total}')
+                    lines.append(f'{name}_sum{format_labels(labels)} '
+                                 f'{histogram.sum:.6g}')
+                    lines.append(f'{name}_count{format_labels(labels)} '
+                                 f'{histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def grouped(series):
+        by_name = {}
+        for (name, labels), value in sorted(series.items(),
+                                            key=lambda item: item[0]):
+            by_name.setdefault(name, []).append((labels, value))
+        return sorted(by_name.items())
+
+    def header(self, lines, name, kind):
+        if name in self.help:
+            lines.append(f'# HELP {name} {self.help[name]}')
+        lines.append(f'# TYPE {name} {kind}')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .registry import registry
+
+# Заголовки, которые добавляет обратный прокси: за ним REMOTE_ADDR
+# у всех клиентов — адрес прокси
+PROXY_HEADERS = ('HTTP_X_FORWARDED_FOR', 'HTTP_X_REAL_IP', 'HTTP_FORWARDED')
+
+
+def has_access(request):
+    """С METRICS_TOKEN — только с заголовком Authorization: Bearer <токен>,
+    без него — только напрямую (не через прокси) с INTERNAL_IPS."""
+    if settings.METRICS_TOKEN:
+        return constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''),
+            f'Bearer {settings.METRICS_TOKEN}')
+    return (request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+            and not any(header in request.META for header in PROXY_HEADERS))
+
+
+def metrics(request):
+    """Метрики в текстовом формате для сборщика."""
+    if not has_access(request):
+        raise Http404
+    return HttpResponse(registry.render(),
+                        content_type='text/plain; version=0.0.4; '
+                                     'charset=utf-8')
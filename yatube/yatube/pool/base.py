@@ -0,0 +1,24 @@
+from .pool import get_pool
+
+
+class PooledDatabaseWrapperMixin:
+    """Берёт соединения из пула процесса и возвращает их туда при close().
+
+    Соединение, закрытое внутри atomic-блока (после ошибки), в пул
+    не возвращается.
+    """
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, conn_params,
+                        self.settings_dict.get('POOL'))
+        self.pool = pool
+        return pool.acquire(
+            lambda: super(PooledDatabaseWrapperMixin,
+                          self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return None
+        with self.wrap_database_errors:
+            self.pool.release(self.connection,
+                              reusable=not self.in_atomic_block)
@@ -0,0 +1,197 @@
+"""
+Пул соединений с базой на процесс (воркер).
+
+Django закрывает соединение в конце каждого запроса; бэкенды из этого
+пакета вместо закрытия возвращают его в пул, а следующий запрос берёт
+готовое соединение. Настройки — ключ POOL в описании базы в DATABASES:
+
+    MAX_SIZE — сколько соединений процесс может держать открытыми;
+    TIMEOUT — сколько секунд ждать свободного соединения;
+    MAX_LIFETIME — через сколько секунд соединение пересоздаётся;
+    HEALTH_CHECK_INTERVAL — после скольких секунд простоя соединение
+    проверяется запросом SELECT 1 перед выдачей.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+from django.db.utils import OperationalError
+
+from ..metrics.registry import LATENCY_BUCKETS, registry
+
+DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 5,
+    'MAX_LIFETIME': 1800,
+    'HEALTH_CHECK_INTERVAL': 30,
+}
+
+registry.describe('yatube_db_pool_wait_seconds',
+                  'Ожидание соединения из пула.')
+registry.describe('yatube_db_pool_connects_total',
+                  'Открыто новых соединений.')
+registry.describe('yatube_db_pool_discards_total',
+                  'Закрыто соединений пулом (по причинам).')
+registry.describe('yatube_db_pool_timeouts_total',
+                  'Не дождались свободного соединения.')
+registry.describe('yatube_db_pool_in_use', 'Выданные соединения.')
+registry.describe('yatube_db_pool_idle', 'Свободные соединения.')
+
+
+_local = threading.local()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+@contextmanager
+def without_waiting():
+    """Соединение в этом потоке выдаётся, только если оно есть сразу;
+    иначе — PoolTimeout без ожидания."""
+    _local.no_wait = True
+    try:
+        yield
+    finally:
+        _local.no_wait = False
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.used = monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, alias, options=None):
+        options = {**DEFAULTS, **(options or {})}
+        self.alias = alias
+        self.max_size = options['MAX_SIZE']
+        self.timeout = options['TIMEOUT']
+        self.max_lifetime = options['MAX_LIFETIME']
+        self.health_check_interval = options['HEALTH_CHECK_INTERVAL']
+        self.idle = []
+        self.in_use = {}
+        self.opening = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, connect):
+        """Отдаёт соединение: свободное из пула, новое (connect())
+        или освободившееся за время ожидания."""
+        started = monotonic()
+        no_wait = getattr(_local, 'no_wait', False)
+        deadline = started + (0 if no_wait else self.timeout)
+        with self.condition:
+            while True:
+                while self.idle:
+                    item = self.idle.pop()
+                    if self.usable(item):
+                        return self.checkout(item, started)
+                if len(self.in_use) + self.opening < self.max_size:
+                    break
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    if not no_wait:
+                        registry.inc('yatube_db_pool_timeouts_total',
+                                     alias=self.alias)
+                    raise PoolTimeout(
+                        f'Нет свободных соединений с базой «{self.alias}» '
+                        f'за {self.timeout} с.')
+                self.condition.wait(remaining)
+            # Место под новое соединение занимаем до выхода из блокировки
+            self.opening += 1
+        try:
+            connection = connect()
+        except Exception:
+            with self.condition:
+                self.opening -= 1
+                self.condition.notify()
+            raise
+        registry.inc('yatube_db_pool_connects_total', alias=self.alias)
+        with self.condition:
+            self.opening -= 1
+            return self.checkout(PooledConnection(connection), started)
+
+    def checkout(self, item, started):
+        self.in_use[id(item.connection)] = item
+        registry.observe('yatube_db_pool_wait_seconds', monotonic() - started,
+                         LATENCY_BUCKETS, alias=self.alias)
+        self.report()
+        return item.connection
+
+    def usable(self, item):
+        now = monotonic()
+        if now - item.created > self.max_lifetime:
+            self.discard(item.connection, 'lifetime')
+            return False
+        if now - item.used > self.health_check_interval:
+            try:
+                cursor = item.connection.cursor()
+                cursor.execute('SELECT 1')
+                cursor.close()
+            except Exception:
+                self.discard(item.connection, 'health_check')
+                return False
+        return True
+
+    def release(self, connection, reusable=True):
+        """Возвращает соединение; незавершённая транзакция откатывается."""
+        if reusable:
+            try:
+                connection.rollback()
+            except Exception:
+                reusable = False
+        with self.condition:
+            item = self.in_use.pop(id(connection), None)
+            if item is None:
+                reusable = False
+            if reusable:
+                item.used = monotonic()
+                self.idle.append(item)
+            else:
+                self.discard(connection, 'error')
+            self.report()
+            self.condition.notify()
+
+    def discard(self, connection, reason):
+        registry.inc('yatube_db_pool_discards_total', alias=self.alias,
+                     reason=reason)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        with self.condition:
+            while self.idle:
+                self.discard(self.idle.pop().connection, 'shutdown')
+            self.report()
+
+    def report(self):
+        registry.set('yatube_db_pool_in_use', len(self.in_use),
+                     alias=self.alias)
+        registry.set('yatube_db_pool_idle', len(self.idle), alias=self.alias)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def get_pool(alias, params, options):
+    """Пул процесса для базы с такими параметрами подключения.
+
+    После fork дочерний процесс начинает с пустыми пулами: соединения
+    родителя в нём не используются.
+    """
+    global _pid
+    key = (alias, repr(sorted(params.items())))
+    with _pools_lock:
+        if os.getpid() != _pid:
+            _pools.clear()
+            _pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(alias, options)
+        return pool
@@ -41,6 +41,7 @@ INTERNAL_IPS = [
 INSTALLED_APPS = [
     'about',
     'users',
+    'api',
     'posts.apps.PostsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -53,6 +54,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yatube.staticfiles.StaticFilesMiddleware',
+    'yatube.metrics.middleware.MetricsMiddleware',
+    'yatube.db_router.ReplicaPinningMiddleware',
+    'yatube.compression.CompressionMiddleware',
+    'posts.middleware.AnonymousPageCacheMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +71,91 @@ MIDDLEWARE = [
 
 NUMBER_OF_RECORDS_ON_THE_PAGINATOR_PAGE = 10
 
+# Комментариев на странице поста и в каждой подгрузке «Показать ещё»
+POSTS_COMMENTS_PER_PAGE = 20
+
+# Наибольший размер страницы API (?limit=)
+API_MAX_PAGE_SIZE = 100
+
+# Курсорная пагинация лент по (pub_date, id) вместо номеров страниц
+POSTS_CURSOR_PAGINATION = False
+
+# Посты авторов, у которых подписчиков больше лимита, не раскладываются
+# по лентам подписчиков, а подмешиваются в ленту при чтении
+POSTS_TIMELINE_FANOUT_LIMIT = 10000
+
+# Сколько последних постов автора добавить в ленту при подписке
+POSTS_TIMELINE_BACKFILL = 200
+
+# Сколько секунд один процесс может пересчитывать фрагмент ленты,
+# пока остальные отдают устаревшую копию
+POSTS_FEED_CACHE_LOCK_TIMEOUT = 10
+
+# Сколько секунд хранится фрагмент ленты; ключ зависит от пользователя
+# и страницы (курсора), поэтому без срока такие записи копились бы вечно
+POSTS_FEED_CACHE_TIMEOUT = 60 * 60
+
+# Сколько секунд хранится карточка поста; после правки поста, комментария
+# или миниатюры карточка получает новый ключ и старая просто истекает
+POSTS_CARD_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Добавляется к ETag лент и постов; сменить при выкладке новых шаблонов,
+# чтобы клиенты не получали 304 на устаревшую разметку
+POSTS_ETAG_SALT = ''
+
+# Сколько секунд гости получают страницу из кэша целиком (0 — не кэшировать);
+# изменения постов, комментариев и групп сбрасывают её раньше
+POSTS_PAGE_CACHE_TIMEOUT = 300
+POSTS_PAGE_CACHE_VIEWS = ('index', 'posts_group', 'profile', 'post')
+
+# Ответы короче стольких байт отдаются без сжатия: выигрыш меньше
+# накладных расходов
+COMPRESSION_MIN_SIZE = 500
+
+# Поисковый бэкенд (путь к классу); None — FTS5 на SQLite, иначе
+# поиск подстроки в базе
+POSTS_SEARCH_BACKEND = None
+
+# Потоков в пуле, который строит миниатюры загруженных изображений;
+# 0 — строить сразу после коммита в потоке запроса
+POSTS_THUMBNAIL_WORKERS = 2
+
+# Потоков для независимых запросов внутри одного view (профиль, пост);
+# 0 — выполнять их по очереди
+POSTS_PARALLEL_QUERIES = 4
+
+# Брокер событий для server-sent events: в памяти процесса или, если задан
+# YATUBE_EVENTS_LOCATION ("host:port"), общий Redis-совместимый сервер
+EVENTS_BROKER = {'BACKEND': 'yatube.events.brokers.LocalBroker'}
+EVENTS_LOCATION = os.environ.get('YATUBE_EVENTS_LOCATION')
+
+if EVENTS_LOCATION:
+    EVENTS_BROKER = {
+        'BACKEND': 'yatube.events.brokers.RespBroker',
+        'LOCATION': EVENTS_LOCATION,
+    }
+
+# Через сколько секунд тишины отправлять клиенту комментарий-пинг
+EVENTS_HEARTBEAT = 15
+
+# Ограничения на загружаемые изображения: размер файла в байтах,
+# число пикселей по заголовку и длина стороны после перекодирования
+POSTS_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+POSTS_IMAGE_MAX_PIXELS = 25 * 1000 * 1000
+POSTS_IMAGE_MAX_SIDE = 2560
+
+# Самое большое тело запроса, которое yatube.asgi примет от клиента:
+# изображение плюс остальные поля формы; больше — ответ 413
+ASGI_MAX_BODY_SIZE = POSTS_IMAGE_MAX_UPLOAD_SIZE + 1024 * 1024
+
+# Доля запросов, для которых MetricsMiddleware считает SQL, время
+# в базе и шаблонах; число запросов учитывается всегда
+METRICS_SAMPLE_RATE = 0.05
+
+# Токен сборщика метрик для /metrics/ (Authorization: Bearer <токен>);
+# без него метрики отдаются только прямым запросам с INTERNAL_IPS
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN')
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
@@ -81,6 +172,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'yatube.context_processors.year',
+                'yatube.context_processors.live_updates',
             ],
         },
     },
@@ -92,13 +184,56 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Соединения берутся из пула процесса (yatube.pool) и возвращаются
+# туда в конце запроса вместо закрытия
+DATABASE_POOL = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 5,
+    'MAX_LIFETIME': 1800,
+    'HEALTH_CHECK_INTERVAL': 30,
+}
+
+# Потоков, в которых yatube.asgi выполняет Django; соединения клиентов
+# обслуживает цикл событий и потоков не занимает. Каждому потоку нужно
+# своё соединение, поэтому потоков не больше, чем соединений в пуле
+ASGI_THREADS = DATABASE_POOL['MAX_SIZE']
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.pool.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'POOL': DATABASE_POOL,
     }
 }
 
+# Реплика только для чтения (путь к копии базы SQLite); в тестах она
+# указывает на тестовую основную базу
+REPLICA_NAME = os.environ.get('YATUBE_REPLICA_DB')
+
+DATABASE_REPLICAS = []
+
+if REPLICA_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': 'yatube.pool.sqlite3',
+        'NAME': REPLICA_NAME,
+        'POOL': DATABASE_POOL,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append('replica')
+
+DATABASE_ROUTERS = ['yatube.db_router.ReplicaRouter']
+
+# Страницы, которые в безопасных запросах читают с реплики
+DATABASE_REPLICA_VIEWS = (
+    'index', 'posts_group', 'profile', 'post', 'follow_index',
+)
+
+# На сколько секунд реплика может отставать от основной базы
+DATABASE_REPLICA_LAG = 5
+
+# Сколько секунд после записи запросы браузера идут в основную базу
+DATABASE_PIN_SECONDS = DATABASE_REPLICA_LAG
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -144,6 +279,14 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# Исходники статики (bootstrap, jquery); collectstatic собирает их
+# в STATIC_ROOT с хэшем в именах, манифестом и сжатыми копиями
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'assets')]
+STATICFILES_STORAGE = (
+    'yatube.staticfiles.CompressedManifestStaticFilesStorage')
+# Сколько секунд браузер хранит файлы статики без хэша в имени;
+# файлы с хэшем кэшируются на год
+STATIC_MAX_AGE = 60 * 60
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -153,3 +296,17 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Общий Redis-совместимый кэш ("host:port") с локальным LRU в каждом процессе
+CACHE_LOCATION = os.environ.get('YATUBE_CACHE_LOCATION')
+
+if CACHE_LOCATION:
+    CACHES['default'] = {
+        'BACKEND': 'yatube.cache.backends.TieredCache',
+        'LOCATION': CACHE_LOCATION,
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 1,
+            'SERIALIZER_OPTIONS': {'min_compress_length': 1024},
+        },
+    }
@@ -0,0 +1,123 @@
+"""
+Статика с хэшем в имени, сжатыми копиями и долгим кэшированием.
+
+collectstatic с CompressedManifestStaticFilesStorage кладёт в STATIC_ROOT
+файлы с хэшем содержимого в имени, манифест и рядом с текстовыми
+файлами их .gz и .br копии. {% static %} ссылается на имена с хэшем,
+поэтому StaticFilesMiddleware может отдавать их с кэшированием на год:
+новое содержимое получит новое имя, и повторные визиты ничего не
+скачивают заново.
+"""
+import logging
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compression import (COMPRESSIBLE_TYPES, PREFERRED, accepted_encoding,
+                          compress_all)
+
+logger = logging.getLogger(__name__)
+
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+# Хэш, который ManifestStaticFilesStorage добавляет перед расширением
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            for compressed_name in self.compress(name):
+                yield compressed_name, compressed_name, True
+
+    def compress(self, name):
+        """Сохраняет сжатые копии файла, если они меньше оригинала."""
+        content_type, _ = mimetypes.guess_type(name)
+        if not content_type or not COMPRESSIBLE_TYPES.match(content_type):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < settings.COMPRESSION_MIN_SIZE:
+            return
+        for encoding, compressed in compress_all(content).items():
+            if len(compressed) >= len(content):
+                continue
+            compressed_name = name + SUFFIXES[encoding]
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield compressed_name
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Статика не собрана: ссылка без хэша лучше ошибки на странице
+            logger.warning('Нет файла статики %s в манифесте', name)
+            return name
+
+
+def static_path(request):
+    """Путь к файлу в STATIC_ROOT для запроса или None."""
+    if (request.method not in SAFE_METHODS
+            or not request.path_info.startswith(settings.STATIC_URL)):
+        return None
+    name = request.path_info[len(settings.STATIC_URL):]
+    try:
+        path = safe_join(settings.STATIC_ROOT, name)
+    except SuspiciousFileOperation:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT без вызова view.
+
+    Файлы с хэшем в имени кэшируются браузером на год, остальные —
+    на STATIC_MAX_AGE секунд. Сжатая копия выбирается по Accept-Encoding.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path = static_path(request)
+        if path is None:
+            return self.get_response(request)
+        stat = os.stat(path)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                                  stat.st_mtime, stat.st_size):
+            return HttpResponseNotModified()
+        encodings = [encoding for encoding in PREFERRED
+                     if os.path.isfile(path + SUFFIXES[encoding])]
+        encoding = accepted_encoding(request, encodings)
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(
+            open(path + SUFFIXES.get(encoding, ''), 'rb'),
+            content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if encodings:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if HASHED_NAME.search(path):
+            response['Cache-Control'] = IMMUTABLE
+        else:
+            response['Cache-Control'] = (
+                f'public, max-age={settings.STATIC_MAX_AGE}')
+        return response
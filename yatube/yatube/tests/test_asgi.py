@@ -0,0 +1,158 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import SimpleTestCase, override_settings
+
+from ..asgi import WSGIBridge, check_threads
+from ..events.sse import PING
+
+
+def http_scope(path='/', method='GET', headers=(), query_string=b''):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'query_string': query_string,
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000),
+    }
+
+
+def call(bridge, scope, chunks=(b'',)):
+    """Прогоняет один запрос через bridge, возвращает отправленные
+    сообщения."""
+    messages = []
+    incoming = [{'type': 'http.request', 'body': chunk,
+                 'more_body': number < len(chunks) - 1}
+                for number, chunk in enumerate(chunks)]
+
+    async def receive():
+        return incoming.pop(0) if incoming else {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(bridge(scope, receive, send))
+    return messages
+
+
+class WSGIBridgeTests(SimpleTestCase):
+
+    def test_request_reaches_wsgi_application(self):
+        """Проверка: путь, заголовки и тело по частям доходят до WSGI."""
+        seen = {}
+
+        def application(environ, start_response):
+            seen.update(environ)
+            seen['body'] = environ['wsgi.input'].read()
+            seen['thread'] = threading.current_thread().name
+            start_response('201 Created', [('Content-Type', 'text/plain')])
+            return [b'ok', b'']
+
+        bridge = WSGIBridge(application, threads=2, max_memory_body=4)
+        messages = call(bridge, http_scope(
+            '/путь/', 'POST', [(b'content-type', b'text/plain'),
+                               (b'x-token', b'1'), (b'x-token', b'2')],
+            b'a=1'), chunks=(b'hello ', b'world'))
+        self.assertEqual(seen['REQUEST_METHOD'], 'POST')
+        self.assertEqual(seen['PATH_INFO'].encode('latin-1').decode(),
+                         '/путь/')
+        self.assertEqual(seen['QUERY_STRING'], 'a=1')
+        self.assertEqual(seen['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(seen['HTTP_X_TOKEN'], '1,2')
+        self.assertEqual(seen['body'], b'hello world')
+        self.assertTrue(seen['thread'].startswith('asgi'))
+        self.assertEqual(messages, [
+            {'type': 'http.response.start', 'status': 201,
+             'headers': [(b'content-type', b'text/plain')]},
+            {'type': 'http.response.body', 'body': b'ok', 'more_body': True},
+            {'type': 'http.response.body', 'body': b''},
+        ])
+
+    def test_disconnect_before_body_skips_application(self):
+        """Проверка: клиент ушёл до конца тела — view не вызывается."""
+        def application(environ, start_response):
+            raise AssertionError('view не должен вызываться')
+
+        bridge = WSGIBridge(application, threads=1, max_memory_body=4)
+        scope = http_scope(method='POST')
+        messages = []
+
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(bridge(scope, receive, send))
+        self.assertEqual(messages, [])
+
+    def test_body_over_limit_is_rejected(self):
+        """Проверка: тело больше max_body — 413 без вызова view."""
+        def application(environ, start_response):
+            raise AssertionError('view не должен вызываться')
+
+        bridge = WSGIBridge(application, threads=1, max_memory_body=4,
+                            max_body=8)
+        messages = call(bridge, http_scope(method='POST'),
+                        chunks=(b'12345', b'67890', b'never read'))
+        self.assertEqual(messages[0]['status'], 413)
+        messages = call(bridge, http_scope(
+            method='POST', headers=[(b'content-length', b'100')]),
+            chunks=(b'123',))
+        self.assertEqual(messages[0]['status'], 413)
+
+    def test_threads_fit_database_pool(self):
+        """Проверка: потоков не больше, чем соединений в пуле."""
+        check_threads(settings)
+        databases = {'default': {**settings.DATABASES['default'],
+                                 'POOL': {'MAX_SIZE': 2}}}
+        with override_settings(DATABASES=databases, ASGI_THREADS=3):
+            with self.assertRaises(ImproperlyConfigured):
+                check_threads(settings)
+
+    def test_django_page(self):
+        """Проверка: Django отвечает через bridge."""
+        bridge = WSGIBridge(WSGIHandler(), threads=2, max_memory_body=1024)
+        messages = call(bridge, http_scope('/about/author/'))
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/html; charset=utf-8'),
+                      messages[0]['headers'])
+
+    def test_event_stream_has_no_content_length(self):
+        """Проверка: поток событий открывается без Content-Length."""
+        bridge = WSGIBridge(WSGIHandler(), threads=2, max_memory_body=1024)
+        messages = call(bridge, http_scope('/events/'))
+        start, *body = messages
+        self.assertEqual(start['status'], 200)
+        headers = dict(start['headers'])
+        self.assertNotIn(b'content-length', headers)
+        self.assertEqual(headers[b'content-type'], b'text/event-stream')
+        self.assertEqual(body[0], {'type': 'http.response.body',
+                                   'body': PING, 'more_body': True})
+
+    def test_lifespan(self):
+        """Проверка: запуск и остановка сервера подтверждаются."""
+        bridge = WSGIBridge(WSGIHandler(), threads=1, max_memory_body=1024)
+        bridge.get_executor()
+        incoming = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        messages = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            messages.append(message['type'])
+
+        asyncio.run(bridge({'type': 'lifespan'}, receive, send))
+        self.assertEqual(messages, ['lifespan.startup.complete',
+                                    'lifespan.shutdown.complete'])
+        self.assertIsNone(bridge.executor)
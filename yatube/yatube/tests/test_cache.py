@@ -0,0 +1,106 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..cache.backends import RedisCache, TieredCache
+from ..cache.resp import RespServer
+
+
+class TieredCacheTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = RespServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache = TieredCache(TieredCacheTests.server.address, {
+            'OPTIONS': {'L1_MAX_ENTRIES': 2, 'L1_TIMEOUT': 60},
+        })
+        self.cache.clear()
+
+    def test_values_round_trip_without_pickle(self):
+        """Проверка: значения переживают JSON-сериализацию."""
+        values = {
+            'text': 'Текст',
+            'number': 42,
+            'fragment': ['version', '<p>html</p>'],
+            'mapping': {'a': 1},
+        }
+        self.cache.set_many(values)
+        remote = RedisCache(TieredCacheTests.server.address, {})
+        self.assertEqual(remote.get_many(values.keys()), values)
+        self.assertEqual(self.cache.incr('number'), 43)
+        with self.assertRaises(TypeError):
+            self.cache.set('object', object())
+
+    def test_set_many_is_one_round_trip(self):
+        """Проверка: set_many пишет все ключи одним запросом."""
+        values = {f'key{number}': number for number in range(50)}
+        remote = RedisCache(TieredCacheTests.server.address, {})
+        client = self.cache.client
+        for timeout in (None, 0.05):
+            with self.subTest(timeout=timeout), \
+                    mock.patch.object(client, '_send',
+                                      wraps=client._send) as send, \
+                    mock.patch.object(client, '_send_pipeline',
+                                      wraps=client._send_pipeline) as batch:
+                self.assertEqual(self.cache.set_many(values, timeout), [])
+                self.assertEqual(send.call_count + batch.call_count, 1)
+                self.assertEqual(remote.get_many(values), values)
+        time.sleep(0.1)
+        self.assertEqual(remote.get_many(values), {})
+        self.assertEqual(self.cache.get_many(values), {})
+
+    def test_process_tier_serves_repeated_reads(self):
+        """Проверка: повторные чтения обслуживает L1 без сети."""
+        self.cache.set('key', 'value')
+        TieredCacheTests.server.store.cmd_flushdb()
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(self.cache.stats['l1_hits'], 1)
+        self.cache.set('second', 1)
+        self.cache.set('third', 1)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.stats['misses'], 1)
+
+    def test_process_tier_is_shared_between_threads(self):
+        """Проверка: L1 общий для экземпляров из разных потоков."""
+        self.cache.set('key', 'value')
+        TieredCacheTests.server.store.cmd_flushdb()
+        seen = {}
+
+        def read():
+            other = TieredCache(TieredCacheTests.server.address, {})
+            seen['value'] = other.get('key')
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        self.assertEqual(seen['value'], 'value')
+
+    def test_writes_invalidate_process_tier(self):
+        """Проверка: add, delete и incr не оставляют старых значений в L1."""
+        self.assertTrue(self.cache.add('lock', 1, 10))
+        self.assertFalse(self.cache.add('lock', 2, 10))
+        self.assertEqual(self.cache.get('lock'), 1)
+        self.cache.delete('lock')
+        self.assertIsNone(self.cache.get('lock'))
+        self.cache.set('short', 'value', 0.05)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('short'))
+
+    def test_large_fragments_are_compressed(self):
+        """Проверка: большие фрагменты хранятся сжатыми."""
+        html = '<div class="card">текст поста</div>' * 500
+        self.cache.set('fragment', html)
+        info = TieredCacheTests.server.store.cmd_info().decode()
+        used = int(info.split('used_memory:')[1].split()[0])
+        self.assertLess(used, len(html.encode()) // 10)
+        self.assertEqual(self.cache.get('fragment'), html)
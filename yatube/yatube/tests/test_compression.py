@@ -0,0 +1,106 @@
+import gzip
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from .. import compression
+from ..compression import CompressionMiddleware, accepted_encoding
+
+
+class CompressionTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        Post.objects.create(text='Тестовый текст ' * 50, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.authorized_client = Client(HTTP_ACCEPT_ENCODING='gzip')
+        self.authorized_client.force_login(CompressionTests.author)
+
+    def test_feed_is_gzipped(self):
+        """Проверка: лента сжимается, ETag становится слабым."""
+        plain = Client().get(reverse('index'))
+        response = self.authorized_client.get(reverse('index'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertIn('Тестовый текст',
+                      gzip.decompress(response.content).decode())
+
+    @skipUnless(compression.brotli, 'нужен пакет brotli')
+    def test_feed_is_brotli_compressed(self):
+        """Проверка: brotli выбирается, если клиент его принимает."""
+        client = Client(HTTP_ACCEPT_ENCODING='gzip, br')
+        for _ in range(2):
+            response = client.get(reverse('index'))
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertIn('Тестовый текст', compression.brotli.decompress(
+                response.content).decode())
+
+    def test_gzip_is_used_without_brotli(self):
+        """Проверка: без пакета brotli ответ и кэш страниц — в gzip."""
+        client = Client(HTTP_ACCEPT_ENCODING='gzip, br')
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertEqual(compression.compress_all(b'x').keys(),
+                             {'gzip'})
+            for _ in range(2):
+                response = client.get(reverse('index'))
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertIn('Тестовый текст',
+                              gzip.decompress(response.content).decode())
+
+    def test_page_cache_hit_is_not_compressed_again(self):
+        """Проверка: гость получает готовую сжатую копию из кэша."""
+        self.guest_client.get(reverse('index'))
+        with mock.patch.object(compression, 'compress',
+                               wraps=compression.compress) as compress:
+            response = self.guest_client.get(reverse('index'))
+        compress.assert_not_called()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Тестовый текст',
+                      gzip.decompress(response.content).decode())
+
+    def test_small_and_encoded_responses_are_skipped(self):
+        """Проверка: короткие и уже сжатые ответы не трогаются."""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        encoded = HttpResponse('x' * 1000)
+        encoded['Content-Encoding'] = 'identity'
+        for response in (HttpResponse('x'), encoded):
+            with self.subTest(response=response):
+                result = CompressionMiddleware(lambda request: response)(
+                    request)
+                self.assertEqual(result.content, response.content)
+                self.assertNotEqual(result.get('Content-Encoding'), 'gzip')
+
+    def test_pages_with_csrf_token_are_not_compressed(self):
+        """Проверка: страница с CSRF-токеном отдаётся без сжатия."""
+        response = self.authorized_client.get(reverse('new_post'))
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_encoding_negotiation(self):
+        """Проверка: учитываются q и предпочтение brotli."""
+        factory = RequestFactory()
+        cases = (
+            ('gzip, br', ('br', 'gzip'), 'br'),
+            ('gzip, br;q=0.5', ('br', 'gzip'), 'gzip'),
+            ('br', ('gzip',), None),
+            ('*;q=0', ('br', 'gzip'), None),
+            ('*', ('gzip',), 'gzip'),
+            ('', ('br', 'gzip'), None),
+        )
+        for header, encodings, expected in cases:
+            with self.subTest(header=header):
+                request = factory.get('/', HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(accepted_encoding(request, encodings),
+                                 expected)
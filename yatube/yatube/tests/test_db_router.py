@@ -0,0 +1,126 @@
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.cache import cached_cards
+from posts.models import Post, User
+
+from ..db_router import PIN_COOKIE, replica_allowed, set_replica_allowed
+
+REPLICA = 'replica_test'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], DATABASE_REPLICA_LAG=0)
+class ReplicaRoutingTests(TestCase):
+    """Основная база — тестовая, реплика — отдельный файл SQLite,
+    в который данные попадают только «репликацией» в тесте.
+    Без DATABASE_REPLICA_LAG реплика считается догнавшей основную."""
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.mkdtemp()
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3'),
+            'TEST': {'NAME': os.path.join(cls.replica_dir,
+                                          'replica.sqlite3')},
+        }
+        call_command('migrate', database=REPLICA, verbosity=0)
+        super().setUpClass()
+        cls.author = User.objects.create_user('author')
+        Post.objects.using(REPLICA).bulk_create([
+            Post(text='Пост на реплике', author_id=cls.author.pk),
+        ])
+        User.objects.using(REPLICA).bulk_create([cls.author])
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        delattr(connections._connections, REPLICA)
+        os.remove(os.path.join(cls.replica_dir, 'replica.sqlite3'))
+        os.rmdir(cls.replica_dir)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = self.client_class()
+        self.authorized_client.force_login(ReplicaRoutingTests.author)
+
+    def test_feed_reads_from_replica(self):
+        """Проверка: главная страница читает посты с реплики."""
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'Пост на реплике')
+
+    def test_write_pins_to_primary(self):
+        """Проверка: после записи свои изменения видны сразу."""
+        response = self.authorized_client.post(
+            reverse('new_post'), {'text': 'Свежий пост'})
+        self.assertIn(PIN_COOKIE, response.cookies)
+        cache.clear()
+        response = self.authorized_client.get(reverse('index'))
+        self.assertContains(response, 'Свежий пост')
+        self.assertNotContains(response, 'Пост на реплике')
+
+    def test_unlisted_views_use_primary(self):
+        """Проверка: страницы не из списка читают основную базу."""
+        self.authorized_client.cookies.pop(PIN_COOKIE, None)
+        response = self.authorized_client.get(reverse('new_post'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICA_LAG=60)
+    def test_fresh_versions_are_built_from_primary(self):
+        """Проверка: в кэш под новой версией не попадают данные реплики."""
+        Post.objects.create(text='Свежий пост',
+                            author=ReplicaRoutingTests.author)
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'Свежий пост')
+        self.assertNotContains(response, 'Пост на реплике')
+        with self.settings(DATABASE_REPLICA_LAG=0):
+            response = self.client.get(
+                reverse('index'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(reverse('profile', args=('author',)))
+        self.assertContains(response, 'Свежий пост')
+
+    @override_settings(DATABASE_REPLICA_LAG=60)
+    def test_fresh_cards_from_replica_are_not_stored(self):
+        """Проверка: карточка из реплики со свежей версией не кэшируется."""
+        post = Post.objects.using(REPLICA).get()
+        rendered = []
+
+        def render(post):
+            rendered.append(post.pk)
+            return post.text
+
+        for _ in range(2):
+            set_replica_allowed(True)
+            try:
+                self.assertEqual(cached_cards([post], render),
+                                 {post.pk: 'Пост на реплике'})
+                self.assertFalse(replica_allowed())
+            finally:
+                set_replica_allowed(False)
+        self.assertEqual(rendered, [post.pk, post.pk])
+        cached_cards([post], render)
+        cached_cards([post], render)
+        self.assertEqual(len(rendered), 3)
+
+    def test_pin_follows_executed_writes(self):
+        """Проверка: закрепление ставят только выполненные записи."""
+        reader = User.objects.create_user('reader')
+        client = self.client_class()
+        client.force_login(reader)
+        url = reverse('profile_follow', args=('author',))
+        self.assertIn(PIN_COOKIE, client.get(url).cookies)
+        client.cookies.pop(PIN_COOKIE)
+        self.assertNotIn(PIN_COOKIE, client.get(url).cookies)
+        self.assertNotIn(PIN_COOKIE, self.client.get(reverse('index')).cookies)
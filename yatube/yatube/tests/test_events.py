@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from ..cache.resp import RespServer
+from ..events.brokers import LocalBroker, RespBroker, get_broker
+from ..events.sse import PING, EventStream, stream_events
+
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+        self.received = threading.Event()
+
+    def __call__(self, channel, message):
+        self.messages.append((channel, message))
+        self.received.set()
+
+
+class LocalBrokerTests(SimpleTestCase):
+
+    def test_publish_reaches_channel_subscribers(self):
+        """Проверка: событие получают только подписчики канала."""
+        broker = LocalBroker()
+        inbox, other = Inbox(), Inbox()
+        unsubscribe = broker.subscribe(['a', 'b'], inbox)
+        broker.subscribe(['c'], other)
+        broker.publish('b', {'post': 1})
+        self.assertEqual(inbox.messages, [('b', {'post': 1})])
+        self.assertEqual(other.messages, [])
+        unsubscribe()
+        broker.publish('a', {'post': 2})
+        self.assertEqual(len(inbox.messages), 1)
+        self.assertEqual(broker.listeners(), 1)
+
+    @override_settings(EVENTS_HEARTBEAT=0.01)
+    def test_stream_counts_new_posts(self):
+        """Проверка: поток событий считает посты и шлёт пинги."""
+        broker = get_broker()
+        stream = EventStream()
+        stream.channels, stream.event = ['posts'], 'posts'
+        bodies = []
+        listeners = broker.listeners()
+
+        async def run():
+            closed = asyncio.Event()
+
+            async def receive():
+                await closed.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                bodies.append(message['body'])
+                if len(bodies) == 2:
+                    broker.publish('posts', {'post': 1})
+                    broker.publish('posts', {'post': 2})
+                elif len(bodies) == 4:
+                    broker.publish('posts', {'post': 3})
+                elif len(bodies) == 5:
+                    closed.set()
+
+            await asyncio.wait_for(stream_events(stream, receive, send), 5)
+
+        asyncio.run(run())
+        self.assertEqual(bodies[:2], [PING, PING])
+        self.assertEqual(bodies[2], b'event: posts\ndata: {"count":2}\n\n')
+        self.assertEqual(bodies[4], b'event: posts\ndata: {"count":3}\n\n')
+        self.assertEqual(broker.listeners(), listeners)
+
+
+class RespBrokerTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = RespServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def test_events_pass_through_server(self):
+        """Проверка: событие одного брокера доходит до подписчика другого."""
+        publisher = RespBroker({'LOCATION': self.server.address})
+        listener = RespBroker({'LOCATION': self.server.address})
+        inbox = Inbox()
+        listener.subscribe(['author:1'], inbox)
+        self.assertTrue(listener.ready.wait(1))
+        publisher.publish('author:2', {'post': 1})
+        publisher.publish('author:1', {'post': 2})
+        self.assertTrue(inbox.received.wait(1))
+        self.assertEqual(inbox.messages, [('author:1', {'post': 2})])
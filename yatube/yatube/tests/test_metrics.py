@@ -0,0 +1,76 @@
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from ..metrics.registry import Histogram, registry
+
+
+class HistogramTests(SimpleTestCase):
+
+    def test_buckets_are_cumulative(self):
+        """Проверка: корзины накапливаются, значение на границе — внутри."""
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()),
+                         [(1, 2), (5, 3), ('+Inf', 4)])
+        self.assertEqual(histogram.sum, 11)
+
+
+class MetricsMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user('author')
+        Post.objects.create(author=author, text='Пост')
+
+    def setUp(self):
+        registry.reset()
+
+    @override_settings(METRICS_SAMPLE_RATE=1)
+    def test_sampled_request_recorded(self):
+        """Проверка: запрос из выборки попадает во все гистограммы."""
+        self.client.get(reverse('index'))
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('yatube_view_requests_total{view="index"} 1', text)
+        for name in ('latency_seconds', 'db_seconds', 'template_seconds',
+                     'queries'):
+            self.assertIn(f'yatube_view_{name}_count{{view="index"}} 1',
+                          text)
+        self.assertNotIn('yatube_view_queries_bucket{view="index",le="0"} 1',
+                         text)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request_only_counted(self):
+        """Проверка: вне выборки растёт только счётчик запросов."""
+        self.client.get(reverse('index'))
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('yatube_view_requests_total{view="index"} 1', text)
+        self.assertNotIn('yatube_view_latency_seconds', text)
+
+    def test_endpoint_limited_to_internal_ips(self):
+        """Проверка: метрики не видны с внешних адресов."""
+        client = Client(REMOTE_ADDR='10.1.2.3')
+        response = client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_endpoint_hidden_behind_proxy(self):
+        """Проверка: запрос через прокси с локального адреса не проходит."""
+        response = self.client.get(reverse('metrics'),
+                                   HTTP_X_FORWARDED_FOR='10.1.2.3')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_endpoint_requires_token(self):
+        """Проверка: с METRICS_TOKEN нужен токен, адрес не важен."""
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(
+            self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong')
+            .status_code, 404)
+        client = Client(REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(
+            client.get(url, HTTP_AUTHORIZATION='Bearer secret').status_code,
+            200)
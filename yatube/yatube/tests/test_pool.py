@@ -0,0 +1,73 @@
+import sqlite3
+import threading
+
+from django.test import SimpleTestCase
+
+from ..metrics.registry import registry
+from ..pool.pool import ConnectionPool, PoolTimeout
+
+
+def connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        registry.reset()
+
+    def make_pool(self, **options):
+        return ConnectionPool('test', options)
+
+    def test_released_connection_reused(self):
+        """Проверка: после release соединение выдаётся повторно."""
+        pool = self.make_pool()
+        first = pool.acquire(connect)
+        pool.release(first)
+        self.assertIs(pool.acquire(connect), first)
+        self.assertIn('yatube_db_pool_connects_total{alias="test"} 1',
+                      registry.render())
+
+    def test_limit_and_timeout(self):
+        """Проверка: сверх MAX_SIZE ждём и получаем PoolTimeout."""
+        pool = self.make_pool(MAX_SIZE=1, TIMEOUT=0.05)
+        pool.acquire(connect)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(connect)
+        self.assertIn('yatube_db_pool_timeouts_total{alias="test"} 1',
+                      registry.render())
+
+    def test_waiter_gets_released_connection(self):
+        """Проверка: ожидающий поток получает освобождённое соединение."""
+        pool = self.make_pool(MAX_SIZE=1, TIMEOUT=5)
+        held = pool.acquire(connect)
+        received = []
+        waiter = threading.Thread(
+            target=lambda: received.append(pool.acquire(connect)))
+        waiter.start()
+        pool.release(held)
+        waiter.join(5)
+        self.assertEqual(received, [held])
+
+    def test_expired_and_broken_connections_replaced(self):
+        """Проверка: старые и сломанные соединения пул пересоздаёт."""
+        pool = self.make_pool(MAX_LIFETIME=0)
+        first = pool.acquire(connect)
+        pool.release(first)
+        self.assertIsNot(pool.acquire(connect), first)
+
+        pool = self.make_pool(HEALTH_CHECK_INTERVAL=0)
+        broken = pool.acquire(connect)
+        pool.release(broken)
+        broken.close()
+        self.assertIsNot(pool.acquire(connect), broken)
+        self.assertIn('yatube_db_pool_discards_total{alias="test",'
+                      'reason="health_check"} 1', registry.render())
+
+    def test_connection_closed_in_transaction_not_reused(self):
+        """Проверка: соединение после ошибки в транзакции не вернётся."""
+        pool = self.make_pool()
+        first = pool.acquire(connect)
+        pool.release(first, reusable=False)
+        self.assertEqual(pool.idle, [])
+        self.assertIsNot(pool.acquire(connect), first)
@@ -0,0 +1,80 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+
+CSS = 'bootstrap/dist/css/bootstrap.min.css'
+
+
+class StaticFilesTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.assets = tempfile.mkdtemp()
+        cls.static_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(cls.assets, os.path.dirname(CSS)))
+        with open(os.path.join(cls.assets, CSS), 'w') as css:
+            css.write('.card{margin:0 auto;padding:1rem}\n' * 100)
+        with open(os.path.join(cls.assets, 'robots.txt'), 'w') as robots:
+            robots.write('User-agent: *')
+        cls.settings = override_settings(STATICFILES_DIRS=[cls.assets],
+                                         STATIC_ROOT=cls.static_root)
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.assets)
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    def test_static_tag_links_hashed_name(self):
+        """Проверка: {% static %} ссылается на файл с хэшем."""
+        url = Template('{% load static %}{% static path %}').render(
+            Context({'path': CSS}))
+        self.assertRegex(url, r'/static/bootstrap/dist/css/'
+                              r'bootstrap\.min\.[0-9a-f]{12}\.css$')
+        hashed = os.path.join(StaticFilesTests.static_root,
+                              staticfiles_storage.stored_name(CSS))
+        self.assertTrue(os.path.isfile(hashed + '.gz'))
+        self.assertFalse(os.path.isfile(
+            os.path.join(StaticFilesTests.static_root, 'robots.txt.gz')))
+
+    def test_hashed_file_is_cached_for_a_year_compressed(self):
+        """Проверка: файл с хэшем отдаётся сжатым и кэшируется на год."""
+        url = staticfiles_storage.url(CSS)
+        response = Client(HTTP_ACCEPT_ENCODING='gzip').get(url)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertTrue(content.startswith(b'.card'))
+
+    @override_settings(STATIC_MAX_AGE=60)
+    def test_unhashed_file_is_revalidated(self):
+        """Проверка: файл без хэша кэшируется ненадолго и даёт 304."""
+        response = self.client.get('/static/robots.txt')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertNotIn('Content-Encoding', response)
+        response = self.client.get(
+            '/static/robots.txt',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_paths_outside_static_root_are_not_served(self):
+        """Проверка: выйти за пределы STATIC_ROOT нельзя."""
+        response = self.client.get('/static/../manage.py')
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_manifest_entry_falls_back_to_plain_name(self):
+        """Проверка: несобранный файл не ломает страницу."""
+        self.assertEqual(staticfiles_storage.url('missing.css'),
+                         '/static/missing.css')